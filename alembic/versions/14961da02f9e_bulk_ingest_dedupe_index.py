@@ -0,0 +1,30 @@
+"""Bulk ingestion: skipped count and per-job number index
+
+Revision ID: 14961da02f9e
+Revises: e48b82961ce0
+Create Date: 2026-10-17 21:58:03.551270
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '14961da02f9e'
+down_revision: Union[str, Sequence[str], None] = 'e48b82961ce0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('bulk_jobs', sa.Column('skipped_count', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_bulk_messages_job_number', 'bulk_messages', ['job_id', 'to_number'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bulk_messages_job_number', table_name='bulk_messages')
+    op.drop_column('bulk_jobs', 'skipped_count')
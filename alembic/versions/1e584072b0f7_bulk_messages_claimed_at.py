@@ -0,0 +1,30 @@
+"""Bulk messages: claimed_at for the 'sending' state
+
+Revision ID: 1e584072b0f7
+Revises: c430372e67ca
+Create Date: 2026-10-18 09:02:14.530771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1e584072b0f7'
+down_revision: Union[str, Sequence[str], None] = 'c430372e67ca'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('bulk_messages', sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Claimed messages may have gone out; don't make them sendable again
+    op.execute("UPDATE bulk_messages SET status = 'failed' WHERE status = 'sending'")
+    op.drop_column('bulk_messages', 'claimed_at')
@@ -0,0 +1,29 @@
+"""Index pending bulk messages for keyset claiming
+
+Revision ID: 39069332fdac
+Revises: 627be07a81e7
+Create Date: 2026-10-17 19:05:12.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '39069332fdac'
+down_revision: Union[str, Sequence[str], None] = '627be07a81e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_bulk_messages_pending', 'bulk_messages', ['job_id', 'id'], unique=False,
+                    postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bulk_messages_pending', table_name='bulk_messages')
@@ -0,0 +1,51 @@
+"""Scoped vector search columns
+
+Revision ID: 5423e1102471
+Revises: 6919869a0dd0
+Create Date: 2026-10-17 13:52:47.604219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5423e1102471'
+down_revision: Union[str, Sequence[str], None] = '6919869a0dd0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('message_embeddings', sa.Column('tenant_id', sa.Integer(), nullable=True))
+    op.add_column('message_embeddings', sa.Column('conversation_id', sa.Integer(), nullable=True))
+    op.add_column('message_embeddings', sa.Column('from_number', sa.String(), nullable=True))
+    op.add_column('message_embeddings', sa.Column('message_created_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Backfill the filter columns from the owning message and conversation
+    op.execute("""
+        UPDATE message_embeddings e
+        SET tenant_id = c.tenant_id,
+            conversation_id = m.conversation_id,
+            from_number = m.from_number,
+            message_created_at = m.created_at
+        FROM chat_messages m
+        LEFT JOIN conversations c ON c.id = m.conversation_id
+        WHERE m.id = e.message_id
+    """)
+
+    op.create_index('ix_message_embeddings_tenant_id_message_created_at', 'message_embeddings', ['tenant_id', 'message_created_at'], unique=False)
+    op.create_index('ix_message_embeddings_conversation_id', 'message_embeddings', ['conversation_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_message_embeddings_conversation_id', table_name='message_embeddings')
+    op.drop_index('ix_message_embeddings_tenant_id_message_created_at', table_name='message_embeddings')
+    op.drop_column('message_embeddings', 'message_created_at')
+    op.drop_column('message_embeddings', 'from_number')
+    op.drop_column('message_embeddings', 'conversation_id')
+    op.drop_column('message_embeddings', 'tenant_id')
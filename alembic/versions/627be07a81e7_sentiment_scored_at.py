@@ -0,0 +1,37 @@
+"""Track when sentiment was scored
+
+Revision ID: 627be07a81e7
+Revises: 62adb97346a4
+Create Date: 2026-10-17 17:20:44.602913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '627be07a81e7'
+down_revision: Union[str, Sequence[str], None] = '62adb97346a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chat_messages', sa.Column('sentiment_scored_at', sa.DateTime(timezone=True), nullable=True))
+    # A non-default label can only have come from the model. Rows still
+    # 'neutral' are indistinguishable from unscored ones and get re-scored.
+    op.execute(
+        "UPDATE chat_messages SET sentiment_scored_at = coalesce(created_at, now()) "
+        "WHERE sentiment IS DISTINCT FROM 'neutral'"
+    )
+    op.create_index('ix_chat_messages_sentiment_pending', 'chat_messages', ['id'], unique=False,
+                    postgresql_where=sa.text('sentiment_scored_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chat_messages_sentiment_pending', table_name='chat_messages')
+    op.drop_column('chat_messages', 'sentiment_scored_at')
@@ -0,0 +1,83 @@
+"""Model-versioned embeddings and embedding model registry
+
+Revision ID: 62adb97346a4
+Revises: ab12a084903d
+Create Date: 2026-10-17 16:42:05.318227
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+
+
+# revision identifiers, used by Alembic.
+revision: str = '62adb97346a4'
+down_revision: Union[str, Sequence[str], None] = 'ab12a084903d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('embedding_models',
+    sa.Column('model_version', sa.String(), nullable=False),
+    sa.Column('dimensions', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('activated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.CheckConstraint("status IN ('building', 'ready', 'active', 'retired')", name='ck_embedding_models_status'),
+    sa.PrimaryKeyConstraint('model_version')
+    )
+    op.create_index('uq_embedding_models_single_active', 'embedding_models', ['status'], unique=True,
+                    postgresql_where=sa.text("status = 'active'"))
+    # The model every existing vector came from
+    op.execute(
+        "INSERT INTO embedding_models (model_version, dimensions, status, activated_at) "
+        "VALUES ('embed-english-v3.0', 1024, 'active', now())"
+    )
+
+    # One row per (message, model) so a new model can be backfilled next to the live one
+    op.drop_constraint('message_embeddings_message_id_key', 'message_embeddings', type_='unique')
+    op.create_unique_constraint('uq_message_embeddings_message_model', 'message_embeddings',
+                                ['message_id', 'model_version'])
+
+    # Dimensionless column so models of different sizes can share the table;
+    # the global index can't cover it and is replaced by per-model partial ones.
+    op.drop_index('ix_message_embeddings_embedding_ann', table_name='message_embeddings')
+    op.alter_column('message_embeddings', 'embedding',
+                    existing_type=pgvector.sqlalchemy.Vector(dim=1024),
+                    type_=pgvector.sqlalchemy.Vector(),
+                    existing_nullable=True)
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_message_embeddings_ann_embed_english_v3_0 "
+            "ON message_embeddings USING hnsw ((embedding::vector(1024)) vector_cosine_ops) "
+            "WITH (m = 16, ef_construction = 64) "
+            "WHERE model_version = 'embed-english-v3.0'"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_message_embeddings_ann_embed_english_v3_0")
+
+    # Only the original model's vectors fit the old schema
+    op.execute("DELETE FROM message_embeddings WHERE model_version <> 'embed-english-v3.0'")
+    op.alter_column('message_embeddings', 'embedding',
+                    existing_type=pgvector.sqlalchemy.Vector(),
+                    type_=pgvector.sqlalchemy.Vector(dim=1024),
+                    existing_nullable=True)
+    op.create_index('ix_message_embeddings_embedding_ann', 'message_embeddings', ['embedding'], unique=False,
+                    postgresql_using='hnsw',
+                    postgresql_with={'m': 16, 'ef_construction': 64},
+                    postgresql_ops={'embedding': 'vector_cosine_ops'})
+
+    op.drop_constraint('uq_message_embeddings_message_model', 'message_embeddings', type_='unique')
+    op.create_unique_constraint('message_embeddings_message_id_key', 'message_embeddings', ['message_id'])
+
+    op.drop_index('uq_embedding_models_single_active', table_name='embedding_models')
+    op.drop_table('embedding_models')
@@ -0,0 +1,37 @@
+"""Message status lattice check
+
+Revision ID: 66dea1ca875d
+Revises: 9d1fb49d0285
+Create Date: 2026-10-17 10:03:17.224095
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '66dea1ca875d'
+down_revision: Union[str, Sequence[str], None] = '9d1fb49d0285'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Legacy rows may hold statuses outside the lattice; reset them so the check can be added.
+    op.execute("""
+        UPDATE message_status SET wa_status = 'pending'
+        WHERE wa_status NOT IN ('pending', 'sent', 'delivered', 'read', 'failed')
+    """)
+    op.create_check_constraint(
+        'ck_message_status_wa_status',
+        'message_status',
+        "wa_status IN ('pending', 'sent', 'delivered', 'read', 'failed')",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ck_message_status_wa_status', 'message_status', type_='check')
@@ -0,0 +1,45 @@
+"""Message embeddings HNSW index
+
+Revision ID: 6919869a0dd0
+Revises: bd13ca7aa437
+Create Date: 2026-10-17 12:40:22.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6919869a0dd0'
+down_revision: Union[str, Sequence[str], None] = 'bd13ca7aa437'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps message_embeddings writable while the graph is built,
+    # but cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_message_embeddings_embedding_ann',
+            'message_embeddings',
+            ['embedding'],
+            unique=False,
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': 'vector_cosine_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_message_embeddings_embedding_ann',
+            table_name='message_embeddings',
+            postgresql_concurrently=True,
+        )
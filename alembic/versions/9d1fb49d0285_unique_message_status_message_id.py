@@ -0,0 +1,36 @@
+"""Unique message_status.message_id
+
+Revision ID: 9d1fb49d0285
+Revises: 236e46602d0d
+Create Date: 2026-10-17 09:12:41.508312
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d1fb49d0285'
+down_revision: Union[str, Sequence[str], None] = '236e46602d0d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Concurrent webhooks may already have created duplicate rows.
+    # Keep the most recent row per message before enforcing uniqueness.
+    op.execute("""
+        DELETE FROM message_status a USING message_status b
+        WHERE a.message_id = b.message_id AND a.id < b.id
+    """)
+    op.drop_index(op.f('ix_message_status_message_id'), table_name='message_status')
+    op.create_index(op.f('ix_message_status_message_id'), 'message_status', ['message_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_message_status_message_id'), table_name='message_status')
+    op.create_index(op.f('ix_message_status_message_id'), 'message_status', ['message_id'], unique=False)
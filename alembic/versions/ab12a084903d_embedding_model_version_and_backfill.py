@@ -0,0 +1,50 @@
+"""Embedding model version and backfill checkpoints
+
+Revision ID: ab12a084903d
+Revises: 5423e1102471
+Create Date: 2026-10-17 15:08:31.927514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ab12a084903d'
+down_revision: Union[str, Sequence[str], None] = '5423e1102471'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Every existing vector came from the only model used so far
+    op.add_column(
+        'message_embeddings',
+        sa.Column('model_version', sa.String(), nullable=False, server_default='embed-english-v3.0'),
+    )
+
+    op.create_table('embedding_backfill_shards',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('model_version', sa.String(), nullable=False),
+    sa.Column('shard', sa.Integer(), nullable=False),
+    sa.Column('range_start', sa.Integer(), nullable=False),
+    sa.Column('range_end', sa.Integer(), nullable=False),
+    sa.Column('cursor', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('embedded', sa.Integer(), nullable=False),
+    sa.Column('rate_limited', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('model_version', 'shard', name='uq_embedding_backfill_shards_model_shard')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('embedding_backfill_shards')
+    op.drop_column('message_embeddings', 'model_version')
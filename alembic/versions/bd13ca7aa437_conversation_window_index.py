@@ -0,0 +1,36 @@
+"""Conversation window index
+
+Revision ID: bd13ca7aa437
+Revises: 66dea1ca875d
+Create Date: 2026-10-17 11:26:05.871930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bd13ca7aa437'
+down_revision: Union[str, Sequence[str], None] = '66dea1ca875d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_conversations_customer_number_last_message_at',
+        'conversations',
+        ['customer_number', 'last_message_at'],
+        unique=False,
+    )
+    # The composite index covers lookups by customer_number alone (leading column)
+    op.drop_index(op.f('ix_conversations_customer_number'), table_name='conversations')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_conversations_customer_number'), 'conversations', ['customer_number'], unique=False)
+    op.drop_index('ix_conversations_customer_number_last_message_at', table_name='conversations')
@@ -0,0 +1,56 @@
+"""Backfill conversation and message embedding tenants
+
+Conversations created before tenants were stamped on them get the tenant
+owning the WhatsApp number, passed explicitly:
+
+    alembic -x whatsapp_tenant_id=1 upgrade head
+
+(or taken from the WHATSAPP_TENANT_ID environment variable); their
+embeddings' denormalized tenant_id is then refreshed from the conversation.
+Without a tenant only the embeddings step can apply; rerun the upgrade SQL
+once it is known.
+
+Revision ID: c430372e67ca
+Revises: fafcf82e4e60
+Create Date: 2026-10-17 23:48:19.402311
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c430372e67ca'
+down_revision: Union[str, Sequence[str], None] = 'fafcf82e4e60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tenant_id = (
+        context.get_x_argument(as_dictionary=True).get('whatsapp_tenant_id')
+        or os.environ.get('WHATSAPP_TENANT_ID')
+    )
+    if tenant_id:
+        op.execute(
+            sa.text("UPDATE conversations SET tenant_id = :tenant_id WHERE tenant_id IS NULL")
+            .bindparams(tenant_id=int(tenant_id))
+        )
+    op.execute("""
+        UPDATE message_embeddings AS e
+        SET tenant_id = c.tenant_id
+        FROM conversations AS c
+        WHERE c.id = e.conversation_id
+          AND e.tenant_id IS NULL
+          AND c.tenant_id IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Data backfill only: the previous (NULL) tenants are not restored
+    pass
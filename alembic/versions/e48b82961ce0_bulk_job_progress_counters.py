@@ -0,0 +1,47 @@
+"""Bulk job progress counters and shard count
+
+Revision ID: e48b82961ce0
+Revises: 39069332fdac
+Create Date: 2026-10-17 20:41:37.904112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e48b82961ce0'
+down_revision: Union[str, Sequence[str], None] = '39069332fdac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('bulk_jobs', sa.Column('total_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('bulk_jobs', sa.Column('sent_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('bulk_jobs', sa.Column('failed_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('bulk_jobs', sa.Column('shard_count', sa.Integer(), nullable=True))
+    op.execute("""
+        UPDATE bulk_jobs AS j
+        SET total_count = c.total, sent_count = c.sent, failed_count = c.failed
+        FROM (
+            SELECT job_id,
+                   count(*) AS total,
+                   count(*) FILTER (WHERE status = 'sent') AS sent,
+                   count(*) FILTER (WHERE status = 'failed') AS failed
+            FROM bulk_messages
+            GROUP BY job_id
+        ) AS c
+        WHERE j.id = c.job_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('bulk_jobs', 'shard_count')
+    op.drop_column('bulk_jobs', 'failed_count')
+    op.drop_column('bulk_jobs', 'sent_count')
+    op.drop_column('bulk_jobs', 'total_count')
@@ -0,0 +1,28 @@
+"""Bulk messages: (job_id, status, id) index for job summaries and listings
+
+Revision ID: fafcf82e4e60
+Revises: 14961da02f9e
+Create Date: 2026-10-17 23:12:40.118093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fafcf82e4e60'
+down_revision: Union[str, Sequence[str], None] = '14961da02f9e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_bulk_messages_job_status', 'bulk_messages', ['job_id', 'status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bulk_messages_job_status', table_name='bulk_messages')
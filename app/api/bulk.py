@@ -1,20 +1,82 @@
 # app/api/bulk.py
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+import logging
+import os
+import shutil
+import tempfile
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, Query, Request, UploadFile, status
+from fastapi.routing import APIRoute
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
+from typing import List, Optional
 
 # --- Imports ---
-from app.database import get_db
+from app.core.config import settings
+from app.database import SessionLocal, get_db
 from app.models import BulkJob, BulkMessage, User
-from app.schemas.bulk import BulkJobCreate, BulkJobResponse, BulkJobStatus
+from app.schemas.bulk import (
+    BulkJobCreate, BulkJobResponse, BulkJobStatus, BulkJobSummary, BulkJobUploadResponse, BulkMessagePage
+)
 from app.authentication.router import get_current_user
+from app.services.bulk_ingest import BulkIngestService, iter_csv_numbers
 
 # Import the Celery task
 from app.tasks.whatsapp_tasks import process_bulk_whatsapp_job
 
+logger = logging.getLogger(__name__)
+
 # Clean router (no tags/prefix here, handled in router.py)
 router = APIRouter()
 
+# Upload spool -> temp file copy size
+UPLOAD_COPY_BYTES = 1024 * 1024
+
+def _upload_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Upload is larger than {settings.BULK_UPLOAD_MAX_BYTES} bytes."
+    )
+
+class SizeLimitedRequest(Request):
+    """Request whose body stream fails with 413 once it passes BULK_UPLOAD_MAX_BYTES."""
+    async def stream(self):
+        size = 0
+        async for chunk in super().stream():
+            size += len(chunk)
+            if size > settings.BULK_UPLOAD_MAX_BYTES:
+                raise _upload_too_large()
+            yield chunk
+
+class UploadRoute(APIRoute):
+    """
+    FastAPI parses (and spools) a multipart body before the endpoint or its
+    dependencies run, so the size cap has to sit under the parser: declared
+    Content-Length is checked up front, and the stream is cut off as it
+    arrives for chunked bodies or lying headers.
+    """
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def size_limited_handler(request: Request):
+            length = request.headers.get("content-length", "")
+            if length.isdigit() and int(length) > settings.BULK_UPLOAD_MAX_BYTES:
+                raise _upload_too_large()
+            return await handler(SizeLimitedRequest(request.scope, request.receive))
+
+        return size_limited_handler
+
+def _initial_status(scheduled_at: Optional[datetime]) -> str:
+    """'scheduled' for a future scheduled_at, else 'queued' (run now)."""
+    if scheduled_at:
+        # Ensure timezone awareness for comparison
+        if scheduled_at.tzinfo is None:
+            scheduled_at = scheduled_at.replace(tzinfo=timezone.utc)
+        if scheduled_at > datetime.now(timezone.utc):
+            return "scheduled"
+    # If date is in the past, default to immediate execution
+    return "queued"
+
 @router.post("/jobs", response_model=BulkJobResponse, status_code=status.HTTP_201_CREATED)
 def create_bulk_job(
     job_request: BulkJobCreate, 
@@ -32,22 +94,7 @@ def create_bulk_job(
         )
 
     # 1. Determine Initial Status
-    initial_status = "queued"
-    
-    if job_request.scheduled_at:
-        # Check if time is in the future
-        now = datetime.now(timezone.utc)
-        target = job_request.scheduled_at
-        
-        # Ensure timezone awareness for comparison
-        if target.tzinfo is None:
-            target = target.replace(tzinfo=timezone.utc)
-
-        if target > now:
-            initial_status = "scheduled"
-        else:
-            # If date is in the past, default to immediate execution
-            initial_status = "queued"
+    initial_status = _initial_status(job_request.scheduled_at)
 
     # 2. Create the Parent Job Record
     # We explicitly bind this job to the current user's tenant_id
@@ -57,22 +104,19 @@ def create_bulk_job(
         language_code=job_request.language_code,
         status=initial_status,
         scheduled_at=job_request.scheduled_at,
-        components=getattr(job_request, "components", []) 
+        components=getattr(job_request, "components", [])
     )
     db.add(new_job)
     db.flush() # Generate ID for foreign keys
 
-    # 3. Create Child Message Records
-    messages_objects = []
-    for number in job_request.numbers:
-        msg = BulkMessage(
-            job_id=new_job.id,
-            to_number=number,
-            status="pending"
+    # 3. Load Recipients (normalized, deduplicated, COPY in chunks)
+    ingested = BulkIngestService(db).ingest(new_job.id, job_request.numbers)
+    if not ingested.created:
+        # Nothing is committed: the session is discarded with the request
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No valid phone numbers ({ingested.invalid} invalid)."
         )
-        messages_objects.append(msg)
-    
-    db.add_all(messages_objects)
     
     # 4. Commit to DB
     db.commit()
@@ -87,6 +131,140 @@ def create_bulk_job(
 
     return new_job
 
+def upload_bulk_job(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="CSV (number in the first column) or one number per line."),
+    template_name: str = Form(...),
+    language_code: str = Form("en_US"),
+    scheduled_at: Optional[datetime] = Form(None),
+    components: Optional[str] = Form(None, description="Template variables, as a JSON list."),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Creates a bulk job from an uploaded recipient file.
+    The file is streamed to disk, the job is returned right away as
+    'importing', and the numbers are loaded in the background in committed
+    chunks: total_count/skipped_count grow as it goes (poll progress_url).
+    The job then moves to 'queued'/'scheduled' like a JSON-created one, or to
+    'failed' if the file had no valid numbers. Bodies over
+    BULK_UPLOAD_MAX_BYTES are refused with 413 while they stream in (UploadRoute).
+    If the API restarts mid-import, fail_stale_imports fails the job after
+    BULK_IMPORT_TIMEOUT_MINUTES.
+    """
+    if not current_user.tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User is not associated with a valid tenant."
+        )
+
+    try:
+        parsed_components = json.loads(components) if components else None
+    except ValueError:
+        parsed_components = None
+    if components and not isinstance(parsed_components, list):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="components must be a JSON list."
+        )
+
+    # 1. Keep the upload past the request (Starlette deletes its spool file)
+    path = _save_upload(file)
+
+    # 2. Create the Job; it stays 'importing' until the file is loaded
+    new_job = BulkJob(
+        tenant_id=current_user.tenant_id,
+        template_name=template_name,
+        language_code=language_code,
+        status="importing",
+        scheduled_at=scheduled_at,
+        components=parsed_components
+    )
+    try:
+        db.add(new_job)
+        db.commit()
+        db.refresh(new_job)
+    except Exception:
+        os.unlink(path)
+        raise
+
+    # 3. Load Recipients after the response is sent
+    background_tasks.add_task(import_uploaded_recipients, new_job.id, path, _initial_status(scheduled_at))
+
+    response = BulkJobUploadResponse.model_validate(new_job)
+    response.progress_url = str(request.app.url_path_for("get_job_summary", job_id=new_job.id))
+    return response
+
+router.add_api_route(
+    "/jobs/upload", upload_bulk_job, methods=["POST"],
+    response_model=BulkJobUploadResponse, status_code=status.HTTP_202_ACCEPTED,
+    route_class_override=UploadRoute,
+)
+
+def _save_upload(file: UploadFile) -> str:
+    """Copies the upload to a temp file in fixed-size blocks."""
+    fd, path = tempfile.mkstemp(prefix="bulk_upload_", suffix=".csv")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(file.file, out, UPLOAD_COPY_BYTES)
+    except Exception:
+        os.unlink(path)
+        raise
+    return path
+
+def _end_import(db: Session, job_id: int, new_status: str) -> bool:
+    """
+    Moves a job out of 'importing'. False if it already left it (failed by
+    fail_stale_imports), so a late import never revives a failed job.
+    """
+    values = {"status": new_status}
+    if new_status == "failed":
+        values["completed_at"] = datetime.now(timezone.utc)
+    moved = (
+        db.query(BulkJob)
+        .filter(BulkJob.id == job_id, BulkJob.status == "importing")
+        .update(values, synchronize_session=False)
+    )
+    db.commit()
+    return bool(moved)
+
+def import_uploaded_recipients(job_id: int, path: str, next_status: str):
+    """
+    Background task: loads an uploaded file into an 'importing' job, one
+    committed chunk at a time, then releases the job to the sender.
+    """
+    db = SessionLocal()
+    try:
+        with open(path, encoding="utf-8-sig", errors="replace", newline="") as f:
+            ingested = BulkIngestService(db).ingest(job_id, iter_csv_numbers(f), commit_chunks=True)
+
+        if not ingested.created:
+            logger.warning(f"Bulk Job {job_id}: upload had no valid phone numbers ({ingested.invalid} invalid).")
+            _end_import(db, job_id, "failed")
+        elif not _end_import(db, job_id, next_status):
+            logger.warning(f"Bulk Job {job_id}: no longer importing (timed out?); not releasing it.")
+        elif next_status == "queued":
+            process_bulk_whatsapp_job.delay(job_id)
+
+    except Exception as e:
+        # Chunks already committed stay; the job is not sent half-loaded
+        logger.error(f"Bulk Job {job_id}: recipient import failed: {e}")
+        db.rollback()
+        _end_import(db, job_id, "failed")
+
+    finally:
+        db.close()
+        os.unlink(path)
+
+def _get_tenant_job(db: Session, job_id: int, current_user: User) -> BulkJob:
+    job = db.get(BulkJob, job_id)
+
+    # Security Check: Ensure job exists AND belongs to the user's tenant
+    if not job or job.tenant_id != current_user.tenant_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 @router.get("/jobs/{job_id}", response_model=BulkJobStatus)
 def get_job_status(
     job_id: int, 
@@ -96,14 +274,71 @@ def get_job_status(
     """
     Get the status and message details of a bulk job.
     Enforces tenant isolation (users can only see their own organization's jobs).
+    Embeds every message: for polling use /summary, for messages /messages.
     """
-    job = db.get(BulkJob, job_id)
-    
-    # Security Check: Ensure job exists AND belongs to the user's tenant
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
-        
-    if hasattr(job, "tenant_id") and job.tenant_id != current_user.tenant_id:
-        raise HTTPException(status_code=404, detail="Job not found")
-    
-    return job
\ No newline at end of file
+    return _get_tenant_job(db, job_id, current_user)
+
+@router.get("/jobs/{job_id}/summary", response_model=BulkJobSummary)
+def get_job_summary(
+    job_id: int,
+    exact: bool = Query(False, description="Count messages with a GROUP BY instead of reading the job's counters"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Job status and message counts by status, without loading messages.
+    By default the counts come from the counters kept on the job (one row
+    read); exact=true recounts from bulk_messages (index-only, on
+    ix_bulk_messages_job_status).
+    """
+    job = _get_tenant_job(db, job_id, current_user)
+
+    if exact:
+        rows = (
+            db.query(BulkMessage.status, func.count())
+            .filter(BulkMessage.job_id == job_id)
+            .group_by(BulkMessage.status)
+            .all()
+        )
+        counts = {"pending": 0, "sent": 0, "failed": 0, **dict(rows)}
+    else:
+        counts = {
+            "pending": max(job.total_count - job.sent_count - job.failed_count, 0),
+            "sent": job.sent_count,
+            "failed": job.failed_count,
+        }
+
+    summary = BulkJobSummary.model_validate(job)
+    summary.counts = counts
+    return summary
+
+@router.get("/jobs/{job_id}/messages", response_model=BulkMessagePage)
+def list_job_messages(
+    job_id: int,
+    status_filter: List[str] = Query([], alias="status", description="Only these statuses (repeatable)"),
+    after: Optional[int] = Query(None, ge=0, description="Cursor: next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Lists a job's messages in id order, one keyset page at a time: pass the
+    returned next_cursor as `after` until it comes back null. Pages cost the
+    same however deep they are (no OFFSET).
+    """
+    _get_tenant_job(db, job_id, current_user)
+
+    query = db.query(BulkMessage).filter(BulkMessage.job_id == job_id)
+    if status_filter:
+        query = query.filter(BulkMessage.status.in_(status_filter))
+    if after is not None:
+        query = query.filter(BulkMessage.id > after)
+    # One extra row tells whether there is a next page
+    messages = query.order_by(BulkMessage.id).limit(limit + 1).all()
+
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    return BulkMessagePage(
+        items=messages,
+        next_cursor=messages[-1].id if has_more else None,
+    )
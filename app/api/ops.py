@@ -1,9 +1,24 @@
 # app/api/ops.py
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, status
 from app.core.health import router as health_router
+from app.services.webhook_stream import WebhookStream
 
 # Main Operations Router
 # This mounts the health checks and potentially other ops tools (backup triggers, etc.)
 router = APIRouter()
 
-router.include_router(health_router)
\ No newline at end of file
+router.include_router(health_router)
+
+@router.get("/ops/webhook-stream", tags=["Ops/Health"])
+def webhook_stream_stats():
+    """
+    Backpressure view of the webhook stream (length, pending, lag, dead-letter).
+    A steadily growing lag means more stream workers are needed.
+    """
+    try:
+        return WebhookStream().stats()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Webhook stream unavailable: {str(e)}"
+        )
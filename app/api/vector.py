@@ -7,14 +7,25 @@ Exposes endpoints to:
 1. Manually trigger embedding for a message.
 2. Search for similar messages (Semantic Search).
 3. Summarize conversation history.
+4. Inspect and rebuild per-model ANN indexes (admin).
+5. Start and monitor embedding backfills (admin).
+6. Register, activate and retire embedding models (admin).
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.authentication.router import get_current_user
+from app.core.permissions import require_role
+from app.database import get_db, engine
 from app.services.embedding_service import EmbeddingService
 from app.services.summary_service import SummaryService
-from app.models import ChatMessage
+from app.services.embedding_backfill import EmbeddingBackfillService
+from app.services.embedding_models import EmbeddingModelRegistry
+from app.services.vector_index_service import VectorIndexService
+from app.tasks.vector_tasks import rebuild_vector_index, start_embedding_backfill
+from app.models import ChatMessage, User
 
 router = APIRouter()
 
@@ -30,22 +41,46 @@ def embed_message(message_id: int, db: Session = Depends(get_db)):
         
     svc = EmbeddingService(db)
     try:
-        vector = svc.embed_text(msg.text)
-        svc.store_embedding(message_id, vector)
+        svc.embed_messages([msg])
         return {"status": "embedded", "message_id": message_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/similar")
-def find_similar(text: str, db: Session = Depends(get_db)):
+def find_similar(
+    text: str,
+    limit: int = Query(5, ge=1, le=100),
+    ef_search: Optional[int] = Query(None, ge=1, le=1000, description="HNSW search breadth (higher = better recall, slower)"),
+    probes: Optional[int] = Query(None, ge=1, le=1000, description="IVFFlat lists to scan"),
+    exclude_conversation_id: List[int] = Query([], description="Conversation IDs to leave out"),
+    from_number: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     """
     Find messages semantically similar to the input text.
+    Results are limited to the caller's tenant.
     Returns a list of matches with distance scores.
     """
+    if current_user.tenant_id is None:
+        raise HTTPException(status_code=403, detail="User is not associated with a valid tenant.")
+
     svc = EmbeddingService(db)
     try:
-        vector = svc.embed_text(text)
-        results = svc.search_similar(vector)
+        model_version, dimensions = svc.active_model()
+        vector = svc.embed_text(text, model=model_version)
+        results = svc.search_similar(
+            vector, limit=limit, ef_search=ef_search, probes=probes,
+            tenant_id=current_user.tenant_id,
+            exclude_conversation_ids=exclude_conversation_id,
+            from_number=from_number,
+            created_after=created_after,
+            created_before=created_before,
+            model_version=model_version,
+            dimensions=dimensions,
+        )
         return [{"message_id": r[0], "distance": r[1]} for r in results]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -58,4 +93,111 @@ def summarize_conversation(cid: int, db: Session = Depends(get_db)):
     """
     svc = SummaryService(db)
     summary = svc.summarize_conversation(cid)
-    return {"conversation_id": cid, "summary": summary}
\ No newline at end of file
+    return {"conversation_id": cid, "summary": summary}
+
+@router.get("/index", dependencies=[Depends(require_role("admin"))])
+def vector_index_status(model_version: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    A model's ANN index definition, size and validity (default: the active model).
+    """
+    model_version = model_version or EmbeddingModelRegistry(db).active()[0]
+    status = VectorIndexService(engine).status(model_version)
+    if not status:
+        raise HTTPException(status_code=404, detail="Vector index not found")
+    return {"model_version": model_version, **status}
+
+@router.post("/index/rebuild", status_code=202, dependencies=[Depends(require_role("admin"))])
+def rebuild_index(
+    model_version: Optional[str] = None,
+    mode: Literal["reindex", "rebuild"] = "reindex",
+    index_type: Literal["hnsw", "ivfflat"] = "hnsw",
+    m: int = Query(16, ge=2, le=100),
+    ef_construction: int = Query(64, ge=4, le=1000),
+    lists: Optional[int] = Query(None, ge=1),
+):
+    """
+    Queues a concurrent reindex, or a rebuild with new index parameters,
+    of a model's index (default: the active model). A model without an
+    index yet is always built.
+    """
+    task = rebuild_vector_index.delay(model_version, mode, index_type, m, ef_construction, lists)
+    return {"status": "queued", "task_id": task.id}
+
+def _model_info(row, registry: EmbeddingModelRegistry) -> dict:
+    return {
+        "model_version": row.model_version,
+        "dimensions": row.dimensions,
+        "status": row.status,
+        "created_at": row.created_at,
+        "activated_at": row.activated_at,
+        "blockers": registry.readiness(row.model_version) if row.status in ("building", "ready") else [],
+    }
+
+@router.get("/models", dependencies=[Depends(require_role("admin"))])
+def list_models(db: Session = Depends(get_db)):
+    """
+    Registered embedding models and what still blocks activating each one.
+    """
+    registry = EmbeddingModelRegistry(db)
+    return [_model_info(row, registry) for row in registry.all_models()]
+
+@router.post("/models", status_code=201, dependencies=[Depends(require_role("admin"))])
+def register_model(
+    model_version: str,
+    dimensions: Optional[int] = Query(None, ge=1, le=16000),
+    db: Session = Depends(get_db),
+):
+    """
+    Registers a model to migrate to. New messages are embedded for it from
+    now on; run a backfill and build its index before activating it.
+    """
+    registry = EmbeddingModelRegistry(db)
+    try:
+        row = registry.register(model_version, dimensions)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _model_info(row, registry)
+
+@router.post("/models/{model_version}/activate", dependencies=[Depends(require_role("admin"))])
+def activate_model(model_version: str, force: bool = False, db: Session = Depends(get_db)):
+    """
+    Switches searches to a model atomically. Refused until its backfill is
+    complete and its index is valid, unless forced.
+    """
+    registry = EmbeddingModelRegistry(db)
+    try:
+        row = registry.activate(model_version, force=force)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return _model_info(row, registry)
+
+@router.post("/models/{model_version}/retire", dependencies=[Depends(require_role("admin"))])
+def retire_model(model_version: str, db: Session = Depends(get_db)):
+    """
+    Stops writing a model and drops its index. Its rows stay until cleaned up.
+    """
+    registry = EmbeddingModelRegistry(db)
+    try:
+        row = registry.retire(model_version)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return _model_info(row, registry)
+
+@router.post("/backfill", status_code=202, dependencies=[Depends(require_role("admin"))])
+def start_backfill(
+    model_version: Optional[str] = None,
+    workers: Optional[int] = Query(None, ge=1, le=64),
+):
+    """
+    Queues a resumable backfill that embeds every message lacking a vector
+    from the given model (default: the active model).
+    """
+    task = start_embedding_backfill.delay(model_version, workers)
+    return {"status": "queued", "task_id": task.id}
+
+@router.get("/backfill", dependencies=[Depends(require_role("admin"))])
+def backfill_progress(model_version: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Per-shard checkpoints of a backfill.
+    """
+    return EmbeddingBackfillService(db).progress(model_version or EmbeddingModelRegistry(db).active()[0])
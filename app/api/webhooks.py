@@ -4,7 +4,8 @@ Module: Webhook Handler
 Context: Pod C - Integrations.
 
 Receives, validates, and processes webhooks from WhatsApp (Meta).
-Routes incoming data to ChatService (for messages) or StatusService (for receipts).
+Hands the parsed payload to WebhookService, which batches messages into
+ChatService and routes receipts to StatusService.
 """
 
 from fastapi import APIRouter, Request, Header, HTTPException, Depends
@@ -12,8 +13,8 @@ import hmac, hashlib, json, logging
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.core.config import settings
-from app.services.chat_service import ChatService
-from app.services.status_service import StatusService 
+from app.services.webhook_service import WebhookService
+from app.services.webhook_stream import publish_webhook
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -44,50 +45,22 @@ async def whatsapp_webhook(
         logger.warning("Webhook signature verification failed.")
         raise HTTPException(status_code=401, detail="Invalid signature.")
 
+    # Ack-first mode: persist the raw body durably and let the stream worker do the rest.
+    # Returning fast keeps Meta from retrying (and amplifying) during load spikes.
+    if settings.WEBHOOK_INGEST_MODE == "stream":
+        try:
+            await publish_webhook(raw_body)
+            return {"status": "ok"}
+        except Exception as e:
+            # Redis unavailable: fall back to inline processing rather than dropping the event
+            logger.error(f"Webhook stream append failed, processing inline: {e}")
+
     try:
         payload = json.loads(raw_body)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid JSON.")
 
-    # 2. Initialize Services
-    chat_svc = ChatService(db)
-    status_svc = StatusService(db)
-
-    # 3. Parse Entry List
-    entries = payload.get("entry", [])
-    for e in entries:
-        for change in e.get("changes", []):
-            val = change.get("value", {})
-            
-            # --- A. Handle Incoming Text Messages (Module 3) ---
-            if "messages" in val:
-                for m in val.get("messages", []):
-                    if m.get("type") == "text":
-                        sender = m.get("from")
-                        text_body = m.get("text", {}).get("body")
-                        
-                        # Extract WhatsApp Message ID (WAMID)
-                        wamid = m.get("id") 
-                        
-                        if sender and text_body:
-                            # Pass wamid to service for linking
-                            chat_svc.save_incoming(sender, text_body, message_id=wamid)
-                            logger.info(f"Saved chat message {wamid} from {sender}")
-
-            # --- B. Handle Status Updates (Module 6) ---
-            if "statuses" in val:
-                for s in val.get("statuses", []):
-                    # Extract WAMID to match against ChatMessage
-                    wamid = s.get("id")
-                    status = s.get("status")
-                    error = None
-                    
-                    # Extract error details if present
-                    if "errors" in s:
-                        error = str(s.get("errors"))
-                    
-                    # Update the reliability tracking table
-                    status_svc.update_status(wamid, status, error)
-                    logger.info(f"Updated status for msg {wamid} to {status}")
+    # 2. Persist the whole payload in one batch (messages + status receipts)
+    WebhookService(db).ingest(payload)
 
     return {"status": "ok"}
\ No newline at end of file
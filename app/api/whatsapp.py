@@ -2,8 +2,8 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
-import httpx
 from app.core.config import settings
+from app.core.http_client import get_async_client
 
 router = APIRouter()
 
@@ -25,9 +25,7 @@ async def send_whatsapp_template(payload: WhatsAppTemplateSendIn):
     if not access_token or not phone_number_id:
         raise HTTPException(status_code=500, detail="Missing WhatsApp credentials in configuration.")
 
-    url = (
-        f"https://graph.facebook.com/v17.0/{phone_number_id}/messages"
-    )
+    url = f"{settings.WHATSAPP_API_BASE_URL}/{phone_number_id}/messages"
     headers = {
         "Authorization": f"Bearer {access_token}",
         "Content-Type": "application/json",
@@ -51,8 +49,7 @@ async def send_whatsapp_template(payload: WhatsAppTemplateSendIn):
         },
     }
     
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(url, headers=headers, json=data)
+    resp = await get_async_client().post(url, headers=headers, json=data)
     
     if resp.status_code != 200:
         raise HTTPException(status_code=resp.status_code, detail=resp.json())
@@ -0,0 +1,84 @@
+"""
+Embedding Backfill Command.
+Re-embeds chat_messages for a model with resumable, sharded checkpoints
+(see app/services/embedding_backfill.py). Re-running it resumes where it stopped.
+
+Usage:
+    python -m app.backfill_embeddings                        # Fan out shards to Celery
+    python -m app.backfill_embeddings --inline --workers 4   # Run 4 shard processes here
+    python -m app.backfill_embeddings --status [--model embed-multilingual-v3.0]
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import time
+from app.core.config import settings
+from app.core.logging import configure_logging
+from app.database import SessionLocal, engine
+from app.services.embedding_models import EmbeddingModelRegistry
+from app.services.embedding_backfill import EmbeddingBackfillService, RateLimited
+
+# Apply application-wide logging configuration (JSON format)
+configure_logging()
+logger = logging.getLogger("backfill_embeddings")
+
+def run_shard(shard_id: int, shard_count: int, chunk_size: int):
+    """Runs one shard to completion, sleeping through rate limits."""
+    while True:
+        db = SessionLocal()
+        try:
+            EmbeddingBackfillService(db).run_shard(shard_id, chunk_size=chunk_size, shard_count=shard_count)
+            return
+        except RateLimited as e:
+            logger.warning(f"Shard {shard_id}: {e}")
+            time.sleep(e.retry_after)
+        finally:
+            db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable embedding backfill")
+    parser.add_argument("--model", help="Target embedding model version (default: the active model)")
+    parser.add_argument("--workers", type=int, default=settings.EMBED_BACKFILL_WORKERS, help="Number of shards")
+    parser.add_argument("--chunk", type=int, default=settings.EMBED_BACKFILL_CHUNK_SIZE, help="Messages per checkpoint")
+    parser.add_argument("--inline", action="store_true", help="Run shards in local processes instead of Celery")
+    parser.add_argument("--status", action="store_true", help="Print progress and exit")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        args.model = args.model or EmbeddingModelRegistry(db).active()[0]
+        svc = EmbeddingBackfillService(db)
+        if args.status:
+            print(json.dumps(svc.progress(args.model), indent=2))
+            return
+        shard_ids = [s.id for s in svc.plan(args.model, args.workers)]
+    finally:
+        db.close()
+
+    if not shard_ids:
+        logger.info(f"Backfill {args.model}: nothing to do.")
+        return
+
+    if not args.inline:
+        from app.tasks.vector_tasks import backfill_embeddings_shard
+        for shard_id in shard_ids:
+            backfill_embeddings_shard.delay(shard_id, len(shard_ids))
+        logger.info(f"Backfill {args.model}: dispatched {len(shard_ids)} shards to Celery.")
+        return
+
+    # Forked children would inherit the pooled connection plan() used and share
+    # one server socket; drop it so each child opens its own
+    engine.dispose()
+
+    procs = [
+        multiprocessing.Process(target=run_shard, args=(shard_id, len(shard_ids), args.chunk))
+        for shard_id in shard_ids
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import json
 import logging
 from typing import Optional, Any
 import redis.asyncio as redis
+from redis import Redis as SyncRedis
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -16,6 +17,22 @@ redis_client = redis.Redis(
     decode_responses=True # Automatically decode bytes to strings
 )
 
+# Blocking client for Celery tasks and standalone workers (no event loop there)
+sync_redis_client = SyncRedis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=0,
+    decode_responses=True
+)
+
+# Same server, raw bytes in and out (packed vectors, see app/core/embedding_cache.py)
+sync_redis_binary_client = SyncRedis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=0,
+    decode_responses=False
+)
+
 async def get_cache(key: str) -> Optional[Any]:
     """Retrieve data from Redis by key."""
     try:
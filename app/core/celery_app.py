@@ -20,6 +20,16 @@ celery_app.conf.update(
     broker_connection_retry_on_startup=True,
 )
 
+# AI stages get their own queues so each can be scaled (and fail) on its own:
+# sentiment is CPU-bound, embedding waits on Cohere. Workers started without
+# -Q consume only the default "celery" queue.
+celery_app.conf.task_routes = {
+    "analyze_sentiment": {"queue": "ai_sentiment"},
+    "score_pending_sentiment": {"queue": "ai_sentiment"},
+    "embed_messages": {"queue": "ai_embed"},
+    "flush_embedding_queue": {"queue": "ai_embed"},
+}
+
 # 3. Auto-discover tasks
 celery_app.conf.imports = [
     "app.tasks.email_tasks",
@@ -27,6 +37,7 @@ celery_app.conf.imports = [
     "app.tasks.ai_tasks",
     "app.tasks.scheduler",
     "app.tasks.retry_tasks", # <--- NEW: Import the retry worker
+    "app.tasks.vector_tasks",
 ]
 
 # 4. Beat Schedule (Periodic Tasks)
@@ -41,4 +52,24 @@ celery_app.conf.beat_schedule = {
         "task": "retry_failed_bulk_messages",
         "schedule": 300.0, 
     },
+    # Fails uploaded bulk jobs whose import died with its API process
+    "fail-stale-imports-every-5-min": {
+        "task": "fail_stale_imports",
+        "schedule": 300.0,
+    },
+    # Closes out bulk messages left 'sending' by a worker that died mid-chunk
+    "fail-stale-sends-every-5-min": {
+        "task": "fail_stale_sends",
+        "schedule": 300.0,
+    },
+    # Safety net for the embedding micro-batcher (normally flushed by size/countdown)
+    "flush-embedding-queue-every-30s": {
+        "task": "flush_embedding_queue",
+        "schedule": 30.0,
+    },
+    # Scores messages the per-message AI task missed, in batches
+    "score-pending-sentiment-every-5-min": {
+        "task": "score_pending_sentiment",
+        "schedule": 300.0,
+    },
 }
\ No newline at end of file
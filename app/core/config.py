@@ -30,6 +30,106 @@ class Settings(BaseSettings):
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
 
+    # --- Webhook Ingestion ---
+    # "inline": parse and persist inside the request (default).
+    # "stream": verify the signature, append the raw body to a Redis Stream and
+    # return immediately. Run `python -m app.stream_worker` to drain the stream.
+    WEBHOOK_INGEST_MODE: str = "inline"
+    WEBHOOK_STREAM_KEY: str = "whatsapp:webhooks"
+    WEBHOOK_STREAM_GROUP: str = "webhook-ingest"
+    # Acked entries are kept this long for replay, then trimmed by the workers.
+    # Unacked entries are never trimmed.
+    WEBHOOK_STREAM_RETENTION_HOURS: int = 24
+    WEBHOOK_STREAM_TRIM_INTERVAL_SECONDS: int = 60
+    # Stream length that logs an error / flips over_alert_length on /ops (not a cap)
+    WEBHOOK_STREAM_ALERT_LENGTH: int = 1_000_000
+    WEBHOOK_STREAM_BATCH_SIZE: int = 100
+    # Entries pending longer than this are reclaimed from crashed consumers
+    WEBHOOK_STREAM_CLAIM_IDLE_MS: int = 60_000
+    # Deliveries before a poison entry is moved to the dead-letter stream
+    WEBHOOK_STREAM_MAX_DELIVERIES: int = 5
+    STREAM_WORKER_METRICS_PORT: int = 9101
+
+    # --- Chat Conversations ---
+    # Messages within this window of the last one join the same conversation.
+    CONVERSATION_WINDOW_MINUTES: int = 30
+    # Per-process LRU of number -> active conversation; optional Redis tier shared by workers
+    CONVERSATION_CACHE_SIZE: int = 10_000
+    CONVERSATION_CACHE_REDIS: bool = False
+
+    # --- Embeddings ---
+    # Bootstrap model; once models are registered the active one lives in embedding_models
+    EMBED_MODEL: str = "embed-english-v3.0"
+    EMBED_ACTIVE_MODEL_TTL_SECONDS: int = 30
+    # Content-hash cache of vectors: per-process LRU plus an optional Redis tier
+    EMBED_CACHE_SIZE: int = 5_000
+    EMBED_CACHE_REDIS: bool = False
+    EMBED_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    # "inline": embed inside the AI task (one Cohere call per task).
+    # "queue": AI tasks push message IDs to a Redis list and a flush task embeds
+    # up to EMBED_BATCH_SIZE of them per Cohere call.
+    EMBED_MODE: str = "inline"
+    EMBED_QUEUE_KEY: str = "embed:queue"
+    # Flush as soon as this many IDs are queued (Cohere accepts at most 96 per call)
+    EMBED_BATCH_SIZE: int = 96
+    # ...or this long after the first ID landed in an empty queue
+    EMBED_BATCH_MAX_WAIT_MS: int = 500
+    # Backfills: messages per checkpoint, and the Cohere call budget shared by all
+    # backfill shards (leave headroom for live traffic under the account limit)
+    EMBED_BACKFILL_CHUNK_SIZE: int = 960
+    EMBED_BACKFILL_WORKERS: int = 4
+    EMBED_RATE_LIMIT_PER_MINUTE: int = 1000
+    # A 'running' shard whose checkpoint hasn't moved for this long is
+    # considered dead, and a new backfill run may take it over
+    EMBED_BACKFILL_STALE_MINUTES: int = 15
+
+    # --- Vector Search ---
+    # Keep scanning the HNSW graph until filtered searches fill their LIMIT.
+    # Requires pgvector >= 0.8; disable on older servers.
+    VECTOR_ITERATIVE_SCAN: bool = True
+    # HNSW candidate list size when the caller doesn't pass ef_search (pgvector's
+    # default). Always raised to the query's LIMIT, or HNSW returns fewer rows.
+    VECTOR_HNSW_EF_SEARCH: int = 40
+
+    # --- Sentiment ---
+    SENTIMENT_MODEL: str = "distilbert-base-uncased-finetuned-sst-2-english"
+    # Inference backend: "torch", "onnx", "onnx-int8" (needs optimum[onnxruntime])
+    # or "remote" (the shared inference server below)
+    SENTIMENT_BACKEND: str = "torch"
+    # Where ONNX exports are cached (next to the HF_HOME model cache)
+    SENTIMENT_ONNX_DIR: str = "/tmp/huggingface/onnx"
+    # Shared inference server (python -m app.inference_server). Workers use it
+    # with SENTIMENT_BACKEND=remote; the server runs SENTIMENT_SERVER_BACKEND.
+    SENTIMENT_SOCKET_PATH: str = "/tmp/sentiment.sock"
+    SENTIMENT_SERVER_BACKEND: str = "torch"
+    SENTIMENT_SERVER_MAX_WAIT_MS: int = 10
+    # Texts queued in the server before it answers "busy"
+    SENTIMENT_SERVER_MAX_PENDING: int = 1024
+    SENTIMENT_SERVER_METRICS_PORT: int = 9102
+    # Requests a worker process keeps in flight before submit() blocks
+    SENTIMENT_CLIENT_MAX_INFLIGHT: int = 8
+    SENTIMENT_CLIENT_TIMEOUT_SECONDS: float = 30.0
+    # Models Celery workers load at process start (comma-separated, e.g.
+    # "sentiment"); empty loads on the first task instead.
+    MODEL_WARMUP: str = "sentiment"
+    # Texts per forward pass (see benchmarks/bench_sentiment.py) and token cap
+    SENTIMENT_BATCH_SIZE: int = 32
+    SENTIMENT_MAX_TOKENS: int = 512
+    # Unscored messages claimed per sweep
+    SENTIMENT_SWEEP_LIMIT: int = 512
+
+    # --- Outbound HTTP (app/core/http_client.py) ---
+    # Pooled keep-alive connections shared by every integration (Cohere, Meta).
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_KEEPALIVE_SECONDS: float = 60.0
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP_TIMEOUT_SECONDS: float = 20.0
+    # Longest a sync request waits for a free pooled connection before failing
+    HTTP_POOL_TIMEOUT_SECONDS: float = 10.0
+    # Async client only, and only when the h2 package is installed
+    HTTP_HTTP2: bool = True
+
     # --- Authentication (JWT) ---
     # Used to sign and verify JWT tokens for user login.
     JWT_SECRET_KEY: str
@@ -41,6 +141,39 @@ class Settings(BaseSettings):
     WHATSAPP_APP_SECRET: str
     WHATSAPP_TOKEN: str
     WHATSAPP_PHONE_NUMBER_ID: str
+    # Tenant that owns WHATSAPP_PHONE_NUMBER_ID: inbound conversations (and so
+    # their embeddings) belong to it. Unset, they have no tenant and are
+    # invisible to tenant-scoped vector search.
+    WHATSAPP_TENANT_ID: Optional[int] = None
+    WHATSAPP_API_BASE_URL: str = "https://graph.facebook.com/v17.0"
+
+    # --- Bulk Messaging ---
+    # Send rate per phone-number-id (token bucket in Redis, shared by every
+    # worker) and its burst size. On 429s
+    # the rate halves (down to the minimum) and creeps back up on successes.
+    BULK_SEND_RATE_PER_SECOND: float = 80.0
+    BULK_SEND_BURST: int = 20
+    BULK_SEND_MIN_RATE_PER_SECOND: float = 5.0
+    # Sends in flight per job, and recipients loaded (and committed) at once
+    BULK_SEND_CONCURRENCY: int = 32
+    BULK_SEND_CHUNK_SIZE: int = 500
+    # Tries per message within a run (throttled tries included)
+    BULK_SEND_MAX_ATTEMPTS: int = 3
+    # Messages still 'sending' this long after being claimed belong to a dead
+    # worker; they may have gone out, so they are failed rather than resent
+    BULK_SENDING_TIMEOUT_MINUTES: int = 15
+    # Celery splits a job into at most BULK_SHARDS id ranges (parallel tasks)
+    # of at least BULK_SHARD_MIN_SIZE messages; they draw from the number's
+    # shared send-rate bucket, so free workers speed a job up to that rate.
+    BULK_SHARDS: int = 8
+    BULK_SHARD_MIN_SIZE: int = 2000
+    # Recipients per COPY when loading a job's number list
+    BULK_INGEST_CHUNK_SIZE: int = 10000
+    # Largest recipient file accepted by /bulk/jobs/upload
+    BULK_UPLOAD_MAX_BYTES: int = 200 * 1024 * 1024
+    # Uploaded jobs still 'importing' this long after creation are failed (the
+    # API process running the import died); a max-size file loads in minutes
+    BULK_IMPORT_TIMEOUT_MINUTES: int = 30
 
     # --- Email Integration (SendGrid) ---
     # Optional: If not provided, email features will be disabled or log-only.
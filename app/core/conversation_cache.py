@@ -0,0 +1,122 @@
+"""
+Module: Conversation Window Cache
+Context: Pod C - Module 3 (Chat Ingestion).
+
+Caches customer_number -> (conversation_id, last_message_at) so inbound
+messages in an active chat can skip the conversation lookup query.
+
+Correctness: an entry is only served while its last_message_at is inside the
+caller's window. last_message_at only ever moves forward, so a cached entry
+that is still inside the window always points at the active conversation;
+once the window lapses the entry is treated as a miss and the DB decides
+(usually by opening a new conversation).
+
+Tiers:
+1. Local: bounded LRU per process (always on).
+2. Redis: optional, shared across web/stream workers (CONVERSATION_CACHE_REDIS).
+   Keys expire together with the window.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from redis import Redis
+from app.core.config import settings
+from app.metrics.prometheus import CONVERSATION_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+class ConversationWindowCache:
+    def __init__(self, maxsize: int, ttl_seconds: int, redis_client: Redis | None = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.redis = redis_client
+        self._entries: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(number: str) -> str:
+        return f"convo:window:{number}"
+
+    def get(self, number: str, cutoff: datetime) -> int | None:
+        """
+        Returns the cached conversation ID if its last message is newer than cutoff.
+        """
+        cutoff_ts = cutoff.timestamp()
+
+        # 1. Local tier
+        with self._lock:
+            entry = self._entries.get(number)
+            if entry:
+                if entry[1] > cutoff_ts:
+                    self._entries.move_to_end(number)
+                    CONVERSATION_CACHE_LOOKUPS.labels(tier="local", outcome="hit").inc()
+                    return entry[0]
+                # Window lapsed: drop it so the DB path decides
+                del self._entries[number]
+
+        # 2. Shared tier
+        if self.redis is not None:
+            try:
+                raw = self.redis.get(self._key(number))
+            except Exception as e:
+                logger.error(f"Redis GET error (conversation cache): {e}")
+                raw = None
+            if raw:
+                convo_id, ts = raw.split(":", 1)
+                if float(ts) > cutoff_ts:
+                    self._put_local(number, int(convo_id), float(ts))
+                    CONVERSATION_CACHE_LOOKUPS.labels(tier="redis", outcome="hit").inc()
+                    return int(convo_id)
+
+        CONVERSATION_CACHE_LOOKUPS.labels(tier="all", outcome="miss").inc()
+        return None
+
+    def put_many(self, entries: dict[str, int], last_message_at: datetime):
+        """
+        Records conversations that just received a message.
+        Call only after the transaction that wrote them has committed.
+        """
+        ts = last_message_at.timestamp()
+        for number, convo_id in entries.items():
+            self._put_local(number, convo_id, ts)
+
+        if self.redis is not None and entries:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for number, convo_id in entries.items():
+                    pipe.set(self._key(number), f"{convo_id}:{ts}", ex=self.ttl_seconds)
+                pipe.execute()
+            except Exception as e:
+                logger.error(f"Redis SET error (conversation cache): {e}")
+
+    def _put_local(self, number: str, convo_id: int, ts: float):
+        with self._lock:
+            current = self._entries.get(number)
+            # Never replace a newer entry written by a concurrent request
+            if current and current[1] > ts:
+                return
+            self._entries[number] = (convo_id, ts)
+            self._entries.move_to_end(number)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drops the local tier (Redis keys expire on their own)."""
+        with self._lock:
+            self._entries.clear()
+
+def _build_cache() -> ConversationWindowCache:
+    redis_client = None
+    if settings.CONVERSATION_CACHE_REDIS:
+        from app.core.cache import sync_redis_client
+        redis_client = sync_redis_client
+    return ConversationWindowCache(
+        maxsize=settings.CONVERSATION_CACHE_SIZE,
+        ttl_seconds=settings.CONVERSATION_WINDOW_MINUTES * 60,
+        redis_client=redis_client,
+    )
+
+# Process-wide instance shared by every ChatService
+conversation_cache = _build_cache()
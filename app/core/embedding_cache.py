@@ -0,0 +1,128 @@
+"""
+Module: Embedding Cache
+Context: Pod C - Module 4 (AI).
+
+Content-addressed cache of Cohere embeddings so repeated texts ("hi",
+"price?", template replies, forwarded broadcasts) skip the API call.
+
+Key: sha256(model | input_type | normalized text). Normalization applies
+NFKC, casefolds and collapses whitespace, so "Hi " and "hi" share a vector.
+Changing EMBED_MODEL changes every key, so vectors never leak across models.
+
+Tiers:
+1. Local: bounded LRU per process (always on).
+2. Redis: optional (EMBED_CACHE_REDIS). Vectors are stored as packed
+   little-endian float32 bytes (4 KB for 1024 dims) instead of JSON.
+"""
+
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+from redis import Redis
+from app.core.config import settings
+from app.metrics.prometheus import EMBED_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+def embedding_key(model: str, input_type: str, text: str) -> str:
+    digest = hashlib.sha256(f"{model}|{input_type}|{normalize_text(text)}".encode("utf-8")).hexdigest()
+    return f"embed:v1:{digest}"
+
+def pack_vector(vector: list[float]) -> bytes:
+    return np.asarray(vector, dtype="<f4").tobytes()
+
+def unpack_vector(raw: bytes) -> list[float]:
+    return np.frombuffer(raw, dtype="<f4").tolist()
+
+class EmbeddingCache:
+    def __init__(self, maxsize: int, ttl_seconds: int, redis_client: Redis | None = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.redis = redis_client
+        self._entries: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        """
+        Returns the cached vectors for the given keys (misses are omitted).
+        """
+        found: dict[str, list[float]] = {}
+
+        # 1. Local tier
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+        if found:
+            EMBED_CACHE_LOOKUPS.labels(tier="local", outcome="hit").inc(len(found))
+
+        # 2. Shared tier (one MGET for all local misses)
+        remaining = [k for k in keys if k not in found]
+        if self.redis is not None and remaining:
+            try:
+                raws = self.redis.mget(remaining)
+            except Exception as e:
+                logger.error(f"Redis MGET error (embedding cache): {e}")
+                raws = [None] * len(remaining)
+
+            redis_hits = 0
+            for key, raw in zip(remaining, raws):
+                if raw:
+                    vector = unpack_vector(raw)
+                    self._put_local(key, vector)
+                    found[key] = vector
+                    redis_hits += 1
+            if redis_hits:
+                EMBED_CACHE_LOOKUPS.labels(tier="redis", outcome="hit").inc(redis_hits)
+
+        misses = len(keys) - len(found)
+        if misses:
+            EMBED_CACHE_LOOKUPS.labels(tier="all", outcome="miss").inc(misses)
+        return found
+
+    def put_many(self, vectors: dict[str, list[float]]):
+        for key, vector in vectors.items():
+            self._put_local(key, vector)
+
+        if self.redis is not None and vectors:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for key, vector in vectors.items():
+                    pipe.set(key, pack_vector(vector), ex=self.ttl_seconds)
+                pipe.execute()
+            except Exception as e:
+                logger.error(f"Redis SET error (embedding cache): {e}")
+
+    def _put_local(self, key: str, vector: list[float]):
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drops the local tier (Redis keys expire on their own)."""
+        with self._lock:
+            self._entries.clear()
+
+def _build_cache() -> EmbeddingCache:
+    redis_client = None
+    if settings.EMBED_CACHE_REDIS:
+        from app.core.cache import sync_redis_binary_client
+        redis_client = sync_redis_binary_client
+    return EmbeddingCache(
+        maxsize=settings.EMBED_CACHE_SIZE,
+        ttl_seconds=settings.EMBED_CACHE_TTL_SECONDS,
+        redis_client=redis_client,
+    )
+
+# Process-wide instance shared by every EmbeddingService
+embedding_cache = _build_cache()
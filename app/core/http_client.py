@@ -0,0 +1,196 @@
+# app/core/http_client.py
+"""
+Module: Shared HTTP Clients
+Context: Core - outbound integrations (Cohere, Meta Graph API).
+
+One pooled client per process instead of a new connection (TCP + TLS
+handshake) per call:
+
+- get_session(): a requests.Session for sync code (services, Celery tasks).
+  Keeps up to HTTP_MAX_CONNECTIONS_PER_HOST keep-alive connections per host
+  and blocks when they are all busy instead of opening throwaway ones, for at
+  most HTTP_POOL_TIMEOUT_SECONDS; after that the call fails with
+  requests.exceptions.ConnectTimeout (logged as pool overflow).
+- get_async_client(): an httpx.AsyncClient for the API process, created in
+  the app lifespan. Speaks HTTP/2 when the h2 package is installed
+  (httpx[http2]), which multiplexes requests over one connection per host.
+  httpx only has a global limit (HTTP_MAX_CONNECTIONS).
+
+Both apply the connect/read timeouts from settings when the caller passes
+none. Sessions are per process: a child forked by Celery builds its own on
+worker init (sockets must not be shared across a fork).
+
+Metrics: requests by host/outcome, requests in flight per client, and new
+connections per host. Opened connections staying well below requests means
+keep-alive is working.
+"""
+
+import importlib.util
+import logging
+import os
+import time
+from urllib.parse import urlsplit
+import httpx
+import requests
+from celery.signals import worker_process_init
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import EmptyPoolError
+from app.core.config import settings
+from app.metrics.prometheus import (
+    HTTP_CLIENT_CONNECTIONS_OPENED,
+    HTTP_CLIENT_IN_FLIGHT,
+    HTTP_CLIENT_REQUESTS,
+    HTTP_CLIENT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_async_client: httpx.AsyncClient | None = None
+
+def _outcome(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+# --- Sync (requests) ---
+
+class _MeteredPool:
+    """Counts new connections; bounds the wait for a free one (requests passes no pool timeout)."""
+
+    def _new_conn(self):
+        HTTP_CLIENT_CONNECTIONS_OPENED.labels(client="sync", host=self.host).inc()
+        return super()._new_conn()
+
+    def _get_conn(self, timeout=None):
+        return super()._get_conn(timeout=settings.HTTP_POOL_TIMEOUT_SECONDS if timeout is None else timeout)
+
+class _MeteredHTTPConnectionPool(_MeteredPool, HTTPConnectionPool):
+    pass
+
+class _MeteredHTTPSConnectionPool(_MeteredPool, HTTPSConnectionPool):
+    pass
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter with metered pools and default timeouts."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _MeteredHTTPConnectionPool,
+            "https": _MeteredHTTPSConnectionPool,
+        }
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = (settings.HTTP_CONNECT_TIMEOUT_SECONDS, settings.HTTP_TIMEOUT_SECONDS)
+        elif not isinstance(timeout, tuple):
+            timeout = (min(settings.HTTP_CONNECT_TIMEOUT_SECONDS, timeout), timeout)
+
+        host = urlsplit(request.url).hostname or ""
+        in_flight = HTTP_CLIENT_IN_FLIGHT.labels(client="sync")
+        in_flight.inc()
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = super().send(request, timeout=timeout, **kwargs)
+            outcome = _outcome(response.status_code)
+            return response
+        except EmptyPoolError as e:
+            logger.warning(f"HTTP pool for {host} exhausted: no free connection within "
+                           f"{settings.HTTP_POOL_TIMEOUT_SECONDS}s.")
+            raise requests.exceptions.ConnectTimeout(e, request=request)
+        finally:
+            in_flight.dec()
+            HTTP_CLIENT_SECONDS.labels(client="sync", host=host).observe(time.perf_counter() - started)
+            HTTP_CLIENT_REQUESTS.labels(client="sync", host=host, outcome=outcome).inc()
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = PooledAdapter(
+        pool_connections=settings.HTTP_MAX_CONNECTIONS // settings.HTTP_MAX_CONNECTIONS_PER_HOST or 1,
+        pool_maxsize=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+        pool_block=True,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_session() -> requests.Session:
+    """The process-wide pooled requests.Session (rebuilt after a fork)."""
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        # An inherited session's sockets belong to the parent; drop, don't close
+        _session, _session_pid = _build_session(), os.getpid()
+    return _session
+
+def close_session():
+    global _session, _session_pid
+    if _session is not None and _session_pid == os.getpid():
+        _session.close()
+    _session = _session_pid = None
+
+@worker_process_init.connect
+def init_worker_session(**kwargs):
+    """Each Celery child starts with its own pool."""
+    get_session()
+
+# --- Async (httpx) ---
+
+def http2_available() -> bool:
+    return settings.HTTP_HTTP2 and importlib.util.find_spec("h2") is not None
+
+class MeteredAsyncTransport(httpx.AsyncHTTPTransport):
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+
+        async def trace(event: str, info: dict):
+            if event == "connection.connect_tcp.complete":
+                HTTP_CLIENT_CONNECTIONS_OPENED.labels(client="async", host=host).inc()
+
+        request.extensions = {**request.extensions, "trace": trace}
+        in_flight = HTTP_CLIENT_IN_FLIGHT.labels(client="async")
+        in_flight.inc()
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await super().handle_async_request(request)
+            outcome = _outcome(response.status_code)
+            return response
+        finally:
+            in_flight.dec()
+            HTTP_CLIENT_SECONDS.labels(client="async", host=host).observe(time.perf_counter() - started)
+            HTTP_CLIENT_REQUESTS.labels(client="async", host=host, outcome=outcome).inc()
+
+def build_async_client() -> httpx.AsyncClient:
+    """
+    A new pooled AsyncClient. For code that runs its own event loop (e.g.
+    a bulk send inside a Celery task); the caller closes it.
+    """
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_SECONDS,
+    )
+    return httpx.AsyncClient(
+        transport=MeteredAsyncTransport(http2=http2_available(), limits=limits),
+        timeout=httpx.Timeout(settings.HTTP_TIMEOUT_SECONDS, connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS),
+    )
+
+def get_async_client() -> httpx.AsyncClient:
+    """The process-wide pooled httpx.AsyncClient (created by the app lifespan)."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = build_async_client()
+    return _async_client
+
+async def start_async_client():
+    client = get_async_client()
+    logger.info(f"HTTP client pool ready (HTTP/2: {http2_available()}).")
+    return client
+
+async def close_async_client():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+    _async_client = None
@@ -0,0 +1,73 @@
+"""
+Module: Lazy Model Registry
+Context: Pod C - Module 5 (AI Sentiment).
+
+Holds in-process ML models that are expensive to import and load (torch +
+transformers weights are ~250MB of RSS and several seconds of startup).
+
+Services register a loader at import time, which costs nothing; the model is
+loaded on the first get() in the process that actually runs inference. The
+web process imports the sentiment service through ChatService -> ai_tasks
+but never calls it, so it never pays for torch.
+
+Celery workers can load models up front with warmup() (see MODEL_WARMUP) so
+the first task doesn't absorb the load time.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+class LazyModelRegistry:
+    def __init__(self):
+        self._loaders: dict[str, Callable[[], Any]] = {}
+        self._models: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        self._loaders[name] = loader
+
+    def get(self, name: str) -> Any:
+        """
+        Returns the model, loading it on first use (once per process, even
+        with concurrent callers). A failed load is remembered as None so
+        callers degrade instead of retrying the load on every message.
+        """
+        if name in self._models:
+            return self._models[name]
+
+        with self._lock:
+            if name not in self._models:
+                loader = self._loaders[name]
+                started = time.perf_counter()
+                try:
+                    self._models[name] = loader()
+                    logger.info(f"Model '{name}' loaded in {time.perf_counter() - started:.1f}s.")
+                except Exception as e:
+                    logger.error(f"Failed to load model '{name}': {e}")
+                    self._models[name] = None
+            return self._models[name]
+
+    def warmup(self, names: list[str] | None = None):
+        """Loads the given models (default: all registered) now."""
+        for name in names if names is not None else list(self._loaders):
+            if name in self._loaders:
+                self.get(name)
+            else:
+                logger.warning(f"Warmup skipped unknown model '{name}'.")
+
+    def loaded(self) -> list[str]:
+        return [name for name, model in self._models.items() if model is not None]
+
+    def reset(self, name: str | None = None):
+        """Forgets loaded models (all, or one) so the next get() reloads."""
+        with self._lock:
+            if name is None:
+                self._models.clear()
+            else:
+                self._models.pop(name, None)
+
+model_registry = LazyModelRegistry()
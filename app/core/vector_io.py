@@ -0,0 +1,138 @@
+"""
+Module: Vector I/O
+Context: Pod C - Module 4 (AI).
+
+Serialization of embeddings between Python and pgvector.
+
+psycopg2 only sends text parameters, so query vectors still travel as a
+literal; vector_literal() makes it float32-exact and ~40% shorter than
+str(list) (13.9 KB vs 22.5 KB at 1024 dims) in half the CPU time. Bulk writes
+skip text entirely: copy_embeddings() streams pgvector's binary format via
+COPY ... (FORMAT BINARY), which is 4 KB per vector and ~25x cheaper to encode.
+
+See benchmarks/bench_vector_io.py for the numbers.
+"""
+
+import io
+import struct
+from datetime import datetime, timezone
+from typing import Iterable
+import numpy as np
+from pgvector.sqlalchemy import Vector
+from pgvector.utils import to_db_binary
+from sqlalchemy.orm import Session
+
+# COPY BINARY framing (see the PostgreSQL COPY docs, "Binary Format")
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+COPY_TRAILER = struct.pack(">h", -1)
+PG_EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+# message_embeddings columns written by copy_embeddings, in stream order
+COPY_COLUMNS = ("message_id", "embedding", "model_version", "tenant_id", "conversation_id",
+                "from_number", "message_created_at")
+
+def vector_literal(vector) -> str:
+    """
+    Shortest text literal that round-trips every float32 component exactly
+    (9 significant digits), without the spaces of str(list).
+    """
+    return "[" + ",".join(f"{x:.9g}" for x in np.asarray(vector, dtype=np.float32).tolist()) + "]"
+
+class CompactVector(Vector):
+    """
+    pgvector column type that binds with vector_literal() instead of str(float).
+    Same DDL as Vector, so swapping it in needs no migration.
+    """
+    cache_ok = True
+
+    def bind_processor(self, dialect):
+        def process(value):
+            if value is None:
+                return None
+            if self.dim is not None and len(value) != self.dim:
+                raise ValueError(f"expected {self.dim} dimensions, not {len(value)}")
+            return vector_literal(value)
+        return process
+
+def _field(value: bytes | None) -> bytes:
+    if value is None:
+        return struct.pack(">i", -1)
+    return struct.pack(">i", len(value)) + value
+
+def _text(value: str | None) -> bytes | None:
+    return None if value is None else value.encode("utf-8")
+
+def _int4(value: int | None) -> bytes | None:
+    return None if value is None else struct.pack(">i", value)
+
+def _timestamptz(value: datetime | None) -> bytes | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - PG_EPOCH
+    micros = (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return struct.pack(">q", micros)
+
+def encode_copy_rows(rows: Iterable[dict]) -> io.BytesIO:
+    """
+    Encodes embedding rows (keys: COPY_COLUMNS; embedding as a float sequence)
+    into a COPY BINARY stream.
+    """
+    buf = io.BytesIO()
+    buf.write(COPY_SIGNATURE)
+    ncols = struct.pack(">h", len(COPY_COLUMNS))
+    for row in rows:
+        buf.write(ncols)
+        buf.write(_field(_int4(row["message_id"])))
+        buf.write(_field(to_db_binary(row["embedding"])))
+        buf.write(_field(_text(row.get("model_version"))))
+        buf.write(_field(_int4(row.get("tenant_id"))))
+        buf.write(_field(_int4(row.get("conversation_id"))))
+        buf.write(_field(_text(row.get("from_number"))))
+        buf.write(_field(_timestamptz(row.get("message_created_at"))))
+    buf.write(COPY_TRAILER)
+    buf.seek(0)
+    return buf
+
+def copy_embeddings(db: Session, rows: list[dict]) -> int:
+    """
+    Bulk-loads embedding rows with binary COPY into a session temp table
+    (created once per connection, emptied on commit), then moves them into
+    message_embeddings with ON CONFLICT DO NOTHING (COPY itself can't skip
+    duplicates). Runs in the caller's transaction.
+
+    Returns:
+        int: Number of rows inserted.
+    """
+    if not rows:
+        return 0
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS message_embeddings_stage (
+                message_id integer,
+                embedding vector,
+                model_version text,
+                tenant_id integer,
+                conversation_id integer,
+                from_number text,
+                message_created_at timestamptz
+            ) ON COMMIT DELETE ROWS
+        """)
+        cursor.copy_expert(
+            f"COPY message_embeddings_stage ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT BINARY)",
+            encode_copy_rows(rows),
+        )
+        cursor.execute(f"""
+            INSERT INTO message_embeddings ({', '.join(COPY_COLUMNS)}, created_at)
+            SELECT {', '.join(COPY_COLUMNS)}, now() FROM message_embeddings_stage
+            ON CONFLICT (message_id, model_version) DO NOTHING
+        """)
+        inserted = cursor.rowcount
+        # Keep the stage empty for the next batch in this transaction
+        cursor.execute("TRUNCATE message_embeddings_stage")
+        return inserted
+    finally:
+        cursor.close()
@@ -0,0 +1,183 @@
+"""
+Sentiment Inference Server.
+Holds the one copy of the sentiment model for every Celery worker on the
+host and serves it over a Unix socket (see app/services/inference_client.py
+for the wire format).
+
+Requests from all connections go into one queue. A batcher takes up to
+SENTIMENT_BATCH_SIZE texts (waiting at most SENTIMENT_SERVER_MAX_WAIT_MS for
+a batch to fill) and runs them in a single forward pass on one inference
+thread. Once SENTIMENT_SERVER_MAX_PENDING texts are waiting, new requests
+get an immediate "busy" answer instead of growing the queue; an idle server
+accepts any request, however large, so an oversized one can't be refused
+forever.
+
+Workers use it with SENTIMENT_BACKEND=remote, so Celery concurrency can be
+raised for I/O-bound tasks without adding model copies.
+
+Usage:
+    python -m app.inference_server [--socket /tmp/sentiment.sock] [--backend onnx-int8]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from prometheus_client import start_http_server
+from app.core.config import settings
+from app.core.logging import configure_logging
+from app.metrics.prometheus import INFERENCE_BATCH_SIZE, INFERENCE_PENDING, INFERENCE_REQUESTS
+from app.services.inference_client import FRAME_HEADER, decode_length, encode_frame
+
+# Apply application-wide logging configuration (JSON format)
+configure_logging()
+logger = logging.getLogger("inference_server")
+
+@dataclass
+class InferenceJob:
+    texts: list[str]
+    future: asyncio.Future
+
+class InferenceServer:
+    def __init__(self, pipeline, socket_path: str, batch_size: int | None = None,
+                 max_wait_ms: int | None = None, max_pending: int | None = None):
+        self.pipeline = pipeline
+        self.socket_path = socket_path
+        self.batch_size = batch_size or settings.SENTIMENT_BATCH_SIZE
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else settings.SENTIMENT_SERVER_MAX_WAIT_MS) / 1000
+        self.max_pending = max_pending or settings.SENTIMENT_SERVER_MAX_PENDING
+        self.pending = 0
+        self.queue: asyncio.Queue[InferenceJob] = asyncio.Queue()
+        self.connections: set[asyncio.Task] = set()
+        # One thread: the model is the shared resource, torch parallelizes inside it
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+
+    def _infer(self, texts: list[str]) -> list[dict]:
+        results = self.pipeline(
+            texts, batch_size=self.batch_size, truncation=True, max_length=settings.SENTIMENT_MAX_TOKENS
+        )
+        return [{"label": r["label"], "score": float(r["score"])} for r in results]
+
+    async def batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            jobs = [await self.queue.get()]
+            count = len(jobs[0].texts)
+            deadline = loop.time() + self.max_wait
+            while count < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    job = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                jobs.append(job)
+                count += len(job.texts)
+
+            texts = [t for job in jobs for t in job.texts]
+            INFERENCE_BATCH_SIZE.observe(len(texts))
+            try:
+                results = await loop.run_in_executor(self.executor, self._infer, texts)
+                offset = 0
+                for job in jobs:
+                    if not job.future.done():
+                        job.future.set_result(results[offset:offset + len(job.texts)])
+                    offset += len(job.texts)
+            except Exception as e:
+                logger.error(f"Inference failed for a batch of {len(texts)} texts: {e}")
+                for job in jobs:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+            finally:
+                self.pending -= count
+                INFERENCE_PENDING.set(self.pending)
+
+    async def _respond(self, writer: asyncio.StreamWriter, write_lock: asyncio.Lock,
+                       request_id, job: InferenceJob):
+        try:
+            response = {"id": request_id, "results": await job.future}
+            INFERENCE_REQUESTS.labels(outcome="ok").inc()
+        except Exception as e:
+            response = {"id": request_id, "error": str(e)}
+            INFERENCE_REQUESTS.labels(outcome="failed").inc()
+        async with write_lock:
+            writer.write(encode_frame(response))
+            await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        write_lock = asyncio.Lock()
+        tasks = set()
+        self.connections.add(asyncio.current_task())
+        try:
+            while True:
+                header = await reader.readexactly(FRAME_HEADER.size)
+                request = json.loads(await reader.readexactly(decode_length(header)))
+                request_id, texts = request.get("id"), request.get("texts") or []
+
+                if self.pending and self.pending + len(texts) > self.max_pending:
+                    INFERENCE_REQUESTS.labels(outcome="busy").inc()
+                    async with write_lock:
+                        writer.write(encode_frame({"id": request_id, "error": "inference server busy", "busy": True}))
+                        await writer.drain()
+                    continue
+
+                job = InferenceJob(texts=[str(t) for t in texts], future=loop.create_future())
+                self.pending += len(job.texts)
+                INFERENCE_PENDING.set(self.pending)
+                self.queue.put_nowait(job)
+
+                task = asyncio.create_task(self._respond(writer, write_lock, request_id, job))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # Client went away
+        except asyncio.CancelledError:
+            pass  # Server shutting down; end quietly (3.11 streams log cancelled handlers)
+        except ValueError as e:
+            logger.warning(f"Dropping client with a malformed frame: {e}")
+        finally:
+            self.connections.discard(asyncio.current_task())
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def serve(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # Stale socket from a previous run
+        server = await asyncio.start_unix_server(self.handle, path=self.socket_path)
+        os.chmod(self.socket_path, 0o660)
+        batcher = asyncio.create_task(self.batcher())
+        logger.info(f"Inference server listening on {self.socket_path}.")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in [batcher, *self.connections]:
+                task.cancel()
+            await asyncio.gather(batcher, *self.connections, return_exceptions=True)
+            self.executor.shutdown(wait=False)
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared sentiment inference server")
+    parser.add_argument("--socket", default=settings.SENTIMENT_SOCKET_PATH, help="Unix socket path")
+    parser.add_argument("--backend", default=settings.SENTIMENT_SERVER_BACKEND,
+                        help="Model backend: torch, onnx or onnx-int8")
+    args = parser.parse_args()
+
+    if args.backend == "remote":
+        parser.error("The server needs a local backend (torch, onnx or onnx-int8).")
+
+    from app.services.sentiment_backends import load_pipeline
+    pipeline = load_pipeline(args.backend)
+
+    if settings.SENTIMENT_SERVER_METRICS_PORT:
+        start_http_server(settings.SENTIMENT_SERVER_METRICS_PORT)
+
+    asyncio.run(InferenceServer(pipeline, args.socket).serve())
+
+if __name__ == "__main__":
+    main()
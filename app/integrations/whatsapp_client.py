@@ -1,26 +1,32 @@
 # app/integrations/whatsapp_client.py
 import requests
+import httpx
 import logging
 from app.core.config import settings
+from app.core.http_client import get_session
 
 logger = logging.getLogger(__name__)
 
-def send_template(to_number: str, template_name: str, language: str = "en_US", components: list = None):
-    """
-    Sends a WhatsApp template message using credentials from settings.
-    Used by the Bulk Service worker.
-    """
-    if not settings.WHATSAPP_TOKEN or not settings.WHATSAPP_PHONE_NUMBER_ID:
-        logger.error("WhatsApp credentials missing in settings.")
-        return {"error": "Missing credentials"}
+# Graph API error codes that mean "slow down" rather than "bad request"
+# (130429: throughput limit, 131056: pair rate limit, 80007: rate limit, 4: app call limit)
+THROTTLE_ERROR_CODES = {130429, 131056, 80007, 4}
 
-    url = f"https://graph.facebook.com/v17.0/{settings.WHATSAPP_PHONE_NUMBER_ID}/messages"
-    
-    headers = {
+class WhatsAppThrottled(Exception):
+    """The Cloud API asked us to slow down (HTTP 429 or a rate-limit error code)."""
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def messages_url(phone_number_id: str | None = None) -> str:
+    return f"{settings.WHATSAPP_API_BASE_URL}/{phone_number_id or settings.WHATSAPP_PHONE_NUMBER_ID}/messages"
+
+def auth_headers() -> dict:
+    return {
         "Authorization": f"Bearer {settings.WHATSAPP_TOKEN}",
         "Content-Type": "application/json"
     }
-    
+
+def template_payload(to_number: str, template_name: str, language: str = "en_US", components: list = None) -> dict:
     # Construct the component payload if parameters exist
     template_components = []
     if components:
@@ -31,7 +37,7 @@ def send_template(to_number: str, template_name: str, language: str = "en_US", c
             }
         ]
 
-    payload = {
+    return {
         "messaging_product": "whatsapp",
         "to": to_number,
         "type": "template",
@@ -42,10 +48,55 @@ def send_template(to_number: str, template_name: str, language: str = "en_US", c
         }
     }
 
+def throttle_error(status_code: int, headers, body) -> WhatsAppThrottled | None:
+    """WhatsAppThrottled if the response is a rate-limit answer, else None."""
+    code = body.get("error", {}).get("code") if isinstance(body, dict) else None
+    if status_code != 429 and code not in THROTTLE_ERROR_CODES:
+        return None
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
+        retry_after = float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        retry_after = None
+    return WhatsAppThrottled(f"Throttled by WhatsApp (HTTP {status_code}, code {code})", retry_after)
+
+def send_template(to_number: str, template_name: str, language: str = "en_US", components: list = None):
+    """
+    Sends a WhatsApp template message using credentials from settings.
+    Used by the retry worker; bulk jobs use send_template_async.
+    """
+    if not settings.WHATSAPP_TOKEN or not settings.WHATSAPP_PHONE_NUMBER_ID:
+        logger.error("WhatsApp credentials missing in settings.")
+        return {"error": "Missing credentials"}
+
+    payload = template_payload(to_number, template_name, language, components)
+
+    try:
+        response = get_session().post(messages_url(), headers=auth_headers(), json=payload, timeout=10)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         logger.error(f"Failed to send WhatsApp message to {to_number}: {e}")
-        raise e
\ No newline at end of file
+        raise e
+
+async def send_template_async(client: httpx.AsyncClient, to_number: str, template_name: str,
+                              language: str = "en_US", components: list = None,
+                              phone_number_id: str | None = None) -> dict:
+    """
+    Async variant of send_template for concurrent senders.
+
+    Raises:
+        WhatsAppThrottled: On HTTP 429 or a Graph rate-limit error code.
+        httpx.HTTPError: On any other failure.
+    """
+    payload = template_payload(to_number, template_name, language, components)
+    response = await client.post(messages_url(phone_number_id), headers=auth_headers(), json=payload, timeout=10)
+    if response.status_code >= 400:
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        throttled = throttle_error(response.status_code, response.headers, body)
+        if throttled:
+            raise throttled
+    response.raise_for_status()
+    return response.json()
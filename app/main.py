@@ -19,6 +19,7 @@ from app.core.logging import configure_logging
 from app.metrics.prometheus import init_metrics
 from app.core.config import settings
 from app.core.middleware import RequestContextMiddleware
+from app.core.http_client import close_async_client, start_async_client
 
 # --- EVENT BUS IMPORTS (Module 7) ---
 from app.core.event_bus import event_bus, set_main_loop
@@ -62,10 +63,13 @@ async def lifespan(app: FastAPI):
     setup_inventory_subscribers(event_bus)
     logger.info("📡 Event Bus: Subscribers registered.")
 
+    # 3. Shared outbound HTTP pool (keep-alive connections to Meta/Cohere)
+    await start_async_client()
+
     yield
     
     logger.info("🛑 Application shutdown: Cleaning up resources.")
-    # (Optional) If we had a Redis/Kafka connection, we would close it here.
+    await close_async_client()
 
 # --- APP INIT ---
 app = FastAPI(
@@ -1,9 +1,94 @@
 # app/metrics/prometheus.py
+from prometheus_client import Counter, Gauge, Histogram
 from prometheus_fastapi_instrumentator import Instrumentator
 
+# --- Webhook Stream (Ack-first ingestion) ---
+# Backpressure signals: a growing length/pending/lag means consumers are falling behind.
+WEBHOOK_STREAM_LENGTH = Gauge(
+    "webhook_stream_length", "Entries currently retained in the webhook stream."
+)
+WEBHOOK_STREAM_PENDING = Gauge(
+    "webhook_stream_pending", "Entries delivered to a consumer but not yet acknowledged."
+)
+WEBHOOK_STREAM_LAG = Gauge(
+    "webhook_stream_lag", "Entries not yet delivered to any consumer in the group."
+)
+WEBHOOK_STREAM_ENTRIES = Counter(
+    "webhook_stream_entries_total", "Webhook stream entries by outcome.", ["outcome"]
+)
+
+# --- Conversation Window Cache ---
+CONVERSATION_CACHE_LOOKUPS = Counter(
+    "conversation_cache_lookups_total", "Conversation cache lookups by tier and outcome.", ["tier", "outcome"]
+)
+
+# --- Embedding Micro-batching ---
+# Fill ratio = texts per Cohere call / EMBED_BATCH_SIZE. Mostly-low ratios mean
+# the max-wait flush fires before batches fill up.
+EMBED_BATCH_FILL_RATIO = Histogram(
+    "embed_batch_fill_ratio", "Fraction of EMBED_BATCH_SIZE used per embedding flush.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0),
+)
+EMBED_BATCH_MESSAGES = Counter(
+    "embed_batch_messages_total", "Messages handled by the embedding flush by outcome.", ["outcome"]
+)
+
+# --- Embedding Cache ---
+EMBED_CACHE_LOOKUPS = Counter(
+    "embed_cache_lookups_total", "Embedding cache lookups by tier and outcome.", ["tier", "outcome"]
+)
+
+# --- Sentiment Inference Server ---
+INFERENCE_BATCH_SIZE = Histogram(
+    "inference_batch_size", "Texts per model forward call in the inference server.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+INFERENCE_REQUESTS = Counter(
+    "inference_requests_total", "Inference server requests by outcome.", ["outcome"]
+)
+INFERENCE_PENDING = Gauge(
+    "inference_pending_texts", "Texts accepted by the inference server and not yet answered."
+)
+
+# --- AI Pipeline Stages ---
+# Queue time is enqueue -> start; a growing one means that stage's workers are short.
+AI_STAGE_QUEUE_SECONDS = Histogram(
+    "ai_stage_queue_seconds", "Time AI stage tasks wait in their queue.", ["stage"],
+    buckets=(0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+AI_STAGE_SECONDS = Histogram(
+    "ai_stage_seconds", "Run time of AI stage tasks.", ["stage"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+AI_STAGE_MESSAGES = Counter(
+    "ai_stage_messages_total", "Messages handled by AI stage tasks by outcome.", ["stage", "outcome"]
+)
+
+# --- Outbound HTTP Clients ---
+HTTP_CLIENT_REQUESTS = Counter(
+    "http_client_requests_total", "Outbound HTTP requests by host and outcome.", ["client", "host", "outcome"]
+)
+HTTP_CLIENT_SECONDS = Histogram(
+    "http_client_request_seconds", "Outbound HTTP request latency.", ["client", "host"]
+)
+HTTP_CLIENT_IN_FLIGHT = Gauge(
+    "http_client_in_flight", "Outbound HTTP requests holding a pooled connection.", ["client"]
+)
+HTTP_CLIENT_CONNECTIONS_OPENED = Counter(
+    "http_client_connections_opened_total", "New outbound connections (not reused from the pool).", ["client", "host"]
+)
+
+# --- Bulk Sending ---
+BULK_SEND_MESSAGES = Counter(
+    "bulk_send_messages_total", "Bulk send attempts by outcome (sent, failed, throttled, retried).", ["outcome"]
+)
+BULK_SEND_RATE = Gauge(
+    "bulk_send_rate_per_second", "Current token-bucket send rate per WhatsApp phone number.", ["phone_number_id"]
+)
+
 def init_metrics(app):
     """
     Initializes Prometheus metrics instrumentation.
     Exposes /metrics endpoint for scraping.
     """
-    Instrumentator().instrument(app).expose(app)
\ No newline at end of file
+    Instrumentator().instrument(app).expose(app)
@@ -24,7 +24,7 @@ from .chat import Message, Conversation, ChatMessage
 from .communication import BulkJob, BulkMessage, EmailQueue
 
 # 5. Extensions
-from .extensions import MessageStatus, MessageEmbedding, ReplySuggestion
+from .extensions import MessageStatus, MessageEmbedding, EmbeddingModel, EmbeddingBackfillShard, ReplySuggestion
 
 # 6. Finance (Pod B Module 2)
 from .finance import Invoice, InvoiceItem, Payment, LedgerEntry
@@ -40,7 +40,7 @@ __all__ = [
     "Contact", "Lead", "Deal",
     "Message", "Conversation", "ChatMessage",
     "BulkJob", "BulkMessage", "EmailQueue",
-    "MessageStatus", "MessageEmbedding", "ReplySuggestion",
+    "MessageStatus", "MessageEmbedding", "EmbeddingModel", "EmbeddingBackfillShard", "ReplySuggestion",
     "Invoice", "InvoiceItem", "Payment", "LedgerEntry",
     "Product", "StockTransaction"
 ]
\ No newline at end of file
@@ -1,5 +1,6 @@
 # app/models/chat.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey, Index, func
+from sqlalchemy import text as sql_text  # "text" is also a column name below
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.database import Base
@@ -47,11 +48,15 @@ class Conversation(Base):
     Used to group individual ChatMessages for the UI and AI context.
     """
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Serves the "active conversation for this number" lookup (number + window range)
+        Index("ix_conversations_customer_number_last_message_at", "customer_number", "last_message_at"),
+    )
 
     id = Column(Integer, primary_key=True)
     tenant_id = Column(Integer, index=True, nullable=True)
 
-    customer_number = Column(String, index=True)
+    customer_number = Column(String)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -65,6 +70,10 @@ class ChatMessage(Base):
     Stores NLP metadata (intent, sentiment) and links to Vector Embeddings.
     """
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Work queue for the sentiment sweep: only unscored rows are indexed
+        Index("ix_chat_messages_sentiment_pending", "id", postgresql_where=sql_text("sentiment_scored_at IS NULL")),
+    )
 
     id = Column(Integer, primary_key=True)
     conversation_id = Column(Integer, ForeignKey("conversations.id"))
@@ -79,17 +88,18 @@ class ChatMessage(Base):
     language = Column(String, default="unknown")
     intent = Column(String, default="unclassified")
     sentiment = Column(String, default="neutral") 
+    # NULL until the sentiment model has run ('neutral' is also a real label)
+    sentiment_scored_at = Column(DateTime(timezone=True), nullable=True)
     
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     # --- Relationships ---
     
-    # 1. Vector Embeddings (One-to-One)
+    # 1. Vector Embeddings (One per embedding model)
     # Defined in app/models/extensions.py
     embedding_data = relationship(
         "app.models.extensions.MessageEmbedding", 
         back_populates="message", 
-        uselist=False,
         cascade="all, delete-orphan"
     )
 
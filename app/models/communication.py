@@ -1,5 +1,5 @@
 # app/models/communication.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey, Index, func, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -14,7 +14,7 @@ class BulkJob(Base):
     template_name = Column(String, nullable=False)
     language_code = Column(String, default="en")
     
-    # Status: 'queued', 'scheduled', 'processing', 'completed', 'failed'
+    # Status: 'importing' (upload loading), 'queued', 'scheduled', 'running', 'done', 'failed'
     status = Column(String, default="queued")
     
     scheduled_at = Column(DateTime(timezone=True), nullable=True)
@@ -24,19 +24,38 @@ class BulkJob(Base):
     
     components = Column(JSON, default=list)
 
+    # Progress: bumped in the same transaction as each chunk's message statuses
+    total_count = Column(Integer, nullable=False, default=0, server_default="0")
+    sent_count = Column(Integer, nullable=False, default=0, server_default="0")
+    failed_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Numbers dropped at ingestion (invalid or duplicate)
+    skipped_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Shards the job was split into for parallel workers (None: not sharded)
+    shard_count = Column(Integer, nullable=True)
+
     # Relationships
     messages = relationship("BulkMessage", back_populates="job")
 
 
 class BulkMessage(Base):
     __tablename__ = "bulk_messages"
+    __table_args__ = (
+        # Work queue for run_job: keyset claims walk pending rows of one job by id
+        Index("ix_bulk_messages_pending", "job_id", "id", postgresql_where=text("status = 'pending'")),
+        # Duplicate check when numbers are ingested into a job
+        Index("ix_bulk_messages_job_number", "job_id", "to_number"),
+        # Status counts per job and status-filtered keyset listing
+        Index("ix_bulk_messages_job_status", "job_id", "status", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     job_id = Column(Integer, ForeignKey("bulk_jobs.id"))
     to_number = Column(String, nullable=False)
     
-    # Status: 'pending', 'sent', 'failed'
+    # Status: 'pending', 'sending' (claimed by a worker), 'sent', 'failed'
     status = Column(String, default="pending")
+    # When a worker claimed the message for sending
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
     whatsapp_message_id = Column(String, nullable=True)
     
     attempts = Column(Integer, default=0)
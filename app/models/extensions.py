@@ -1,8 +1,8 @@
 # app/models/extensions.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, CheckConstraint, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
-from pgvector.sqlalchemy import Vector
+from sqlalchemy.sql import func, text
+from app.core.vector_io import CompactVector
 from datetime import datetime, timezone
 from app.database import Base
 
@@ -12,11 +12,19 @@ class MessageStatus(Base):
     Separated from ChatMessage to allow high-frequency updates without locking the main table.
     """
     __tablename__ = "message_status"
+    __table_args__ = (
+        # Mirrors StatusService.STATUS_RANK; unknown states would break the rank guard.
+        CheckConstraint(
+            "wa_status IN ('pending', 'sent', 'delivered', 'read', 'failed')",
+            name="ck_message_status_wa_status",
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
 
     # Link back to the immutable chat history.
-    message_id = Column(Integer, ForeignKey("chat_messages.id"), nullable=False, index=True)
+    # Unique: one current status row per message (required by the ON CONFLICT upsert).
+    message_id = Column(Integer, ForeignKey("chat_messages.id"), nullable=False, unique=True, index=True)
 
     # The critical status field (pending -> sent -> delivered -> read).
     wa_status = Column(String, nullable=False, default="pending", index=True)
@@ -35,18 +43,63 @@ class MessageStatus(Base):
     )
 
 
+class EmbeddingModel(Base):
+    """
+    Registry of embedding models and the pointer to the one searches read from.
+    Lifecycle: building (backfill + index) -> ready -> active -> retired.
+    Exactly one model can be active; switching happens in one transaction.
+    """
+    __tablename__ = "embedding_models"
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('building', 'ready', 'active', 'retired')",
+            name="ck_embedding_models_status",
+        ),
+        Index("uq_embedding_models_single_active", "status", unique=True,
+              postgresql_where=text("status = 'active'")),
+    )
+
+    model_version = Column(String, primary_key=True)
+    dimensions = Column(Integer, nullable=False)
+    status = Column(String, nullable=False, default="building")
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    activated_at = Column(DateTime(timezone=True), nullable=True)
+
+
 class MessageEmbedding(Base):
     """
     Stores vector embeddings for ChatMessages to enable semantic search.
     Requires the 'pgvector' extension in PostgreSQL.
+
+    One row per (message, model), so a new model can be backfilled next to the
+    active one. Each model has its own partial HNSW index, managed at runtime
+    by app/services/vector_index_service.py.
     """
     __tablename__ = "message_embeddings"
+    __table_args__ = (
+        UniqueConstraint("message_id", "model_version", name="uq_message_embeddings_message_model"),
+        # Pre-filters for scoped search (denormalized from chat_messages/conversations)
+        Index("ix_message_embeddings_tenant_id_message_created_at", "tenant_id", "message_created_at"),
+        Index("ix_message_embeddings_conversation_id", "conversation_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    message_id = Column(Integer, ForeignKey("chat_messages.id"), unique=True, nullable=False)
+    message_id = Column(Integer, ForeignKey("chat_messages.id"), nullable=False)
     
-    # 1024 dimensions match the Cohere embed-english-v3.0 model
-    embedding = Column(Vector(1024)) 
+    # Dimensions depend on the model (see EmbeddingModel.dimensions);
+    # indexes and searches cast to the model's vector(n).
+    embedding = Column(CompactVector()) 
+
+    # Embedding model that produced the vector (see EmbeddingModel)
+    model_version = Column(String, nullable=False, default="embed-english-v3.0", server_default="embed-english-v3.0")
+
+    # Copied from the message/conversation at insert time so search filters
+    # never need a join. Messages don't move between conversations.
+    tenant_id = Column(Integer, nullable=True)
+    conversation_id = Column(Integer, nullable=True)
+    from_number = Column(String, nullable=True)
+    message_created_at = Column(DateTime(timezone=True), nullable=True)
     
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
@@ -57,6 +110,37 @@ class MessageEmbedding(Base):
     )
 
 
+class EmbeddingBackfillShard(Base):
+    """
+    Checkpoint for one slice of an embedding backfill.
+    A backfill for a model splits chat_messages.id into shards; each shard is
+    walked in keyset order by one worker, and `cursor` records the last
+    message ID handled so an interrupted run resumes where it stopped.
+    """
+    __tablename__ = "embedding_backfill_shards"
+    __table_args__ = (
+        UniqueConstraint("model_version", "shard", name="uq_embedding_backfill_shards_model_shard"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    model_version = Column(String, nullable=False)
+    shard = Column(Integer, nullable=False)
+
+    # Message IDs in (range_start, range_end]; cursor starts at range_start
+    range_start = Column(Integer, nullable=False)
+    range_end = Column(Integer, nullable=False)
+    cursor = Column(Integer, nullable=False)
+
+    # Status: 'pending', 'running', 'completed', 'failed'
+    status = Column(String, nullable=False, default="pending")
+    embedded = Column(Integer, nullable=False, default=0)
+    rate_limited = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class ReplySuggestion(Base):
     """
     Stores AI-generated reply suggestions for a specific chat message.
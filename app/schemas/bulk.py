@@ -18,6 +18,11 @@ class BulkMessage(BulkMessageBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class BulkMessagePage(BaseModel):
+    """One keyset page of a job's messages."""
+    items: List[BulkMessage]
+    next_cursor: Optional[int] = None  # Pass as `after` for the next page; None on the last
+
 # ----------------------------
 # BulkJob Schemas
 # ----------------------------
@@ -41,14 +46,35 @@ class BulkJobResponse(BaseModel):
     components: Optional[List[dict]] = None
     status: str
     created_at: datetime
+    total_count: int = 0      # Recipients queued (after normalization/dedupe)
+    skipped_count: int = 0    # Invalid or duplicate numbers dropped
     
     model_config = ConfigDict(from_attributes=True)
 
+class BulkJobUploadResponse(BulkJobResponse):
+    """Schema for the response to a file upload (the import runs in the background)."""
+    progress_url: Optional[str] = None  # Poll for status/total_count while 'importing'
+
 class BulkJobStatus(BaseModel):
     """Schema for checking status."""
     id: int
     status: str
     created_at: datetime
+    total_count: int = 0
+    skipped_count: int = 0
     messages: List[BulkMessage]
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class BulkJobSummary(BaseModel):
+    """Schema for polling a job: status and counts, no messages."""
+    id: int
+    status: str
+    created_at: datetime
+    scheduled_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    total_count: int = 0
+    skipped_count: int = 0
+    counts: Dict[str, int] = Field(default_factory=dict, description="Messages by status.")
+
+    model_config = ConfigDict(from_attributes=True)
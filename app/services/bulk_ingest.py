@@ -0,0 +1,156 @@
+"""
+Module: Bulk Recipient Ingestion
+Context: Pod B - Bulk Messaging.
+
+Loads a job's recipient list into bulk_messages without building an ORM
+object per number:
+
+- Numbers are normalized as they stream in (spaces, dashes, brackets, a
+  leading + or 00 removed; 8-15 digits, no leading zero) and invalid ones
+  are counted and dropped.
+- Every BULK_INGEST_CHUNK_SIZE numbers, the chunk is streamed with COPY into
+  a session temp table, then moved into bulk_messages with one INSERT ...
+  SELECT that drops duplicates, both within the chunk and against numbers
+  the job already has (backed by ix_bulk_messages_job_number).
+
+Memory stays at one chunk regardless of list size. Everything runs in the
+caller's transaction and the caller commits, unless commit_chunks is set
+(uploads, so their counts show progress). See benchmarks/bench_bulk_ingest.py.
+"""
+
+import csv
+import io
+import logging
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# E.164 without the "+": country code first (no leading zero), 8-15 digits in all
+E164_DIGITS = re.compile(r"[1-9][0-9]{7,14}")
+NUMBER_SEPARATORS = re.compile(r"[\s\-().]")
+
+@dataclass
+class IngestResult:
+    created: int = 0
+    invalid: int = 0
+    duplicate: int = 0
+
+    @property
+    def skipped(self) -> int:
+        return self.invalid + self.duplicate
+
+def normalize_number(raw: str) -> str | None:
+    """
+    Normalizes a phone number to the digits-only E.164 form the Cloud API
+    takes (e.g. "+91 98765-43210" -> "919876543210").
+
+    Returns:
+        str | None: The normalized number, or None if it isn't valid.
+    """
+    number = NUMBER_SEPARATORS.sub("", raw or "")
+    if number.startswith("+"):
+        number = number[1:]
+    elif number.startswith("00"):
+        number = number[2:]
+    return number if E164_DIGITS.fullmatch(number) else None
+
+def iter_csv_numbers(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Yields the first column of each CSV (or one-number-per-line) row,
+    skipping blank rows and a header row.
+    """
+    for i, row in enumerate(csv.reader(lines)):
+        if not row or not row[0].strip():
+            continue
+        if i == 0 and not any(c.isdigit() for c in row[0]):
+            continue  # Header, e.g. "phone"
+        yield row[0]
+
+class BulkIngestService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ingest(self, job_id: int, numbers: Iterable[str], chunk_size: int | None = None,
+               commit_chunks: bool = False) -> IngestResult:
+        """
+        Adds the normalized, deduplicated numbers to a job as pending messages,
+        bumping its total_count/skipped_count with each chunk. With
+        commit_chunks, each chunk is committed so the counts show progress.
+
+        Returns:
+            IngestResult: Created, invalid and duplicate counts.
+        """
+        chunk_size = chunk_size or settings.BULK_INGEST_CHUNK_SIZE
+        result = IngestResult()
+        chunk: list[str] = []
+        invalid = 0
+        for raw in numbers:
+            number = normalize_number(raw)
+            if number is None:
+                invalid += 1
+                continue
+            chunk.append(number)
+            if len(chunk) >= chunk_size:
+                self._load_chunk(job_id, chunk, invalid, result, commit_chunks)
+                chunk, invalid = [], 0
+        if chunk or invalid:
+            self._load_chunk(job_id, chunk, invalid, result, commit_chunks)
+
+        logger.info(f"Job {job_id}: ingested {result.created} recipients "
+                    f"({result.invalid} invalid, {result.duplicate} duplicates skipped).")
+        return result
+
+    def _load_chunk(self, job_id: int, numbers: list[str], invalid: int, result: IngestResult, commit: bool):
+        created = self._copy_numbers(job_id, numbers) if numbers else 0
+        duplicate = len(numbers) - created
+
+        self.db.execute(text("""
+            UPDATE bulk_jobs
+            SET total_count = total_count + :created, skipped_count = skipped_count + :skipped
+            WHERE id = :job_id
+        """), {"created": created, "skipped": invalid + duplicate, "job_id": job_id})
+        if commit:
+            self.db.commit()
+
+        result.created += created
+        result.invalid += invalid
+        result.duplicate += duplicate
+
+    def _copy_numbers(self, job_id: int, numbers: list[str]) -> int:
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS bulk_messages_stage (
+                    seq bigserial,
+                    to_number text
+                ) ON COMMIT DELETE ROWS
+            """)
+            # Normalized numbers are digits only: nothing to escape in COPY text format
+            cursor.copy_expert("COPY bulk_messages_stage (to_number) FROM STDIN",
+                               io.StringIO("\n".join(numbers) + "\n"))
+            # First occurrence wins; input order is kept so sends follow the list
+            cursor.execute("""
+                INSERT INTO bulk_messages (job_id, to_number, status, attempts)
+                SELECT %(job_id)s, s.to_number, 'pending', 0
+                FROM (
+                    SELECT to_number, min(seq) AS seq
+                    FROM bulk_messages_stage
+                    GROUP BY to_number
+                ) AS s
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM bulk_messages m
+                    WHERE m.job_id = %(job_id)s AND m.to_number = s.to_number
+                )
+                ORDER BY s.seq
+            """, {"job_id": job_id})
+            created = cursor.rowcount
+            # Keep the stage empty for the next chunk in this transaction
+            cursor.execute("TRUNCATE bulk_messages_stage")
+            return created
+        finally:
+            cursor.close()
@@ -0,0 +1,284 @@
+"""
+Module: Bulk WhatsApp Sender
+Context: Pod B - Bulk Messaging.
+
+Sends a chunk of bulk recipients concurrently on one event loop:
+
+- A token bucket per WhatsApp phone-number-id caps the send rate
+  (BULK_SEND_RATE_PER_SECOND, bursts of BULK_SEND_BURST). Its state lives in
+  Redis (SharedTokenBucket), so every shard, job and worker process sending
+  from that number draws from one budget: one free worker sends at the full
+  rate, eight share it.
+- At most BULK_SEND_CONCURRENCY requests are in flight, over one pooled
+  keep-alive client.
+- A 429 or Graph rate-limit error halves the bucket's rate (at most once a
+  second, never below BULK_SEND_MIN_RATE_PER_SECOND) and pauses it for
+  Retry-After. Each success adds back a little rate (AIMD), so throughput
+  settles just under what Meta accepts. The shared bucket applies this for
+  all workers at once.
+
+The sender only returns results; BulkService writes them per chunk.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+import httpx
+from redis import Redis
+from redis.exceptions import RedisError
+from app.core.cache import sync_redis_client
+from app.core.config import settings
+from app.core.http_client import build_async_client
+from app.integrations.whatsapp_client import WhatsAppThrottled, send_template_async
+from app.metrics.prometheus import BULK_SEND_MESSAGES, BULK_SEND_RATE
+
+logger = logging.getLogger(__name__)
+
+# Rate regained per successful send (msg/s): ~7s from half to full rate at 80 msg/s
+RECOVERY_STEP = 0.1
+# Back-off for transient (network / 5xx) failures
+RETRY_DELAY_SECONDS = 0.5
+
+@dataclass
+class SendResult:
+    message_id: int
+    status: str  # "sent" or "failed"
+    whatsapp_message_id: str | None = None
+    error: str | None = None
+
+class TokenBucket:
+    """
+    Token bucket with an adaptive rate. Single-threaded asyncio use only;
+    holds no loop-bound state, so it outlives the event loop of one job.
+    """
+    def __init__(self, rate: float, burst: int, min_rate: float, name: str = ""):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min(min_rate, rate)
+        self.name = name
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.last_slowdown = 0.0
+        BULK_SEND_RATE.labels(phone_number_id=name).set(rate)
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    async def throttled(self, retry_after: float | None = None):
+        now = time.monotonic()
+        # Concurrent requests all see the same 429; slow down once per window
+        if now - self.last_slowdown >= 1.0:
+            self.last_slowdown = now
+            self.rate = max(self.min_rate, self.rate / 2)
+            BULK_SEND_RATE.labels(phone_number_id=self.name).set(self.rate)
+            logger.warning(f"WhatsApp throttled {self.name}: send rate lowered to {self.rate:.1f}/s")
+        self._refill(now)
+        self.tokens = 0.0
+        self.paused_until = max(self.paused_until, now + (retry_after or 1.0))
+
+    def succeeded(self):
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + RECOVERY_STEP)
+            BULK_SEND_RATE.labels(phone_number_id=self.name).set(self.rate)
+
+# Shared bucket state per number (hash: tokens, updated, rate, paused_until,
+# last_slowdown), all on the Redis clock so workers' clocks don't matter.
+# Successes since the caller's last acquire come in as `recovered` rate.
+ACQUIRE_SCRIPT = """
+local max_rate, burst, min_rate = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local s = redis.call('HMGET', KEYS[1], 'tokens', 'updated', 'rate', 'paused_until')
+local rate = math.max(min_rate, math.min(max_rate, (tonumber(s[3]) or max_rate) + tonumber(ARGV[4])))
+local tokens = tonumber(s[1]) or burst
+tokens = math.min(burst, tokens + math.max(0, now - (tonumber(s[2]) or now)) * rate)
+local wait = 0
+local paused = tonumber(s[4]) or 0
+if now < paused then
+    wait = paused - now
+elseif tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', string.format('%.6f', now),
+           'rate', tostring(rate))
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return {math.ceil(wait * 1000), tostring(rate)}
+"""
+
+THROTTLE_SCRIPT = """
+local max_rate, min_rate, retry_after = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local s = redis.call('HMGET', KEYS[1], 'rate', 'paused_until', 'last_slowdown')
+local rate = tonumber(s[1]) or max_rate
+local last = tonumber(s[3]) or 0
+-- Every in-flight request (on every worker) sees the same 429; slow down once per window
+if now - last >= 1 then
+    rate = math.max(min_rate, rate / 2)
+    last = now
+end
+redis.call('HSET', KEYS[1], 'rate', tostring(rate), 'tokens', '0', 'updated', string.format('%.6f', now),
+           'paused_until', string.format('%.6f', math.max(tonumber(s[2]) or 0, now + retry_after)),
+           'last_slowdown', string.format('%.6f', last))
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return tostring(rate)
+"""
+
+# Idle bucket state expires after this long (the next sender starts at full rate)
+SHARED_BUCKET_TTL_SECONDS = 3600
+
+class SharedTokenBucket:
+    """
+    TokenBucket with its state in Redis, updated atomically by Lua scripts.
+    Same interface, so BulkSender can't tell them apart. Successes are
+    reported with the next acquire rather than one call each. If Redis is
+    unreachable the process-local bucket takes over until it's back.
+    """
+    def __init__(self, name: str, rate: float, burst: int, min_rate: float, client: Redis | None = None):
+        self.name = name
+        self.key = f"bulk:send_bucket:{name}"
+        self.max_rate = rate
+        self.burst = burst
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.redis = client or sync_redis_client
+        self._acquire = self.redis.register_script(ACQUIRE_SCRIPT)
+        self._throttle = self.redis.register_script(THROTTLE_SCRIPT)
+        self._recovered = 0.0
+        self._local = TokenBucket(rate, burst, min_rate, name=name)
+
+    def _set_rate(self, rate: float):
+        if rate != self.rate:
+            self.rate = rate
+            BULK_SEND_RATE.labels(phone_number_id=self.name).set(rate)
+
+    async def acquire(self):
+        while True:
+            recovered, self._recovered = self._recovered, 0.0
+            try:
+                # Blocking client off the event loop: one short script per token
+                wait_ms, rate = await asyncio.to_thread(
+                    self._acquire, keys=[self.key],
+                    args=[self.max_rate, self.burst, self.min_rate, recovered, SHARED_BUCKET_TTL_SECONDS],
+                )
+            except RedisError as e:
+                logger.error(f"Redis error (send bucket {self.name}), pacing locally: {e}")
+                return await self._local.acquire()
+            self._set_rate(float(rate))
+            if not wait_ms:
+                return
+            await asyncio.sleep(wait_ms / 1000)
+
+    async def throttled(self, retry_after: float | None = None):
+        await self._local.throttled(retry_after)
+        try:
+            # Off the event loop like acquire: a slow Redis mustn't stall every in-flight send
+            rate = float(await asyncio.to_thread(
+                self._throttle, keys=[self.key],
+                args=[self.max_rate, self.min_rate, retry_after or 1.0, SHARED_BUCKET_TTL_SECONDS],
+            ))
+        except RedisError as e:
+            logger.error(f"Redis error (send bucket {self.name}): {e}")
+            return
+        if rate < self.rate:
+            logger.warning(f"WhatsApp throttled {self.name}: send rate lowered to {rate:.1f}/s")
+        self._set_rate(rate)
+
+    def succeeded(self):
+        self._local.succeeded()
+        self._recovered += RECOVERY_STEP
+
+_buckets: dict[str, SharedTokenBucket] = {}
+
+def get_bucket(phone_number_id: str) -> SharedTokenBucket:
+    """The bucket for a phone-number-id, shared through Redis by every sender of that number."""
+    if phone_number_id not in _buckets:
+        _buckets[phone_number_id] = SharedTokenBucket(
+            phone_number_id,
+            settings.BULK_SEND_RATE_PER_SECOND,
+            settings.BULK_SEND_BURST,
+            settings.BULK_SEND_MIN_RATE_PER_SECOND,
+        )
+    return _buckets[phone_number_id]
+
+class BulkSender:
+    def __init__(self, template_name: str, language_code: str, components: list | None,
+                 phone_number_id: str | None = None, concurrency: int | None = None,
+                 max_attempts: int | None = None, bucket: TokenBucket | SharedTokenBucket | None = None,
+                 client: httpx.AsyncClient | None = None):
+        self.template_name = template_name
+        self.language_code = language_code
+        self.components = components
+        self.phone_number_id = phone_number_id or settings.WHATSAPP_PHONE_NUMBER_ID
+        self.concurrency = concurrency or settings.BULK_SEND_CONCURRENCY
+        self.max_attempts = max_attempts or settings.BULK_SEND_MAX_ATTEMPTS
+        self.bucket = bucket or get_bucket(self.phone_number_id)
+        self.client = client
+        self._owns_client = client is None
+
+    async def send_many(self, recipients: list[tuple[int, str]]) -> list[SendResult]:
+        """
+        Sends the template to (message_id, to_number) pairs.
+
+        Returns:
+            list[SendResult]: One result per recipient, in input order.
+        """
+        if self.client is None:
+            self.client = build_async_client()
+        slots = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*(self._send(slots, mid, number) for mid, number in recipients))
+
+    async def _send(self, slots: asyncio.Semaphore, message_id: int, to_number: str) -> SendResult:
+        async with slots:
+            for attempt in range(1, self.max_attempts + 1):
+                await self.bucket.acquire()
+                try:
+                    resp = await send_template_async(
+                        self.client, to_number, self.template_name, self.language_code,
+                        self.components, phone_number_id=self.phone_number_id,
+                    )
+                except WhatsAppThrottled as e:
+                    BULK_SEND_MESSAGES.labels(outcome="throttled").inc()
+                    await self.bucket.throttled(e.retry_after)
+                    error = str(e)
+                except httpx.HTTPStatusError as e:
+                    error = f"HTTP {e.response.status_code}: {e.response.text[:200]}"
+                    if e.response.status_code < 500:
+                        break  # Invalid number/template: retrying won't help
+                    BULK_SEND_MESSAGES.labels(outcome="retried").inc()
+                    await asyncio.sleep(RETRY_DELAY_SECONDS * attempt)
+                except httpx.HTTPError as e:
+                    error = f"{type(e).__name__}: {e}"
+                    BULK_SEND_MESSAGES.labels(outcome="retried").inc()
+                    await asyncio.sleep(RETRY_DELAY_SECONDS * attempt)
+                else:
+                    self.bucket.succeeded()
+                    BULK_SEND_MESSAGES.labels(outcome="sent").inc()
+                    return SendResult(message_id, "sent", whatsapp_message_id=resp.get("messages", [{}])[0].get("id"))
+
+        BULK_SEND_MESSAGES.labels(outcome="failed").inc()
+        logger.error(f"Bulk send to {to_number} failed: {error}")
+        return SendResult(message_id, "failed", error=error)
+
+    async def aclose(self):
+        if self._owns_client and self.client is not None:
+            await self.client.aclose()
+            self.client = None
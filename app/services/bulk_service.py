@@ -1,10 +1,15 @@
 # app/services/bulk_service.py
-import time
+import asyncio
 import logging
+import math
+from datetime import datetime, timezone
+from typing import Iterable
+from sqlalchemy import func, select, text, update
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.models import BulkJob, BulkMessage
-from app.integrations.whatsapp_client import send_template
-from tenacity import retry, wait_exponential, stop_after_attempt
+from app.services.bulk_ingest import BulkIngestService
+from app.services.bulk_sender import BulkSender, SendResult
 
 logger = logging.getLogger(__name__)
 
@@ -12,9 +17,11 @@ class BulkService:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_job(self, template_name: str, language_code: str, components: list[dict] | None, numbers: list[str]) -> BulkJob:
+    def create_job(self, template_name: str, language_code: str, components: list[dict] | None,
+                   numbers: Iterable[str]) -> BulkJob:
         """
-        Creates a new bulk job and creates pending messages using BATCH INSERT.
+        Creates a new bulk job and loads its pending messages with COPY
+        (normalized and deduplicated, see app/services/bulk_ingest.py).
         """
         # 1. Create the Job Parent
         job = BulkJob(
@@ -26,68 +33,234 @@ class BulkService:
         self.db.add(job)
         self.db.flush() # Flush to get the job.id
 
-        # 2. Performance Optimization: Bulk Insert Messages
-        # Instead of adding one by one, we map them and save in one go.
-        bulk_messages = [
-            BulkMessage(job_id=job.id, to_number=num, status="pending") 
-            for num in numbers
-        ]
-        
-        # This is ~100x faster than a loop for large lists
-        self.db.bulk_save_objects(bulk_messages)
+        # 2. Stream the numbers in; created/skipped counts land on the job
+        BulkIngestService(self.db).ingest(job.id, numbers)
 
         self.db.commit()
         self.db.refresh(job)
         return job
 
-    @retry(wait=wait_exponential(min=1, max=10), stop=stop_after_attempt(3))
-    def _send_one(self, to_number: str, template_name: str, language_code: str, components: list[dict] | None):
-        return send_template(to_number, template_name, language=language_code, components=components)
-
     def run_job(self, job_id: int) -> BulkJob | None:
-        # (Existing logic remains valid for processing)
+        """
+        Sends a whole job from this process (the bulk worker loop). Celery
+        splits jobs into shards instead: start_job, run_shard, finish_job.
+        """
         job = self.db.get(BulkJob, job_id)
-        if not job:
+        if not job or not self._begin(job):
+            return job
+
+        self._send_range(job, 0, None)
+        return self.finish_job(job_id)
+
+    def start_job(self, job_id: int) -> list[tuple[int, int]] | None:
+        """
+        Marks a job running and splits its pending messages into up to
+        BULK_SHARDS id ranges of at least BULK_SHARD_MIN_SIZE messages.
+
+        Returns:
+            list[tuple[int, int]]: (range_start, range_end] per shard, or None
+            if the job can't run.
+        """
+        job = self.db.get(BulkJob, job_id)
+        if not job or not self._begin(job):
             return None
 
-        job.status = "running"
+        lo, hi, pending = (
+            self.db.query(func.min(BulkMessage.id), func.max(BulkMessage.id), func.count(BulkMessage.id))
+            .filter(BulkMessage.job_id == job_id, BulkMessage.status == "pending")
+            .one()
+        )
+        shards = []
+        if pending:
+            count = max(1, min(settings.BULK_SHARDS, math.ceil(pending / settings.BULK_SHARD_MIN_SIZE)))
+            # Even split of the ID space; a job's rows are inserted together, so IDs are dense
+            start = lo - 1
+            step = math.ceil((hi - start) / count)
+            shards = [(s, min(s + step, hi)) for s in range(start, hi, step)]
+
+        job.shard_count = len(shards)
         self.db.commit()
+        logger.info(f"Job {job_id}: {pending} pending messages in {len(shards)} shards.")
+        return shards
 
-        template_name = job.template_name
-        language_code = job.language_code
-        components = job.components
-
-        while True:
-            # Process in batches
-            msgs = (
-                self.db.query(BulkMessage)
-                .filter(BulkMessage.job_id == job_id, BulkMessage.status == "pending")
-                .limit(10)
-                .all()
-            )
-            if not msgs:
-                break
-
-            for m in msgs:
-                try:
-                    self._send_one(m.to_number, template_name, language_code, components)
-                    m.status = "sent"
-                except Exception as e:
-                    error_message = str(e)
-                    logger.error(f"Job {job_id}: Failed to send to {m.to_number}. Error: {error_message}")
-                    m.attempts += 1
-                    m.status = "failed"
-                    m.last_error = error_message
-                
-                try:
-                    self.db.commit() 
-                except Exception as db_err:
-                    logger.error(f"Job {job_id}: DB Commit failed for message {m.id}: {db_err}")
-                    self.db.rollback()
-            
-            time.sleep(2) # Throttle
-
-        job.status = "done"
+    def run_shard(self, job_id: int, range_start: int, range_end: int) -> dict:
+        """
+        Sends the pending messages of one shard (ids in (range_start, range_end]).
+        Shards draw from the phone number's shared rate limit, so however many
+        run at once they stay under it, and a lone shard gets all of it.
+
+        Returns:
+            dict: {"sent": n, "failed": n} for this shard.
+        """
+        job = self.db.get(BulkJob, job_id)
+        if not job:
+            return {"sent": 0, "failed": 0}
+        return self._send_range(job, range_start, range_end)
+
+    def finish_job(self, job_id: int, failed_shards: int = 0) -> BulkJob | None:
+        """Marks a job done (or failed if a shard crashed) once every shard has finished."""
+        job = self.db.get(BulkJob, job_id)
+        if not job:
+            return None
+        job.status = "failed" if failed_shards else "done"
+        job.completed_at = datetime.now(timezone.utc)
         self.db.commit()
         self.db.refresh(job)
-        return job
\ No newline at end of file
+        logger.info(f"Job {job_id} {job.status}: {job.sent_count} sent, {job.failed_count} failed"
+                    f"{f', {failed_shards} shards crashed' if failed_shards else ''}.")
+        return job
+
+    def fail_job(self, job_id: int, reason: str) -> BulkJob | None:
+        """Marks a job failed when it can't be (or stopped being) dispatched."""
+        self.db.rollback()
+        job = self.db.get(BulkJob, job_id)
+        if not job:
+            return None
+        job.status = "failed"
+        job.completed_at = datetime.now(timezone.utc)
+        self.db.commit()
+        logger.error(f"Job {job_id} failed: {reason}")
+        return job
+
+    def _begin(self, job: BulkJob) -> bool:
+        """
+        Moves a job from 'pending'/'queued' to 'running' with one conditional
+        UPDATE, so a second dispatch of the same job (or one of a finished
+        job) does nothing.
+        """
+        ready = bool(settings.WHATSAPP_TOKEN and settings.WHATSAPP_PHONE_NUMBER_ID)
+        claimed = (
+            self.db.query(BulkJob)
+            .filter(BulkJob.id == job.id, BulkJob.status.in_(("pending", "queued")))
+            .update({"status": "running" if ready else "failed"}, synchronize_session=False)
+        )
+        self.db.commit()
+
+        if not claimed:
+            logger.warning(f"Job {job.id}: not pending or queued (status '{job.status}'). Not starting it.")
+            return False
+        if not ready:
+            logger.error(f"Job {job.id}: WhatsApp credentials missing in settings.")
+            return False
+        return True
+
+    def _send_range(self, job: BulkJob, range_start: int, range_end: int | None) -> dict:
+        """
+        Sends pending messages with ids in (range_start, range_end] in chunks
+        of BULK_SEND_CHUNK_SIZE.
+
+        Each chunk is claimed by moving it to 'sending' (see _claim_chunk) and
+        committing before anything goes out, walking the range by id
+        (keyset), so several workers can run the same job without sending a
+        message twice and no transaction stays open across the sends. The
+        chunk is sent concurrently under the phone number's rate limit (see
+        app/services/bulk_sender.py), and its results are written afterwards
+        in a second transaction. If the worker dies mid-chunk the rows stay
+        'sending'; the fail_stale_sends sweeper closes them out.
+        """
+        job_id = job.id
+        sender = BulkSender(job.template_name, job.language_code, job.components)
+        totals = {"sent": 0, "failed": 0}
+        # One event loop (and one pooled client) for the whole range
+        with asyncio.Runner() as runner:
+            try:
+                after_id = range_start
+                while True:
+                    chunk = self._claim_chunk(job_id, after_id, settings.BULK_SEND_CHUNK_SIZE, range_end)
+                    if not chunk:
+                        if after_id == range_start:
+                            break
+                        # Rows skipped while another worker held them may be pending again
+                        after_id = range_start
+                        continue
+
+                    results = runner.run(sender.send_many([(m.id, m.to_number) for m in chunk]))
+                    sent, failed = self._record_results(job_id, results)
+                    totals["sent"] += sent
+                    totals["failed"] += failed
+                    after_id = chunk[-1].id
+            finally:
+                runner.run(sender.aclose())
+        return totals
+
+    def _claim_chunk(self, job_id: int, after_id: int, limit: int, until_id: int | None = None) -> list:
+        """
+        Claims up to `limit` pending messages with id > after_id (and <= until_id):
+        one UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED) marks them
+        'sending' with claimed_at, and is committed right away.
+        """
+        claimable = select(BulkMessage.id).where(
+            BulkMessage.job_id == job_id, BulkMessage.status == "pending", BulkMessage.id > after_id
+        )
+        if until_id is not None:
+            claimable = claimable.where(BulkMessage.id <= until_id)
+        claimable = claimable.order_by(BulkMessage.id).limit(limit).with_for_update(skip_locked=True)
+
+        stmt = (
+            update(BulkMessage)
+            .where(BulkMessage.id.in_(claimable.scalar_subquery()))
+            .values(status="sending", claimed_at=func.now())
+            .returning(BulkMessage.id, BulkMessage.to_number)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            rows = self.db.execute(stmt).all()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        # RETURNING order is unspecified; the keyset walk needs the highest id last
+        return sorted(rows, key=lambda r: r.id)
+
+    def _record_results(self, job_id: int, results: list[SendResult]) -> tuple[int, int]:
+        """
+        Writes a chunk's send results with one UPDATE ... FROM (VALUES ...),
+        bumps the job's counters in the same transaction, and commits. Only
+        rows still 'sending' are updated (and counted), so a chunk the stale
+        sweeper already closed out isn't counted twice.
+
+        Returns:
+            tuple[int, int]: (sent, failed) in this chunk.
+        """
+        if not results:
+            return 0, 0
+
+        params, rows = {}, []
+        for i, r in enumerate(results):
+            rows.append(
+                f"(CAST(:id{i} AS integer), CAST(:status{i} AS varchar), "
+                f"CAST(:wamid{i} AS varchar), CAST(:error{i} AS text))"
+            )
+            params.update({
+                f"id{i}": r.message_id, f"status{i}": r.status,
+                f"wamid{i}": r.whatsapp_message_id, f"error{i}": r.error,
+            })
+        try:
+            written = self.db.execute(text(f"""
+                UPDATE bulk_messages AS m
+                SET status = v.status,
+                    whatsapp_message_id = coalesce(v.wamid, m.whatsapp_message_id),
+                    last_error = v.error,
+                    attempts = coalesce(m.attempts, 0) + CASE WHEN v.status = 'failed' THEN 1 ELSE 0 END
+                FROM (VALUES {", ".join(rows)}) AS v(id, status, wamid, error)
+                WHERE m.id = v.id AND m.status = 'sending'
+                RETURNING m.status
+            """), params).scalars().all()
+            failed = sum(status == "failed" for status in written)
+            sent = len(written) - failed
+            self.db.execute(text("""
+                UPDATE bulk_jobs
+                SET sent_count = sent_count + :sent, failed_count = failed_count + :failed
+                WHERE id = :job_id
+            """), {"sent": sent, "failed": failed, "job_id": job_id})
+            self.db.commit()
+        except Exception as db_err:
+            # Stop rather than loop. These messages went out, so they stay
+            # 'sending' (never 'pending' again) until the stale sweeper closes them
+            logger.error(f"Job {job_id}: DB commit failed for a chunk of {len(results)} messages: {db_err}")
+            self.db.rollback()
+            raise
+
+        if failed:
+            logger.warning(f"Job {job_id}: {failed} of {len(results)} messages in chunk failed.")
+        return sent, failed
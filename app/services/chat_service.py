@@ -11,81 +11,248 @@ The central nervous system that orchestrates:
 
 import logging
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, update, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.conversation_cache import conversation_cache
 from app.models import Conversation, ChatMessage
 from app.nlp.simple_nlp import SimpleNLPService
 
 # NEW: Import task for async processing
-from app.tasks.ai_tasks import process_message_ai
+from app.tasks.ai_tasks import process_message_ai, process_messages_ai_batch
 
 logger = logging.getLogger(__name__)
 
+# First key of the two-int advisory lock; keeps these locks apart from other features
+CONVERSATION_LOCK_NAMESPACE = 3001
+
 class ChatService:
-    def __init__(self, db: Session, nlp_service: SimpleNLPService | None = None):
+    def __init__(self, db: Session, nlp_service: SimpleNLPService | None = None, tenant_id: int | None = None):
         self.db = db
         self.nlp_service = nlp_service if nlp_service else SimpleNLPService()
+        # Inbound messages reach the business number, so they belong to its tenant
+        self.tenant_id = tenant_id if tenant_id is not None else settings.WHATSAPP_TENANT_ID
 
-    def upsert_conversation(self, customer_number: str, window_minutes=30) -> Conversation:
+    def upsert_conversation(self, customer_number: str, window_minutes: int | None = None) -> Conversation:
         """
         Finds an active conversation or creates a new one.
         """
         now = datetime.now(timezone.utc)
-        cutoff = now - timedelta(minutes=window_minutes)
-        
-        convo = self.db.query(Conversation)\
-            .filter(Conversation.customer_number == customer_number,
-                    Conversation.last_message_at > cutoff).first()
-
-        if not convo:
-            logger.info(f"Creating new conversation for {customer_number}.")
-            convo = Conversation(customer_number=customer_number)
-            self.db.add(convo)
-            self.db.commit()
-            self.db.refresh(convo)
-        
-        return convo
+        convo_id = self._resolve_conversations({customer_number}, now, window_minutes)[customer_number]
+        self.db.commit()
+        return self.db.get(Conversation, convo_id)
 
     def save_incoming(self, from_number: str, text: str, message_id: str = None) -> ChatMessage:
         """
         Saves incoming message and triggers the background AI pipeline.
         """
         try:
-            convo = self.upsert_conversation(from_number)
+            now = datetime.now(timezone.utc)
+            convo_id = self._resolve_conversations({from_number}, now)[from_number]
             
             # 1. NLP Tagging (Keep this sync as it's fast regex)
             nlp_data = self.nlp_service.analyze_text(text) 
 
             # 2. Save Message
             msg = ChatMessage(
-                conversation_id=convo.id,
+                conversation_id=convo_id,
                 from_number=from_number,
                 text=text,
                 message_id=message_id,
                 language=nlp_data.get("language", "en"),
                 intent=nlp_data.get("intent", "unknown"), 
                 sentiment="neutral", # Will be updated by Celery worker later
-                created_at=datetime.now(timezone.utc)
+                created_at=now
             )
             
             self.db.add(msg)
             
-            # Update conversation timestamp
-            convo.last_message_at = datetime.now(timezone.utc)
+            # Update conversation timestamp (never backwards: batches commit out of order)
+            self.db.execute(
+                update(Conversation).where(Conversation.id == convo_id)
+                .values(**self._touch_values(now))
+            )
             
             self.db.commit()
             self.db.refresh(msg)
-            
-            # 3. Trigger Async AI Pipelines via Celery
-            # This returns immediately so the Webhook doesn't time out
-            process_message_ai.delay(msg.id)
-
-            return msg
 
         except Exception as e:
             self.db.rollback()
             logger.error(f"Failed to save incoming message from {from_number}: {e}")
             raise e
 
+        conversation_cache.put_many({from_number: convo_id}, now)
+
+        # 3. Trigger Async AI Pipelines via Celery
+        # This returns immediately so the Webhook doesn't time out
+        process_message_ai.delay(msg.id)
+
+        return msg
+
+    def _resolve_conversations(self, numbers: set[str], now: datetime, window_minutes: int | None = None) -> dict[str, int]:
+        """
+        Resolves every sender to an active conversation ID.
+        Active chats are served from the conversation window cache; the rest are
+        looked up with one SELECT, and missing conversations are created with one
+        multi-row INSERT under per-number advisory locks, so concurrent workers
+        can never open two conversations for the same customer.
+        """
+        window = window_minutes or settings.CONVERSATION_WINDOW_MINUTES
+        cutoff = now - timedelta(minutes=window)
+
+        resolved = {}
+        for number in numbers:
+            convo_id = conversation_cache.get(number, cutoff)
+            if convo_id:
+                resolved[number] = convo_id
+
+        misses = numbers - resolved.keys()
+        if not misses:
+            return resolved
+
+        resolved.update(self._find_active(misses, cutoff))
+
+        missing = sorted(numbers - resolved.keys())
+        if missing:
+            # Serialize creation per number: a concurrent worker blocks here until
+            # the first one commits, then re-checks and reuses its conversation.
+            self._lock_numbers(missing)
+            resolved.update(self._find_active(set(missing), cutoff))
+            missing = sorted(numbers - resolved.keys())
+
+        if missing:
+            logger.info(f"Creating {len(missing)} new conversations.")
+            if self.tenant_id is None:
+                logger.warning("WHATSAPP_TENANT_ID is not set; new conversations have no tenant.")
+            created = self.db.execute(
+                pg_insert(Conversation)
+                .values([{"customer_number": n, "last_message_at": now, "tenant_id": self.tenant_id}
+                         for n in missing])
+                .returning(Conversation.customer_number, Conversation.id)
+            ).all()
+            resolved.update({number: convo_id for number, convo_id in created})
+
+        return resolved
+
+    def _touch_values(self, now: datetime) -> dict:
+        """
+        SET clause for a conversation that just received a message: bumps
+        last_message_at (never backwards) and stamps the tenant on
+        conversations that predate tenant assignment.
+        """
+        return {
+            "last_message_at": func.greatest(Conversation.last_message_at, now),
+            "tenant_id": func.coalesce(Conversation.tenant_id, self.tenant_id),
+        }
+
+    def _find_active(self, numbers: set[str], cutoff: datetime) -> dict[str, int]:
+        """Maps each number to its most recent conversation newer than cutoff."""
+        # DISTINCT ON picks the most recent active conversation per number
+        rows = (
+            self.db.query(Conversation.customer_number, Conversation.id)
+            .filter(Conversation.customer_number.in_(numbers),
+                    Conversation.last_message_at > cutoff)
+            .order_by(Conversation.customer_number, Conversation.last_message_at.desc())
+            .distinct(Conversation.customer_number)
+            .all()
+        )
+        return {number: convo_id for number, convo_id in rows}
+
+    def _lock_numbers(self, numbers: list[str]):
+        """
+        Takes transaction-scoped advisory locks keyed on a hash of each number.
+        Locks are released automatically on commit/rollback. Numbers are locked
+        in sorted order so two batches sharing senders can't deadlock.
+        Only the (rare) create path pays for this; active chats never lock.
+        """
+        self.db.execute(
+            text(
+                "SELECT pg_advisory_xact_lock(:ns, hashtext(n)) "
+                "FROM unnest(CAST(:numbers AS text[])) AS n ORDER BY n"
+            ),
+            {"ns": CONVERSATION_LOCK_NAMESPACE, "numbers": numbers},
+        )
+
+    def save_incoming_batch(self, messages: list[dict]) -> list[int]:
+        """
+        Saves a whole webhook payload worth of messages in one transaction.
+
+        Args:
+            messages: Dicts with 'from_number', 'text' and optional 'message_id' (wamid).
+
+        Returns:
+            IDs of the newly inserted ChatMessages. Messages whose wamid is
+            already stored (Meta retries) are skipped, keeping ingestion idempotent.
+        """
+        if not messages:
+            return []
+
+        try:
+            now = datetime.now(timezone.utc)
+            convo_ids, message_ids = self.add_incoming_batch(messages, now)
+            self.db.commit()
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to save batch of {len(messages)} incoming messages: {e}")
+            raise e
+
+        self.publish_incoming(convo_ids, message_ids, now)
+        return message_ids
+
+    def add_incoming_batch(self, messages: list[dict], now: datetime) -> tuple[dict[str, int], list[int]]:
+        """
+        The writes of save_incoming_batch, left uncommitted so a caller can
+        commit them together with other work. Call publish_incoming after
+        the commit.
+
+        Returns:
+            (conversation IDs by number, IDs of the newly inserted ChatMessages)
+        """
+        convo_ids = self._resolve_conversations({m["from_number"] for m in messages}, now)
+
+        rows = []
+        for m in messages:
+            # NLP Tagging (Keep this sync as it's fast regex)
+            nlp_data = self.nlp_service.analyze_text(m["text"])
+            rows.append({
+                "conversation_id": convo_ids[m["from_number"]],
+                "from_number": m["from_number"],
+                "text": m["text"],
+                "message_id": m.get("message_id"),
+                "language": nlp_data.get("language", "en"),
+                "intent": nlp_data.get("intent", "unknown"),
+                "sentiment": "neutral", # Will be updated by Celery worker later
+                "created_at": now,
+            })
+
+        # One multi-row INSERT; duplicate wamids are dropped by the unique index
+        message_ids = self.db.execute(
+            pg_insert(ChatMessage)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[ChatMessage.message_id])
+            .returning(ChatMessage.id)
+        ).scalars().all()
+
+        # Bump every touched conversation in a single UPDATE; GREATEST keeps a
+        # concurrent batch with a later timestamp from being moved backwards
+        self.db.execute(
+            update(Conversation)
+            .where(Conversation.id.in_(set(convo_ids.values())))
+            .values(**self._touch_values(now))
+        )
+        return convo_ids, list(message_ids)
+
+    def publish_incoming(self, convo_ids: dict[str, int], message_ids: list[int], now: datetime):
+        """Post-commit side effects of add_incoming_batch."""
+        # Only cache after commit so a rollback can't leave dangling conversation IDs
+        conversation_cache.put_many(convo_ids, now)
+
+        # Trigger the AI pipeline for the whole batch with one broker round trip
+        if message_ids:
+            process_messages_ai_batch.delay(list(message_ids))
+
     def list_conversation(self, convo_id: int, limit=50):
         return self.db.query(ChatMessage)\
             .filter(ChatMessage.conversation_id == convo_id)\
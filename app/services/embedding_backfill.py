@@ -0,0 +1,216 @@
+"""
+Module: Embedding Backfill
+Context: Pod C - Module 4 (AI).
+
+Re-embeds chat_messages for a target model (e.g. after changing EMBED_MODEL)
+or fills in messages that never got a vector.
+
+- plan(): splits chat_messages.id into N shards, stored as checkpoints in
+  embedding_backfill_shards. Calling it again for the same model resumes the
+  unfinished shards instead of starting over; shards another worker is still
+  running are left to it.
+- run_shard(): claims a pending shard and walks it in keyset order
+  (id > cursor), skipping messages that already have a vector from the target
+  model. Each chunk is embedded, stored and checkpointed in its own commit,
+  which also serves as the shard's heartbeat (updated_at).
+
+Rate limits: each shard paces itself to its share of EMBED_RATE_LIMIT_PER_MINUTE,
+and a Cohere 429 raises RateLimited (after checkpointing) so the caller can
+back off and resume.
+"""
+
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+import requests
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models import ChatMessage, EmbeddingBackfillShard
+from app.services.embedding_service import EmbeddingService, COHERE_MAX_TEXTS
+
+logger = logging.getLogger(__name__)
+
+class RateLimited(Exception):
+    """Cohere answered 429; retry the shard after `retry_after` seconds."""
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+class EmbeddingBackfillService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def plan(self, model_version: str, workers: int) -> list[EmbeddingBackfillShard]:
+        """
+        Returns the shards to dispatch for a model, creating them on the first
+        call. Failed shards, and running shards whose checkpoint hasn't moved
+        in EMBED_BACKFILL_STALE_MINUTES (their worker died), are reset to
+        pending. Live running shards are not returned.
+        """
+        shards = (
+            self.db.query(EmbeddingBackfillShard)
+            .filter(EmbeddingBackfillShard.model_version == model_version)
+            .order_by(EmbeddingBackfillShard.shard)
+            .all()
+        )
+
+        if not shards:
+            lo, hi = self.db.query(func.min(ChatMessage.id), func.max(ChatMessage.id)).one()
+            if lo is None:
+                return []
+            # Even split of the ID space; IDs are dense enough for this to balance
+            start = lo - 1
+            step = math.ceil((hi - start) / max(workers, 1))
+            for i in range(max(workers, 1)):
+                range_start = start + i * step
+                if range_start >= hi:
+                    break
+                shards.append(EmbeddingBackfillShard(
+                    model_version=model_version,
+                    shard=i,
+                    range_start=range_start,
+                    range_end=min(range_start + step, hi),
+                    cursor=range_start,
+                    status="pending",
+                    embedded=0,
+                    rate_limited=0,
+                ))
+            self.db.add_all(shards)
+            logger.info(f"Backfill {model_version}: planned {len(shards)} shards over ids {lo}..{hi}.")
+        else:
+            stale_before = datetime.now(timezone.utc) - timedelta(minutes=settings.EMBED_BACKFILL_STALE_MINUTES)
+            for shard in shards:
+                if shard.status == "failed" or (
+                    shard.status == "running" and (shard.updated_at is None or shard.updated_at < stale_before)
+                ):
+                    shard.status = "pending"
+            live = sum(1 for s in shards if s.status == "running")
+            if live:
+                logger.info(f"Backfill {model_version}: {live} shards still running elsewhere, not re-dispatching them.")
+
+        self.db.commit()
+        return [s for s in shards if s.status == "pending"]
+
+    def _next_chunk(self, shard: EmbeddingBackfillShard, chunk_size: int):
+        return self.db.execute(text("""
+            SELECT m.id, m.text
+            FROM chat_messages m
+            WHERE m.id > :cursor AND m.id <= :range_end
+              AND m.text IS NOT NULL AND btrim(m.text) <> ''
+              AND NOT EXISTS (
+                  SELECT 1 FROM message_embeddings e
+                  WHERE e.message_id = m.id AND e.model_version = :model_version
+              )
+            ORDER BY m.id
+            LIMIT :limit
+        """), {
+            "cursor": shard.cursor,
+            "range_end": shard.range_end,
+            "model_version": shard.model_version,
+            "limit": chunk_size,
+        }).fetchall()
+
+    def run_shard(self, shard_id: int, chunk_size: int | None = None, shard_count: int = 1,
+                  sleep: Callable[[float], None] = time.sleep) -> EmbeddingBackfillShard:
+        """
+        Processes a shard to completion. The shard is claimed with a
+        conditional UPDATE (pending -> running), so if two dispatches race
+        only one of them runs it.
+
+        Raises:
+            RateLimited: Cohere returned 429. Progress so far is checkpointed.
+        """
+        chunk_size = chunk_size or settings.EMBED_BACKFILL_CHUNK_SIZE
+        # Seconds per Cohere call for this shard's share of the rate limit
+        call_interval = 60.0 * max(shard_count, 1) / settings.EMBED_RATE_LIMIT_PER_MINUTE
+        embed_svc = EmbeddingService(self.db)
+
+        claimed = (
+            self.db.query(EmbeddingBackfillShard)
+            .filter(EmbeddingBackfillShard.id == shard_id, EmbeddingBackfillShard.status == "pending")
+            .update({"status": "running", "updated_at": func.now()}, synchronize_session=False)
+        )
+        self.db.commit()
+        shard = self.db.get(EmbeddingBackfillShard, shard_id)
+        if not claimed:
+            logger.warning(f"Backfill shard {shard_id} is {shard.status if shard else 'missing'}, not pending. Skipping.")
+            return shard
+
+        while True:
+            started = time.monotonic()
+            rows = self._next_chunk(shard, chunk_size)
+            if not rows:
+                shard.status = "completed"
+                self.db.commit()
+                logger.info(f"Backfill {shard.model_version} shard {shard.shard} completed ({shard.embedded} embedded).")
+                return shard
+
+            try:
+                vectors = embed_svc.embed_texts([r.text for r in rows], model=shard.model_version)
+            except requests.exceptions.HTTPError as e:
+                self.db.rollback()
+                if e.response is not None and e.response.status_code == 429:
+                    shard.rate_limited += 1
+                    shard.status = "pending"
+                    self.db.commit()
+                    raise RateLimited(self._retry_after(e.response, shard.rate_limited))
+                self._fail(shard, e)
+                raise
+            except Exception as e:
+                self.db.rollback()
+                self._fail(shard, e)
+                raise
+
+            embed_svc.store_embeddings({r.id: v for r, v in zip(rows, vectors)}, model_version=shard.model_version)
+
+            # Checkpoint: everything up to the last returned ID is done
+            shard.cursor = rows[-1].id
+            shard.embedded += len(rows)
+            self.db.commit()
+
+            calls = math.ceil(len(rows) / COHERE_MAX_TEXTS)
+            remaining = calls * call_interval - (time.monotonic() - started)
+            if remaining > 0:
+                sleep(remaining)
+
+    @staticmethod
+    def _retry_after(response, attempts: int) -> float:
+        try:
+            return float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            # Exponential backoff when the API doesn't say
+            return float(min(2 ** attempts, 300))
+
+    def _fail(self, shard: EmbeddingBackfillShard, error: Exception):
+        shard.status = "failed"
+        shard.last_error = str(error)[:1000]
+        self.db.commit()
+        logger.error(f"Backfill {shard.model_version} shard {shard.shard} failed: {error}")
+
+    def progress(self, model_version: str) -> dict:
+        shards = (
+            self.db.query(EmbeddingBackfillShard)
+            .filter(EmbeddingBackfillShard.model_version == model_version)
+            .order_by(EmbeddingBackfillShard.shard)
+            .all()
+        )
+        return {
+            "model_version": model_version,
+            "embedded": sum(s.embedded for s in shards),
+            "completed_shards": sum(1 for s in shards if s.status == "completed"),
+            "shards": [
+                {
+                    "shard": s.shard,
+                    "status": s.status,
+                    "range": [s.range_start, s.range_end],
+                    "cursor": s.cursor,
+                    "embedded": s.embedded,
+                    "rate_limited": s.rate_limited,
+                    "last_error": s.last_error,
+                }
+                for s in shards
+            ],
+        }
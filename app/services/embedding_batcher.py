@@ -0,0 +1,96 @@
+"""
+Module: Embedding Micro-batcher
+Context: Pod C - Module 4 (AI).
+
+Collects message IDs from AI tasks in a Redis list and embeds them in one
+Cohere request per flush instead of one request per message.
+
+Flush triggers (wired up in app/tasks/ai_tasks.py):
+1. Size: the queue reached EMBED_BATCH_SIZE -> flush now.
+2. Latency: the first ID landed in an empty queue -> flush after EMBED_BATCH_MAX_WAIT_MS.
+3. Sweep: Celery Beat flushes periodically in case a scheduled flush was lost.
+
+IDs are popped atomically (LPOP with count), so concurrent flushes never embed
+the same message twice. If Cohere fails, the popped IDs are pushed back for the
+next flush; the embedding INSERT is idempotent on message_id.
+"""
+
+import logging
+from redis import Redis
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.metrics.prometheus import EMBED_BATCH_FILL_RATIO, EMBED_BATCH_MESSAGES
+from app.models import ChatMessage
+from app.services.embedding_service import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingBatcher:
+    def __init__(self, redis_client: Redis, key: str | None = None, batch_size: int | None = None):
+        self.redis = redis_client
+        self.key = key or settings.EMBED_QUEUE_KEY
+        self.batch_size = batch_size or settings.EMBED_BATCH_SIZE
+
+    def enqueue(self, message_ids: list[int]) -> tuple[bool, bool]:
+        """
+        Queues message IDs for embedding.
+
+        Returns:
+            tuple[bool, bool]: (started_batch, batch_full). started_batch means
+            the queue was empty before this push, so the caller must schedule the
+            latency flush; batch_full means a flush should run right away.
+        """
+        if not message_ids:
+            return False, False
+        length = self.redis.rpush(self.key, *message_ids)
+        return length == len(message_ids), length >= self.batch_size
+
+    def pending(self) -> int:
+        return self.redis.llen(self.key)
+
+    def flush(self, db: Session) -> int:
+        """
+        Drains the queue one batch (one Cohere call) at a time.
+        Stops after a partial batch: anything queued later has its own flush scheduled.
+
+        Returns:
+            int: Number of embeddings stored.
+        """
+        svc = EmbeddingService(db)
+        stored = 0
+
+        while True:
+            raw_ids = self.redis.lpop(self.key, self.batch_size)
+            if not raw_ids:
+                break
+            ids = [int(i) for i in raw_ids]
+
+            msgs = (
+                db.query(ChatMessage.id, ChatMessage.text)
+                .filter(ChatMessage.id.in_(ids))
+                .all()
+            )
+            msgs = [m for m in msgs if m.text and m.text.strip()]
+            skipped = len(ids) - len(msgs)
+            if skipped:
+                EMBED_BATCH_MESSAGES.labels(outcome="skipped").inc(skipped)
+
+            if msgs:
+                try:
+                    stored += svc.embed_messages(msgs)
+                except Exception as e:
+                    # Put the batch back and let the next flush retry it
+                    logger.error(f"Embedding flush failed for {len(msgs)} messages: {e}")
+                    self.redis.rpush(self.key, *[m.id for m in msgs])
+                    EMBED_BATCH_MESSAGES.labels(outcome="requeued").inc(len(msgs))
+                    break
+
+                EMBED_BATCH_FILL_RATIO.observe(len(msgs) / self.batch_size)
+                EMBED_BATCH_MESSAGES.labels(outcome="embedded").inc(len(msgs))
+
+            if len(ids) < self.batch_size:
+                break
+
+        if stored:
+            logger.info(f"Embedding flush stored {stored} vectors.")
+        return stored
@@ -0,0 +1,172 @@
+"""
+Module: Embedding Model Registry
+Context: Pod C - Module 4 (AI).
+
+Decides which embedding model searches read from and which models new
+messages are written for.
+
+Zero-downtime model migration:
+1. register(new)         -> status 'building'; live messages are now embedded
+                            for both the active and the new model.
+2. backfill + index      -> python -m app.backfill_embeddings --model new,
+                            then POST /vector/index/rebuild?model_version=new.
+3. activate(new)         -> one transaction flips the pointer; the old model becomes
+                            'ready' (still written, so switching back is instant).
+4. retire(old)           -> stop writing it and drop its index.
+
+A search always embeds the query and filters rows with the same model, so
+distances are never mixed. Each process caches the active model for
+EMBED_ACTIVE_MODEL_TTL_SECONDS, so a switch reaches every worker within that.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database import engine
+from app.models import EmbeddingModel, EmbeddingBackfillShard
+from app.services.vector_index_service import VectorIndexService, validate_model_version
+
+logger = logging.getLogger(__name__)
+
+# Output sizes of the Cohere models we can register without specifying one
+KNOWN_DIMENSIONS = {
+    "embed-english-v3.0": 1024,
+    "embed-multilingual-v3.0": 1024,
+    "embed-english-light-v3.0": 384,
+    "embed-multilingual-light-v3.0": 384,
+}
+
+WRITE_STATUSES = ("building", "ready", "active")
+
+_active_lock = threading.Lock()
+_active_cache: tuple[tuple[str, int], float] | None = None
+
+def clear_active_cache():
+    global _active_cache
+    with _active_lock:
+        _active_cache = None
+
+class EmbeddingModelRegistry:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def active(self) -> tuple[str, int]:
+        """
+        Returns (model_version, dimensions) of the model searches read from.
+        Falls back to EMBED_MODEL until a model has been registered.
+        """
+        global _active_cache
+        with _active_lock:
+            if _active_cache and _active_cache[1] > time.monotonic():
+                return _active_cache[0]
+
+        row = self.db.query(EmbeddingModel).filter(EmbeddingModel.status == "active").first()
+        if row:
+            active = (row.model_version, row.dimensions)
+        else:
+            active = (settings.EMBED_MODEL, KNOWN_DIMENSIONS.get(settings.EMBED_MODEL, 1024))
+
+        with _active_lock:
+            _active_cache = (active, time.monotonic() + settings.EMBED_ACTIVE_MODEL_TTL_SECONDS)
+        return active
+
+    def write_models(self) -> list[str]:
+        """Models every new message is embedded for (the active one first)."""
+        active = self.active()[0]
+        others = [
+            r.model_version for r in
+            self.db.query(EmbeddingModel.model_version)
+            .filter(EmbeddingModel.status.in_(WRITE_STATUSES), EmbeddingModel.model_version != active)
+            .all()
+        ]
+        return [active] + others
+
+    def all_models(self) -> list[EmbeddingModel]:
+        return self.db.query(EmbeddingModel).order_by(EmbeddingModel.created_at).all()
+
+    def register(self, model_version: str, dimensions: int | None = None) -> EmbeddingModel:
+        validate_model_version(model_version)
+        row = self.db.get(EmbeddingModel, model_version)
+        dimensions = dimensions or KNOWN_DIMENSIONS.get(model_version) or (row.dimensions if row else None)
+        if not dimensions:
+            raise ValueError(f"Unknown dimensions for '{model_version}'; pass them explicitly.")
+
+        if row:
+            # Stored vectors (and the ANN index) have the registered width
+            if row.dimensions != dimensions:
+                raise ValueError(
+                    f"'{model_version}' is registered with {row.dimensions} dimensions, not {dimensions}."
+                )
+            if row.status == "retired":
+                row.status = "building"
+        else:
+            row = EmbeddingModel(model_version=model_version, dimensions=dimensions, status="building")
+            self.db.add(row)
+        self.db.commit()
+        logger.info(f"Embedding model {model_version} registered ({dimensions} dims).")
+        return row
+
+    def readiness(self, model_version: str) -> list[str]:
+        """Reasons the model can't be activated yet (empty when ready)."""
+        problems = []
+        shards = (
+            self.db.query(EmbeddingBackfillShard.status)
+            .filter(EmbeddingBackfillShard.model_version == model_version)
+            .all()
+        )
+        if not shards:
+            problems.append("no backfill has been run")
+        elif any(s.status != "completed" for s in shards):
+            problems.append("backfill is not complete")
+
+        index = VectorIndexService(engine).status(model_version)
+        if not index or not index["valid"]:
+            problems.append("ANN index is missing or invalid")
+        return problems
+
+    def activate(self, model_version: str, force: bool = False) -> EmbeddingModel:
+        """
+        Points searches at another model in one transaction. The partial unique
+        index on status guarantees there is never more than one active model.
+        """
+        row = self.db.get(EmbeddingModel, model_version)
+        if not row or row.status == "retired":
+            raise ValueError(f"Model '{model_version}' is not registered.")
+        if not force:
+            problems = self.readiness(model_version)
+            if problems:
+                raise ValueError(f"Model '{model_version}' is not ready: {', '.join(problems)}.")
+
+        # Demote then promote in one transaction: readers see either the old or
+        # the new pointer, never both (unique checks in Postgres are per row,
+        # so a single UPDATE could trip the index mid-statement).
+        self.db.execute(
+            update(EmbeddingModel)
+            .where(EmbeddingModel.status == "active", EmbeddingModel.model_version != model_version)
+            .values(status="ready")
+        )
+        self.db.execute(
+            update(EmbeddingModel)
+            .where(EmbeddingModel.model_version == model_version)
+            .values(status="active", activated_at=datetime.now(timezone.utc))
+        )
+        self.db.commit()
+        clear_active_cache()
+        self.db.refresh(row)
+        logger.info(f"Embedding model {model_version} is now active.")
+        return row
+
+    def retire(self, model_version: str) -> EmbeddingModel:
+        row = self.db.get(EmbeddingModel, model_version)
+        if not row:
+            raise ValueError(f"Model '{model_version}' is not registered.")
+        if row.status == "active":
+            raise ValueError("Activate another model before retiring the active one.")
+        row.status = "retired"
+        self.db.commit()
+        VectorIndexService(engine).drop(model_version)
+        return row
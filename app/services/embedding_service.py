@@ -1,63 +1,249 @@
 # app/services/embedding_service.py
 import requests
 import logging
+from typing import Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from app.models import MessageEmbedding
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import datetime
+from app.models import MessageEmbedding, ChatMessage, Conversation
 from app.core.config import settings
+from app.core.http_client import get_session
+from app.core.embedding_cache import embedding_cache, embedding_key
+from app.core.vector_io import copy_embeddings, vector_literal
+from app.services.embedding_models import EmbeddingModelRegistry
 
 logger = logging.getLogger(__name__)
 
 EMBED_URL = "https://api.cohere.ai/v1/embed"
+# Cohere rejects embed requests with more than 96 texts
+COHERE_MAX_TEXTS = 96
+# Batches at least this large are written with binary COPY instead of INSERT
+COPY_MIN_ROWS = 256
 
 class EmbeddingService:
     def __init__(self, db: Session):
         self.db = db
 
-    def embed_text(self, text: str) -> list[float]:
+    def active_model(self) -> tuple[str, int]:
+        """(model_version, dimensions) that searches read from."""
+        return EmbeddingModelRegistry(self.db).active()
+
+    def embed_text(self, text: str, model: Optional[str] = None) -> list[float]:
+        return self.embed_texts([text], model=model)[0]
+
+    def embed_texts(self, texts: list[str], input_type: str = "search_document",
+                    model: Optional[str] = None) -> list[list[float]]:
+        """
+        Embeds many texts with as few HTTP calls as possible.
+        Cached texts and duplicates within the input are not sent to Cohere;
+        the remaining unique texts are split into 96-text chunks.
+        `model` defaults to the active model (backfills and dual writes pass theirs).
+
+        Returns:
+            list[list[float]]: One vector per input text, in input order.
+        """
+        model = model or self.active_model()[0]
+        keys = [embedding_key(model, input_type, t) for t in texts]
+        cached = embedding_cache.get_many(list(dict.fromkeys(keys)))
+
+        # One API slot per distinct uncached text
+        to_embed: dict[str, str] = {}
+        for k, t in zip(keys, texts):
+            if k not in cached:
+                to_embed.setdefault(k, t)
+        if to_embed:
+            fresh = self._call_embed_api(list(to_embed.values()), input_type, model)
+            fetched = dict(zip(to_embed.keys(), fresh))
+            embedding_cache.put_many(fetched)
+            cached.update(fetched)
+
+        return [cached[k] for k in keys]
+
+    def _call_embed_api(self, texts: list[str], input_type: str, model: str) -> list[list[float]]:
         if not settings.COHERE_API_KEY:
             logger.error("COHERE_API_KEY is not configured.")
             raise ValueError("COHERE_API_KEY is not configured.")
 
-        payload = {
-            "model": "embed-english-v3.0",
-            "texts": [text],
-            "input_type": "search_document"
-        }
         headers = {
             "Authorization": f"Bearer {settings.COHERE_API_KEY}",
             "Content-Type": "application/json"
         }
 
-        try:
-            response = requests.post(EMBED_URL, json=payload, headers=headers, timeout=20)
-            response.raise_for_status()
-            return response.json()["embeddings"][0]
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error embedding text with Cohere: {e}")
-            raise
+        vectors: list[list[float]] = []
+        for start in range(0, len(texts), COHERE_MAX_TEXTS):
+            payload = {
+                "model": model,
+                "texts": texts[start:start + COHERE_MAX_TEXTS],
+                "input_type": input_type
+            }
+            try:
+                response = get_session().post(EMBED_URL, json=payload, headers=headers, timeout=20)
+                response.raise_for_status()
+                vectors.extend(response.json()["embeddings"])
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Error embedding text with Cohere: {e}")
+                raise
+
+        return vectors
 
-    def store_embedding(self, message_id: int, vector: list[float]):
+    def store_embedding(self, message_id: int, vector: list[float], model_version: Optional[str] = None):
         """Save the vector to the database."""
-        emb = MessageEmbedding(message_id=message_id, embedding=vector)
+        context = self._message_context([message_id]).get(message_id, {})
+        emb = MessageEmbedding(message_id=message_id, embedding=vector,
+                               model_version=model_version or self.active_model()[0], **context)
         self.db.add(emb)
         self.db.commit()
         self.db.refresh(emb)
         return emb
 
-    def search_similar(self, vector: list[float], limit=5):
-        """Search for similar messages using Cosine Distance."""
-        # FIX: Updated SQL to use 'embedding' column
-        sql = text("""
-            SELECT message_id, embedding <=> :vec as distance 
+    def store_embeddings(self, vectors: dict[int, list[float]], model_version: Optional[str] = None) -> int:
+        """
+        Bulk-saves one model's vectors keyed by message ID in one INSERT (binary
+        COPY for backfill-sized batches). Messages that already have a vector
+        from this model are skipped, so retries are safe.
+
+        Returns:
+            int: Number of rows inserted.
+        """
+        if not vectors:
+            return 0
+
+        model_version = model_version or self.active_model()[0]
+        context = self._message_context(list(vectors))
+        rows = [
+            {"message_id": mid, "embedding": vec, "model_version": model_version, **context.get(mid, {})}
+            for mid, vec in vectors.items()
+        ]
+        if len(rows) >= COPY_MIN_ROWS:
+            inserted = copy_embeddings(self.db, rows)
+            self.db.commit()
+            return inserted
+
+        stmt = (
+            pg_insert(MessageEmbedding)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[MessageEmbedding.message_id, MessageEmbedding.model_version])
+            .returning(MessageEmbedding.id)
+        )
+        inserted = len(self.db.execute(stmt).fetchall())
+        self.db.commit()
+        return inserted
+
+    def embed_messages(self, messages) -> int:
+        """
+        Embeds and stores messages (anything with .id and .text) for every
+        model being written: the active one plus any being migrated to, so a
+        new model is complete when it is activated. Safe to retry.
+
+        Returns:
+            int: Number of embeddings stored across models.
+        """
+        texts = [m.text for m in messages]
+        stored = 0
+        for model_version in EmbeddingModelRegistry(self.db).write_models():
+            vectors = self.embed_texts(texts, model=model_version)
+            stored += self.store_embeddings({m.id: v for m, v in zip(messages, vectors)}, model_version=model_version)
+        return stored
+
+    def _message_context(self, message_ids: list[int]) -> dict[int, dict]:
+        """Filter columns denormalized onto message_embeddings, in one query."""
+        rows = (
+            self.db.query(ChatMessage.id, ChatMessage.conversation_id, ChatMessage.from_number,
+                          ChatMessage.created_at, Conversation.tenant_id)
+            .outerjoin(Conversation, Conversation.id == ChatMessage.conversation_id)
+            .filter(ChatMessage.id.in_(message_ids))
+            .all()
+        )
+        return {
+            r.id: {
+                "tenant_id": r.tenant_id,
+                "conversation_id": r.conversation_id,
+                "from_number": r.from_number,
+                "message_created_at": r.created_at,
+            }
+            for r in rows
+        }
+
+    def search_similar(self, vector: list[float], tenant_id: int, limit=5, ef_search: int | None = None,
+                       probes: int | None = None, exact: bool = False,
+                       exclude_conversation_ids: Optional[list[int]] = None,
+                       from_number: Optional[str] = None,
+                       created_after: Optional[datetime] = None,
+                       created_before: Optional[datetime] = None,
+                       model_version: Optional[str] = None,
+                       dimensions: Optional[int] = None):
+        """
+        Search for similar messages using Cosine Distance, within one tenant.
+        tenant_id is required: there is no cross-tenant search.
+
+        Only rows of one model are compared (the active one unless given; the
+        query vector must come from the same model). The embedding column is
+        dimensionless, so the query casts it to vector(dims), which matches the
+        expression in that model's partial ANN index.
+
+        Filters are pushed into the WHERE clause on denormalized columns. With a
+        selective filter (the tenant filter is always one) HNSW may find fewer
+        than `limit` matches in its first candidate list, so searches enable
+        pgvector's iterative scan (pgvector 0.8+, see VECTOR_ITERATIVE_SCAN).
+
+        The ANN index trades recall for speed; callers can tune it per query:
+        - ef_search: HNSW candidate list size (default VECTOR_HNSW_EF_SEARCH);
+          always raised to at least `limit`, since HNSW returns at most ef_search rows.
+        - probes: IVFFlat lists to visit (pgvector default 1).
+        - exact: bypass the index for a sequential, 100% recall scan.
+        Settings are applied with set_config(..., true) so they end with the transaction.
+        """
+        if tenant_id is None:
+            raise ValueError("search_similar requires a tenant_id")
+        if not model_version:
+            model_version, dimensions = self.active_model()
+        dims = int(dimensions or len(vector))
+
+        # psycopg2 inlines parameters client-side, so the planner sees the
+        # literal it needs to match the model's partial index predicate.
+        filters = ["model_version = :model_version", "tenant_id = :tenant_id"]
+        params = {"vec": vector_literal(vector), "limit": limit,
+                  "model_version": model_version, "tenant_id": tenant_id}
+        if exclude_conversation_ids:
+            filters.append("coalesce(conversation_id, 0) <> ALL(CAST(:exclude_ids AS integer[]))")
+            params["exclude_ids"] = list(exclude_conversation_ids)
+        if from_number:
+            filters.append("from_number = :from_number")
+            params["from_number"] = from_number
+        if created_after:
+            filters.append("message_created_at >= :created_after")
+            params["created_after"] = created_after
+        if created_before:
+            filters.append("message_created_at < :created_before")
+            params["created_before"] = created_before
+
+        where = f"WHERE {' AND '.join(filters)}"
+        # The query vector is sent once and referenced as an InitPlan,
+        # which pgvector can still use for an index-ordered scan.
+        sql = text(f"""
+            WITH q AS (SELECT CAST(:vec AS vector({dims})) AS v)
+            SELECT message_id, embedding::vector({dims}) <=> (SELECT v FROM q) as distance 
             FROM message_embeddings
-            ORDER BY distance ASC
+            {where}
+            ORDER BY embedding::vector({dims}) <=> (SELECT v FROM q)
             LIMIT :limit
         """)
         
         try:
-            rows = self.db.execute(sql, {"vec": str(vector), "limit": limit}).fetchall()
+            if settings.VECTOR_ITERATIVE_SCAN and not exact:
+                self._set_local("hnsw.iterative_scan", "strict_order")
+            if not exact:
+                self._set_local("hnsw.ef_search", max(ef_search or settings.VECTOR_HNSW_EF_SEARCH, limit))
+            if probes:
+                self._set_local("ivfflat.probes", probes)
+            if exact:
+                self._set_local("enable_indexscan", "off")
+            rows = self.db.execute(sql, params).fetchall()
             return rows
         except Exception as e:
             logger.error(f"Error executing similarity search: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def _set_local(self, name: str, value):
+        self.db.execute(text("SELECT set_config(:name, :value, true)"), {"name": name, "value": str(value)})
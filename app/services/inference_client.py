@@ -0,0 +1,190 @@
+"""
+Module: Inference Client
+Context: Pod C - Module 5 (AI Sentiment).
+
+Talks to the shared sentiment inference server (app/inference_server.py) over
+a Unix socket, so Celery children don't each hold a copy of the model.
+
+Wire format: each frame is a 4-byte big-endian length followed by a JSON
+object. Requests are {"id", "texts"}; responses are {"id", "results"} or
+{"id", "error", "busy"}. Responses can arrive out of order, so each process
+keeps one connection with a reader thread that resolves futures by ID.
+
+Backpressure comes from both sides:
+- The client keeps at most SENTIMENT_CLIENT_MAX_INFLIGHT requests in flight
+  per process; submit() blocks (up to the timeout) when they're all taken.
+- The server answers "busy" once SENTIMENT_SERVER_MAX_PENDING texts are
+  queued, which surfaces as InferenceBusy instead of an unbounded queue.
+"""
+
+import itertools
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeout
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+class InferenceBusy(Exception):
+    """The server (or this process's in-flight limit) is saturated; retry later."""
+
+class InferenceUnavailable(Exception):
+    """The inference server can't be reached or dropped the connection."""
+
+def encode_frame(message: dict) -> bytes:
+    body = json.dumps(message, separators=(",", ":")).encode()
+    return FRAME_HEADER.pack(len(body)) + body
+
+def decode_length(header: bytes) -> int:
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {length} bytes exceeds the limit")
+    return length
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("Inference server closed the connection")
+        buf.extend(chunk)
+    return bytes(buf)
+
+def read_frame(sock: socket.socket) -> dict:
+    length = decode_length(_recv_exact(sock, FRAME_HEADER.size))
+    return json.loads(_recv_exact(sock, length))
+
+def _resolve(future: Future, result=None, error: Exception | None = None):
+    # The caller may have cancelled after a timeout
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+class InferenceClient:
+    def __init__(self, socket_path: str | None = None, max_inflight: int | None = None,
+                 timeout: float | None = None):
+        self.socket_path = socket_path or settings.SENTIMENT_SOCKET_PATH
+        self.timeout = timeout or settings.SENTIMENT_CLIENT_TIMEOUT_SECONDS
+        self._slots = threading.BoundedSemaphore(max_inflight or settings.SENTIMENT_CLIENT_MAX_INFLIGHT)
+        # Re-entrant: resolving a future runs done-callbacks under the lock
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._pending: dict[int, Future] = {}
+        self._sock: socket.socket | None = None
+        self._pid: int | None = None
+
+    def _connection(self) -> socket.socket:
+        # A connection inherited across fork would be shared by two processes
+        if self._sock is not None and self._pid == os.getpid():
+            return self._sock
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise InferenceUnavailable(f"Cannot reach inference server at {self.socket_path}: {e}")
+
+        self._sock, self._pid = sock, os.getpid()
+        self._pending = {}
+        threading.Thread(target=self._read_loop, args=(sock,), name="inference-client", daemon=True).start()
+        return sock
+
+    def submit(self, texts: list[str]) -> Future:
+        """
+        Sends texts for classification without waiting for the result.
+
+        Returns:
+            Future: Resolves to one {"label", "score"} dict per text.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise InferenceBusy("Too many inference requests in flight")
+
+        future = Future()
+        future.add_done_callback(lambda _: self._slots.release())
+        with self._lock:
+            try:
+                sock = self._connection()
+            except InferenceUnavailable as e:
+                _resolve(future, error=e)
+                return future
+
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            try:
+                sock.sendall(encode_frame({"id": request_id, "texts": texts}))
+            except OSError as e:
+                self._drop(sock, e)
+        return future
+
+    def classify(self, texts: list[str], timeout: float | None = None) -> list[dict]:
+        future = self.submit(texts)
+        try:
+            return future.result(timeout or self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise
+
+    def _read_loop(self, sock: socket.socket):
+        try:
+            while True:
+                message = read_frame(sock)
+                with self._lock:
+                    future = self._pending.pop(message.get("id"), None)
+                if future is None:
+                    continue
+                if "error" in message:
+                    error_type = InferenceBusy if message.get("busy") else RuntimeError
+                    _resolve(future, error=error_type(message["error"]))
+                else:
+                    _resolve(future, message["results"])
+        except (OSError, ValueError) as e:
+            with self._lock:
+                self._drop(sock, e)
+
+    def _drop(self, sock: socket.socket, error: Exception):
+        """Fails everything in flight on a broken connection. Caller holds the lock."""
+        if self._sock is not sock:
+            return
+        logger.warning(f"Inference connection lost: {error}")
+        self._sock = None
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            _resolve(future, error=InferenceUnavailable(str(error)))
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+    def close(self):
+        with self._lock:
+            if self._sock is not None:
+                self._drop(self._sock, ConnectionError("client closed"))
+
+class RemotePipeline:
+    """
+    Stands in for a transformers pipeline (same call and result shape) and
+    forwards to the inference server, which does its own batching. Large
+    inputs go out one request of at most batch_size texts at a time, so they
+    fit under the server's pending limit next to other workers' requests (the
+    server runs one forward pass at a time anyway).
+    """
+    def __init__(self, client: InferenceClient | None = None):
+        self.client = client or InferenceClient()
+
+    def __call__(self, texts, batch_size: int | None = None, truncation: bool = True,
+                 max_length: int | None = None) -> list[dict]:
+        texts = list(texts)
+        size = batch_size or settings.SENTIMENT_BATCH_SIZE
+        return [r for i in range(0, len(texts), size) for r in self.client.classify(texts[i:i + size])]
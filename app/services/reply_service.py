@@ -1,13 +1,13 @@
 # app/services/reply_service.py
-import requests
 import logging
 from typing import List
 from sqlalchemy.orm import Session
-from app.models import ChatMessage
+from app.models import ChatMessage, Conversation
 from app.models import ReplySuggestion
 # Import the Vector Service for RAG (Retrieval Augmented Generation)
 from app.services.embedding_service import EmbeddingService
 from app.core.config import settings
+from app.core.http_client import get_session
 
 logger = logging.getLogger(__name__)
 
@@ -63,14 +63,28 @@ class ReplyService:
         
         # 2. RAG Retrieval: Search for similar past resolved cases
         knowledge_context = ""
-        if last_customer_msg and last_customer_msg.text:
+        convo = self.db.get(Conversation, conversation_id)
+        if convo is None or convo.tenant_id is None:
+            # Search is per tenant; without one there is nothing we may search
+            logger.warning(f"Conversation {conversation_id} has no tenant; skipping RAG lookup.")
+        elif last_customer_msg and last_customer_msg.text:
             try:
                 # A. Generate vector embedding for the incoming question
-                query_vec = self.vector_svc.embed_text(last_customer_msg.text)
+                # (pinned to one model so the query and stored vectors match)
+                model_version, dimensions = self.vector_svc.active_model()
+                query_vec = self.vector_svc.embed_text(last_customer_msg.text, model=model_version)
                 
                 # B. Search vector DB for semantically similar messages
+                # Scoped to this tenant, skipping the current thread (it's already in the prompt)
                 # Returns list of tuples: (message_id, distance)
-                similar_results = self.vector_svc.search_similar(query_vec, limit=2)
+                similar_results = self.vector_svc.search_similar(
+                    query_vec,
+                    limit=2,
+                    tenant_id=convo.tenant_id,
+                    exclude_conversation_ids=[conversation_id],
+                    model_version=model_version,
+                    dimensions=dimensions,
+                )
                 
                 if similar_results:
                     knowledge_context = "\nRelevant Past Responses:\n"
@@ -112,7 +126,7 @@ class ReplyService:
         }
 
         try:
-            response = requests.post(CHAT_URL, json=payload, headers=headers, timeout=15)
+            response = get_session().post(CHAT_URL, json=payload, headers=headers, timeout=15)
             response.raise_for_status()
             content = response.json().get("text", "")
         except Exception as e:
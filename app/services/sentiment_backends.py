@@ -0,0 +1,116 @@
+"""
+Module: Sentiment Inference Backends
+Context: Pod C - Module 5 (AI Sentiment).
+
+Loaders for the sentiment model, selected with SENTIMENT_BACKEND:
+
+- "torch":     the transformers PyTorch pipeline (reference).
+- "onnx":      the same weights exported to ONNX and run with ONNX Runtime.
+- "onnx-int8": the ONNX export with dynamic int8 quantization of the linear
+               layers. Fastest on CPU at a small, tested accuracy cost
+               (tests/unit/test_sentiment_backends.py).
+- "remote":    no local model; requests go to the shared inference server
+               (app/inference_server.py), which runs one of the above.
+
+Every backend returns a transformers pipeline (or, for "remote", a stand-in
+with the same call), so SentimentService calls it the same way. The ONNX backends use Hugging Face
+Optimum (pip install "optimum[onnxruntime]"), which is only imported when
+selected.
+
+The export runs once per SENTIMENT_ONNX_DIR on first load (or ahead of time
+with `python -m app.services.sentiment_backends`), into a temporary
+directory renamed into place so concurrent workers never see a partial model.
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "onnx", "onnx-int8", "remote")
+QUANTIZED_FILE = "model_quantized.onnx"
+
+def load_torch(model: str):
+    from transformers import pipeline
+    return pipeline("sentiment-analysis", model=model)
+
+def export_dir(model: str, quantize: bool) -> str:
+    slug = model.replace("/", "--")
+    return os.path.join(settings.SENTIMENT_ONNX_DIR, f"{slug}-int8" if quantize else slug)
+
+def export_onnx(model: str, quantize: bool) -> str:
+    """
+    Exports the model (and tokenizer) to ONNX, optionally int8-quantized.
+
+    Returns:
+        str: Directory holding the exported model.
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    target = export_dir(model, quantize)
+    if os.path.isdir(target):
+        return target
+
+    os.makedirs(settings.SENTIMENT_ONNX_DIR, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=settings.SENTIMENT_ONNX_DIR, prefix=".export-")
+    try:
+        logger.info(f"Exporting {model} to ONNX{' (int8)' if quantize else ''}...")
+        ORTModelForSequenceClassification.from_pretrained(model, export=True).save_pretrained(staging)
+        AutoTokenizer.from_pretrained(model).save_pretrained(staging)
+
+        if quantize:
+            # Dynamic quantization: int8 weights, activations quantized at run
+            # time, so no calibration data is needed. AVX2 runs on any x86 worker.
+            qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+            ORTQuantizer.from_pretrained(staging).quantize(save_dir=staging, quantization_config=qconfig)
+
+        try:
+            os.rename(staging, target)
+        except OSError:
+            # Another worker finished the same export first
+            if not os.path.isdir(target):
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return target
+
+def load_onnx(model: str, quantize: bool = False):
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer, pipeline
+
+    path = export_onnx(model, quantize)
+    ort_model = ORTModelForSequenceClassification.from_pretrained(
+        path, file_name=QUANTIZED_FILE if quantize else "model.onnx"
+    )
+    return pipeline("sentiment-analysis", model=ort_model, tokenizer=AutoTokenizer.from_pretrained(path))
+
+def load_pipeline(backend: str | None = None, model: str | None = None):
+    """Builds the sentiment pipeline for a backend (default: SENTIMENT_BACKEND)."""
+    backend = backend or settings.SENTIMENT_BACKEND
+    model = model or settings.SENTIMENT_MODEL
+    if backend == "torch":
+        return load_torch(model)
+    if backend == "onnx":
+        return load_onnx(model, quantize=False)
+    if backend == "onnx-int8":
+        return load_onnx(model, quantize=True)
+    if backend == "remote":
+        from app.services.inference_client import RemotePipeline
+        return RemotePipeline()
+    raise ValueError(f"Unknown sentiment backend '{backend}'. Use one of {BACKENDS}.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the sentiment model to ONNX ahead of deploys")
+    parser.add_argument("--model", default=settings.SENTIMENT_MODEL)
+    parser.add_argument("--int8", action="store_true", help="Also write the int8-quantized model")
+    args = parser.parse_args()
+
+    print(export_onnx(args.model, quantize=False))
+    if args.int8:
+        print(export_onnx(args.model, quantize=True))
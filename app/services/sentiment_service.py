@@ -5,24 +5,42 @@ Context: Pod C - Module 5 (AI Sentiment).
 
 This service uses a local Transformer model (Hugging Face) to tag incoming
 messages with sentiment labels (positive, negative, neutral).
+
+The model is loaded lazily through the model registry, so importing this
+module (as the web process does) doesn't load torch. SENTIMENT_BACKEND picks
+PyTorch or ONNX Runtime (see sentiment_backends.py).
+
+Inference is batched: the pipeline pads a batch of texts into one forward
+pass, which on CPU is several times faster per message than one call per
+text (see benchmarks/bench_sentiment.py). Labels are written back with a
+single UPDATE per batch. If a batch fails, its messages are retried one by
+one; a text that still fails is stored as 'error' so the sweep moves past it.
 """
 
 import logging
+from sqlalchemy import text
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.models import ChatMessage
-# transformers is a heavy import; it loads the model into memory.
-from transformers import pipeline
+from app.core.model_registry import model_registry
+from app.services.inference_client import InferenceBusy, InferenceUnavailable
 
 logger = logging.getLogger(__name__)
 
-# Initialize the pipeline at module level.
-# This ensures the model is loaded once (singleton pattern) rather than per-request.
-# It downloads the default model (~200MB) to HF_HOME on first run.
-try:
-    sentiment_pipeline = pipeline("sentiment-analysis")
-except Exception as e:
-    logger.error(f"Failed to load sentiment model: {e}")
-    sentiment_pipeline = None
+# Failures that say nothing about the text: the message stays unscored and is retried
+TRANSIENT_ERRORS = (InferenceBusy, InferenceUnavailable, TimeoutError)
+
+def _load_sentiment_pipeline():
+    # transformers is a heavy import (torch or onnxruntime); only processes that
+    # run inference pay for it. Downloads the model (~250MB) to HF_HOME on first run.
+    from app.services.sentiment_backends import load_pipeline
+    return load_pipeline()
+
+model_registry.register("sentiment", _load_sentiment_pipeline)
+
+def get_sentiment_pipeline():
+    """The sentiment pipeline, loaded on first use (None if it failed to load)."""
+    return model_registry.get("sentiment")
 
 class SentimentService:
     def __init__(self, db: Session):
@@ -38,7 +56,7 @@ class SentimentService:
         Returns:
             str: The detected sentiment label (e.g., 'positive', 'negative').
         """
-        if not sentiment_pipeline:
+        if not get_sentiment_pipeline():
             logger.warning("Sentiment pipeline not active. Skipping analysis.")
             return "unknown"
 
@@ -47,25 +65,111 @@ class SentimentService:
         if not message:
             raise ValueError(f"Message ID {message_id} not found.")
 
-        # Pre-check: Don't crash on empty text (e.g., image-only messages)
-        if not message.text or not message.text.strip():
-            return "neutral"
+        return self.analyze_batch([message]).get(message_id, "error")
 
-        # Truncate text to 512 tokens (standard BERT limit) to prevent crashes
-        text_sample = message.text[:512]
-        
-        try:
-            # Run inference
-            result = sentiment_pipeline(text_sample)[0]
-            label = result["label"].lower() # Standardize to lowercase
-            
-            # Persist result
-            message.sentiment = label
-            self.db.commit()
-            self.db.refresh(message)
-            
-            return label
-            
-        except Exception as e:
-            logger.error(f"Sentiment analysis inference failed: {e}")
-            return "error"
\ No newline at end of file
+    def classify(self, texts: list[str]) -> list[str]:
+        """
+        Runs the model over many texts in SENTIMENT_BATCH_SIZE forward passes.
+        The tokenizer truncates to SENTIMENT_MAX_TOKENS (BERT's 512 limit) so
+        long messages can't crash a batch.
+        """
+        # Cheap character cap so huge messages don't cost a full tokenization
+        max_chars = settings.SENTIMENT_MAX_TOKENS * 8
+        results = get_sentiment_pipeline()(
+            [t[:max_chars] for t in texts],
+            batch_size=settings.SENTIMENT_BATCH_SIZE,
+            truncation=True,
+            max_length=settings.SENTIMENT_MAX_TOKENS,
+        )
+        return [r["label"].lower() for r in results]  # Standardize to lowercase
+
+    def analyze_batch(self, messages) -> dict[int, str]:
+        """
+        Scores many messages (anything with .id and .text) with batched
+        inference and writes all labels back in one UPDATE.
+
+        Returns:
+            dict[int, str]: Label per message ID. 'pending' if inference was
+            unavailable (those messages stay unscored and are retried);
+            'error' (stored) if the text itself can't be scored.
+        """
+        if not get_sentiment_pipeline():
+            logger.warning("Sentiment pipeline not active. Skipping analysis.")
+            return {}
+
+        # Pre-check: Don't run the model on empty text (e.g., image-only messages)
+        labels = {m.id: "neutral" for m in messages if not m.text or not m.text.strip()}
+        to_score = [m for m in messages if m.id not in labels]
+
+        unscored = {}
+        if to_score:
+            try:
+                labels.update(zip([m.id for m in to_score], self.classify([m.text for m in to_score])))
+            except TRANSIENT_ERRORS as e:
+                logger.warning(f"Sentiment inference unavailable: {e}")
+                unscored = {m.id: "pending" for m in to_score}
+            except Exception as e:
+                logger.error(f"Sentiment inference failed for a batch of {len(to_score)}, scoring one by one: {e}")
+                unscored = self._classify_each(to_score, labels)
+
+        self._store(labels)
+        return {**labels, **unscored}
+
+    def _classify_each(self, messages, labels: dict[int, str]) -> dict[int, str]:
+        """
+        Scores messages one at a time into `labels` after a batch failed, so
+        one bad text can't hold back the rest. Texts that still fail get the
+        terminal label 'error'.
+
+        Returns:
+            dict[int, str]: 'pending' per message left unscored because
+            inference became unavailable.
+        """
+        for i, m in enumerate(messages):
+            try:
+                labels[m.id] = self.classify([m.text])[0]
+            except TRANSIENT_ERRORS as e:
+                logger.warning(f"Sentiment inference unavailable: {e}")
+                return {rest.id: "pending" for rest in messages[i:]}
+            except Exception as e:
+                logger.error(f"Sentiment inference failed for message {m.id}, marking it 'error': {e}")
+                labels[m.id] = "error"
+        return {}
+
+    def score_pending(self, limit: int | None = None) -> int:
+        """
+        Scores the oldest messages that haven't been through the model yet.
+
+        Returns:
+            int: Number of messages scored (including ones stored as 'error').
+        """
+        pending = (
+            self.db.query(ChatMessage.id, ChatMessage.text)
+            .filter(ChatMessage.sentiment_scored_at.is_(None), ChatMessage.sentiment == "neutral")
+            .order_by(ChatMessage.id)
+            .limit(limit or settings.SENTIMENT_SWEEP_LIMIT)
+            .all()
+        )
+        if not pending:
+            return 0
+        labels = self.analyze_batch(pending)
+        return sum(1 for label in labels.values() if label != "pending")
+
+    def _store(self, labels: dict[int, str]):
+        """Writes all labels with one UPDATE ... FROM (VALUES ...) and commits."""
+        if not labels:
+            return
+
+        params, rows = {}, []
+        for i, (message_id, label) in enumerate(labels.items()):
+            rows.append(f"(CAST(:id{i} AS integer), CAST(:label{i} AS varchar))")
+            params[f"id{i}"] = message_id
+            params[f"label{i}"] = label
+
+        self.db.execute(text(f"""
+            UPDATE chat_messages AS m
+            SET sentiment = v.label, sentiment_scored_at = now()
+            FROM (VALUES {", ".join(rows)}) AS v(id, label)
+            WHERE m.id = v.id
+        """), params)
+        self.db.commit()
@@ -4,73 +4,176 @@ Module: Message Status Management
 Context: Pod C - Module 6 (Reliability & Delivery Receipts).
 
 This service processes WhatsApp delivery receipts (webhooks).
-It ensures we track the lifecycle (Sent -> Delivered -> Read) accurately
-and handles idempotent updates (ignoring duplicates).
+It ensures we track the lifecycle (Pending -> Sent -> Delivered -> Read, with
+Failed as a terminal state) accurately and handles idempotent updates
+(ignoring duplicates and late receipts). The ordering is enforced inside the
+upsert statement itself, so concurrent webhook workers need no locks.
 """
 
 import logging
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case, select, literal, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.models import MessageStatus
 from app.models import ChatMessage
 
 logger = logging.getLogger(__name__)
 
+# Lifecycle ordering of WhatsApp receipts. A status may only move "up" this
+# ladder, so late or duplicated webhooks can never roll a message back.
+# 'failed' is terminal: nothing overrides it once recorded.
+STATUS_RANK = {
+    "pending": 0,
+    "sent": 1,
+    "delivered": 2,
+    "read": 3,
+    "failed": 4,
+}
+
+def status_rank_sql(column):
+    """SQL CASE expression mapping a status column to its STATUS_RANK."""
+    return case(STATUS_RANK, value=column, else_=-1)
+
 class StatusService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _rank_guarded_upsert(self, insert_stmt):
+        """
+        Adds the state-machine guard to an INSERT into message_status.
+        On conflict the row is only updated when the incoming status ranks higher,
+        so the transition check and the write happen atomically in one statement.
+        """
+        return insert_stmt.on_conflict_do_update(
+            index_elements=[MessageStatus.message_id],
+            set_={
+                "wa_status": insert_stmt.excluded.wa_status,
+                "last_error": func.coalesce(insert_stmt.excluded.last_error, MessageStatus.last_error),
+                "updated_at": func.now(),
+            },
+            where=status_rank_sql(MessageStatus.wa_status) < status_rank_sql(insert_stmt.excluded.wa_status),
+        )
+
     def update_status(self, wamid: str, new_status: str, error: str = None) -> MessageStatus | None:
         """
         Updates the delivery status of a message based on a webhook event.
+        The WAMID lookup, insert and guarded update run as a single
+        INSERT ... SELECT ... ON CONFLICT statement (no read-modify-write race).
         
         Args:
             wamid (str): WhatsApp Message ID (from the webhook).
             new_status (str): The new status (sent, delivered, read, failed).
             error (str, optional): Raw error message if failed.
         """
-        # 1. Locate the original message
+        if new_status not in STATUS_RANK:
+            logger.warning(f"Status Update Ignored: Unsupported status '{new_status}' for WAMID {wamid}")
+            return None
+
         # We link statuses to our internal ChatMessage via the WAMID
-        chat_msg = self.db.query(ChatMessage).filter(ChatMessage.message_id == wamid).first()
+        source = (
+            select(ChatMessage.id, literal(new_status, String), literal(error, String))
+            .where(ChatMessage.message_id == wamid)
+        )
+        stmt = self._rank_guarded_upsert(
+            pg_insert(MessageStatus).from_select(["message_id", "wa_status", "last_error"], source)
+        ).returning(MessageStatus.id)
 
-        if not chat_msg:
+        try:
+            status_id = self.db.execute(stmt).scalar()
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"DB Commit failed for status update: {e}")
+            self.db.rollback()
+            raise
+
+        if status_id:
+            logger.info(f"Status updated for WAMID {wamid} -> {new_status}")
+            return self.db.get(MessageStatus, status_id)
+
+        # Nothing written: either the message is unknown or the receipt is stale
+        status_row = (
+            self.db.query(MessageStatus)
+            .join(ChatMessage, ChatMessage.id == MessageStatus.message_id)
+            .filter(ChatMessage.message_id == wamid)
+            .first()
+        )
+        if not status_row:
             logger.warning(f"Status Update Ignored: Unknown WAMID {wamid}")
             return None
 
-        # 2. Find or Create the Status Record (Upsert)
-        status_row = self.db.query(MessageStatus).filter(MessageStatus.message_id == chat_msg.id).first()
+        logger.debug(f"Ignoring stale status '{new_status}' for Msg {status_row.message_id}")
+        return status_row
 
-        if not status_row:
-            # Create new tracking record
-            status_row = MessageStatus(
-                message_id=chat_msg.id,
-                wa_status=new_status,
-                last_error=error
-            )
-            self.db.add(status_row)
-            logger.info(f"Tracking started for Msg {chat_msg.id}: {new_status}")
-        else:
-            # Update existing record (Idempotency Check)
-            # If current is 'read', ignore 'delivered' updates that arrive late
-            if status_row.wa_status == "read" and new_status == "delivered":
-                logger.debug(f"Ignoring stale status '{new_status}' for Msg {chat_msg.id}")
-                return status_row
-
-            status_row.wa_status = new_status
-            if error:
-                status_row.last_error = error
-            
-            logger.info(f"Status updated for Msg {chat_msg.id} -> {new_status}")
-
-        # 3. Persist Changes
+    def update_statuses_bulk(self, receipts: list[dict]) -> int:
+        """
+        Applies a batch of delivery receipts (see apply_statuses_bulk) and commits.
+
+        Args:
+            receipts (list[dict]): Items with 'id' (WAMID), 'status' and optional 'error'.
+
+        Returns:
+            int: Number of status rows inserted or advanced.
+        """
         try:
+            written = self.apply_statuses_bulk(receipts)
             self.db.commit()
-            self.db.refresh(status_row)
-            return status_row
         except Exception as e:
-            logger.error(f"DB Commit failed for status update: {e}")
+            logger.error(f"DB Commit failed for bulk status update: {e}")
             self.db.rollback()
             raise
+        return written
+
+    def apply_statuses_bulk(self, receipts: list[dict]) -> int:
+        """
+        Applies a batch of delivery receipts with two statements in total,
+        without committing.
+
+        1. Resolves every WAMID to its ChatMessage in a single IN query.
+        2. Collapses receipts per message in memory, keeping the highest rank.
+        3. Writes all rows with one INSERT ... ON CONFLICT DO UPDATE whose WHERE
+           clause only lets a status move forward (rank guard), so concurrent or
+           out-of-order webhooks can't downgrade a row.
+
+        Returns:
+            int: Number of status rows inserted or advanced.
+        """
+        # Statuses outside the lattice (e.g. 'warning') are rejected by the CHECK constraint
+        receipts = [r for r in receipts if r.get("id") and r.get("status") in STATUS_RANK]
+        wamids = {r["id"] for r in receipts}
+        if not wamids:
+            return 0
+
+        # 1. Locate the original messages (one round trip for the whole batch)
+        id_by_wamid = dict(
+            self.db.query(ChatMessage.message_id, ChatMessage.id)
+            .filter(ChatMessage.message_id.in_(wamids))
+            .all()
+        )
+
+        # 2. Keep only the most advanced receipt per message
+        latest: dict[int, dict] = {}
+        for r in receipts:
+            msg_id = id_by_wamid.get(r.get("id"))
+            if msg_id is None:
+                continue
+            current = latest.get(msg_id)
+            if current is None or STATUS_RANK[r["status"]] > STATUS_RANK[current["wa_status"]]:
+                latest[msg_id] = {"message_id": msg_id, "wa_status": r["status"], "last_error": r.get("error")}
+
+        unknown = len(wamids) - len(id_by_wamid)
+        if unknown:
+            logger.warning(f"Status Update Ignored: {unknown} unknown WAMIDs in batch")
+        if not latest:
+            return 0
+
+        # 3. Single upsert guarded by the status rank
+        stmt = self._rank_guarded_upsert(
+            pg_insert(MessageStatus).values(list(latest.values()))
+        ).returning(MessageStatus.message_id)
+        written = len(self.db.execute(stmt).all())
+
+        logger.info(f"Bulk status update: {written} of {len(latest)} messages advanced.")
+        return written
 
     def get_metrics(self) -> dict:
         """
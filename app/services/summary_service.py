@@ -8,11 +8,11 @@ customer conversations. It is typically called by the /vector/summarize endpoint
 or a background job to update CRM notes.
 """
 
-import requests
 import logging
 from sqlalchemy.orm import Session
 from app.services.chat_service import ChatService
 from app.core.config import settings
+from app.core.http_client import get_session
 
 logger = logging.getLogger(__name__)
 
@@ -69,7 +69,7 @@ class SummaryService:
         }
 
         try:
-            response = requests.post(CHAT_URL, json=payload, headers=headers, timeout=20)
+            response = get_session().post(CHAT_URL, json=payload, headers=headers, timeout=20)
             response.raise_for_status()
             
             # Extract text from Cohere response structure
@@ -0,0 +1,129 @@
+"""
+Module: Vector Index Management
+Context: Pod C - Module 4 (AI).
+
+Maintains the ANN indexes on message_embeddings.embedding.
+
+Each embedding model gets its own partial index on (embedding::vector(dims))
+WHERE model_version = '<model>', so a new model can be indexed in the
+background while searches keep using the active model's index, and models with
+different dimensions can share the table.
+
+- build(): build an index (HNSW or IVFFlat, given parameters) for a model next
+  to any existing one, then swap names. Searches keep using the old index
+  until the new one is valid.
+- reindex(): REINDEX CONCURRENTLY a model's index (e.g. after bulk loads or
+  a large number of deletes have degraded the HNSW graph).
+- drop(): remove a retired model's index.
+
+All statements use CONCURRENTLY, which is not allowed inside a transaction,
+so the service runs on its own AUTOCOMMIT connection.
+"""
+
+import hashlib
+import logging
+import math
+import re
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+INDEX_PREFIX = "ix_message_embeddings_ann_"
+INDEX_TYPES = ("hnsw", "ivfflat")
+# Model names are inlined into DDL (index predicates can't take parameters)
+MODEL_VERSION_PATTERN = re.compile(r"^[A-Za-z0-9._:-]+$")
+
+def validate_model_version(model_version: str) -> str:
+    if not MODEL_VERSION_PATTERN.match(model_version or ""):
+        raise ValueError(f"Invalid model version '{model_version}'.")
+    return model_version
+
+def index_name(model_version: str) -> str:
+    """Stable per-model index name within Postgres' 63-character limit."""
+    slug = re.sub(r"[^a-z0-9]+", "_", model_version.lower()).strip("_")
+    name = INDEX_PREFIX + slug
+    if len(name) > 63:
+        name = name[:54] + "_" + hashlib.sha1(model_version.encode()).hexdigest()[:8]
+    return name
+
+class VectorIndexService:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def _connect(self):
+        return self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+
+    def status(self, model_version: str) -> dict | None:
+        """
+        Returns a model's index definition, size and validity (None if missing).
+        An invalid index is what a failed CONCURRENTLY build leaves behind.
+        """
+        with self._connect() as conn:
+            row = conn.execute(text("""
+                SELECT pg_get_indexdef(i.indexrelid) AS definition,
+                       pg_relation_size(i.indexrelid) AS size_bytes,
+                       i.indisvalid AS valid
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = :name
+            """), {"name": index_name(model_version)}).mappings().first()
+            return dict(row) if row else None
+
+    def reindex(self, model_version: str):
+        name = index_name(model_version)
+        logger.info(f"Reindexing {name} concurrently...")
+        with self._connect() as conn:
+            conn.execute(text(f"REINDEX INDEX CONCURRENTLY {name}"))
+
+    def build(self, model_version: str, dimensions: int, index_type: str = "hnsw", m: int = 16,
+              ef_construction: int = 64, lists: int | None = None,
+              maintenance_work_mem: str | None = None):
+        """
+        Builds a model's ANN index with the given parameters and swaps it in.
+
+        For IVFFlat, lists defaults to rows/1000 (up to 1M rows) or sqrt(rows)
+        above that, per the pgvector guidance. Build it after the data is loaded.
+        """
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unsupported index type '{index_type}'. Use one of {INDEX_TYPES}.")
+        validate_model_version(model_version)
+
+        name = index_name(model_version)
+        tmp_name = f"{name[:59]}_new"
+        predicate = f"model_version = '{model_version}'"
+
+        with self._connect() as conn:
+            if maintenance_work_mem:
+                # HNSW builds are much faster when the graph fits in memory
+                conn.execute(text("SELECT set_config('maintenance_work_mem', :v, false)"), {"v": maintenance_work_mem})
+
+            if index_type == "hnsw":
+                options = f"m = {int(m)}, ef_construction = {int(ef_construction)}"
+            else:
+                if not lists:
+                    rows = conn.execute(
+                        text("SELECT count(*) FROM message_embeddings WHERE model_version = :mv"),
+                        {"mv": model_version},
+                    ).scalar() or 0
+                    lists = rows // 1000 if rows <= 1_000_000 else int(math.sqrt(rows))
+                options = f"lists = {max(int(lists), 1)}"
+
+            # Leftover from an interrupted build
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {tmp_name}"))
+
+            logger.info(f"Building {index_type} index ({options}) for {model_version}...")
+            conn.execute(text(
+                f"CREATE INDEX CONCURRENTLY {tmp_name} ON message_embeddings "
+                f"USING {index_type} ((embedding::vector({int(dimensions)})) vector_cosine_ops) "
+                f"WITH ({options}) WHERE {predicate}"
+            ))
+
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            conn.execute(text(f"ALTER INDEX {tmp_name} RENAME TO {name}"))
+
+        logger.info(f"{name} built as {index_type}.")
+
+    def drop(self, model_version: str):
+        with self._connect() as conn:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name(model_version)}"))
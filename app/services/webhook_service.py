@@ -0,0 +1,97 @@
+"""
+Module: Webhook Ingestion Service
+Context: Pod C - Module 3 & 6 (Integrations).
+
+Turns a raw WhatsApp (Meta) webhook payload into persisted data.
+Messages and status receipts from every entry/change are collected first and
+written in one transaction, so a payload (or a stream batch of payloads) costs
+one commit instead of one per message, and either all of it lands or none does.
+"""
+
+import logging
+from datetime import datetime, timezone
+from sqlalchemy.orm import Session
+from app.services.chat_service import ChatService
+from app.services.status_service import StatusService
+
+logger = logging.getLogger(__name__)
+
+def extract_events(payload: dict) -> tuple[list[dict], list[dict]]:
+    """
+    Flattens the entry -> changes -> value structure of a Meta payload.
+
+    Returns:
+        (messages, statuses): Inbound text messages and delivery receipts.
+    """
+    messages, statuses = [], []
+
+    for e in payload.get("entry", []):
+        for change in e.get("changes", []):
+            val = change.get("value", {})
+
+            # --- A. Incoming Text Messages (Module 3) ---
+            for m in val.get("messages", []):
+                if m.get("type") != "text":
+                    continue
+                sender = m.get("from")
+                text_body = m.get("text", {}).get("body")
+                if sender and text_body:
+                    # Keep the WhatsApp Message ID (WAMID) for status linking
+                    messages.append({"from_number": sender, "text": text_body, "message_id": m.get("id")})
+
+            # --- B. Status Updates (Module 6) ---
+            for s in val.get("statuses", []):
+                statuses.append({
+                    "id": s.get("id"),
+                    "status": s.get("status"),
+                    # Extract error details if present
+                    "error": str(s.get("errors")) if "errors" in s else None,
+                })
+
+    return messages, statuses
+
+class WebhookService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ingest(self, payload: dict) -> dict:
+        """
+        Persists all messages and status receipts contained in a webhook payload.
+
+        Returns:
+            dict: Counts of saved messages and processed statuses.
+        """
+        return self.ingest_many([payload])
+
+    def ingest_many(self, payloads: list[dict]) -> dict:
+        """
+        Same as ingest(), but merges several payloads into one batch.
+        Used by the stream worker to drain many webhook deliveries per commit:
+        messages and statuses commit together, so an entry is acked only once
+        all of it is stored.
+        """
+        messages, statuses = [], []
+        for payload in payloads:
+            m, s = extract_events(payload)
+            messages.extend(m)
+            statuses.extend(s)
+
+        chat = ChatService(self.db)
+        now = datetime.now(timezone.utc)
+        try:
+            convo_ids, saved_ids = chat.add_incoming_batch(messages, now) if messages else ({}, [])
+            # All receipts go through one IN lookup and one guarded upsert
+            updated = StatusService(self.db).apply_statuses_bulk(statuses) if statuses else 0
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to ingest {len(messages)} messages and {len(statuses)} statuses: {e}")
+            raise
+
+        chat.publish_incoming(convo_ids, saved_ids, now)
+        if messages:
+            logger.info(f"Saved {len(saved_ids)} of {len(messages)} chat messages from webhook.")
+        if statuses:
+            logger.info(f"Applied {updated} of {len(statuses)} status receipts from webhook.")
+
+        return {"messages": len(saved_ids), "statuses": len(statuses)}
@@ -0,0 +1,198 @@
+"""
+Module: Webhook Stream
+Context: Pod C - Module 3 (Integrations / Reliability).
+
+Durable buffer between the webhook endpoint and the database.
+In "stream" ingest mode the API only appends the verified raw body to a Redis
+Stream and acknowledges Meta immediately; a consumer group (app/stream_worker.py)
+drains the stream in batches.
+
+Entries are only XACKed after a successful DB commit, so anything a crashed
+consumer was holding stays in the Pending Entries List and is reclaimed by the
+next consumer. The stream is never capped on publish: only entries that every
+consumer has acked are trimmed (see WebhookStream.trim_acked), after being kept
+for WEBHOOK_STREAM_RETENTION_HOURS so they can be replayed; ingestion is
+idempotent on the WAMID.
+"""
+
+import logging
+import time
+from redis import Redis
+from redis.exceptions import ResponseError
+from app.core.cache import redis_client, sync_redis_client
+from app.core.config import settings
+from app.metrics.prometheus import WEBHOOK_STREAM_LENGTH, WEBHOOK_STREAM_PENDING, WEBHOOK_STREAM_LAG
+
+logger = logging.getLogger(__name__)
+
+async def publish_webhook(raw_body: bytes) -> str:
+    """
+    Appends a signature-verified webhook body to the stream.
+    Called from the request path, so it uses the async client.
+
+    Returns:
+        str: The stream entry ID.
+    """
+    return await redis_client.xadd(
+        settings.WEBHOOK_STREAM_KEY,
+        {"body": raw_body.decode("utf-8")},
+    )
+
+def _id_key(entry_id: str) -> tuple[int, int]:
+    """Stream IDs compare numerically on (milliseconds, sequence)."""
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+class WebhookStream:
+    """
+    Consumer-side operations on the webhook stream.
+    """
+    def __init__(self, client: Redis | None = None):
+        self.redis = client or sync_redis_client
+        self.key = settings.WEBHOOK_STREAM_KEY
+        self.group = settings.WEBHOOK_STREAM_GROUP
+        self.dead_letter_key = f"{self.key}:dead"
+
+    def ensure_group(self):
+        """Creates the consumer group (and the stream) if they don't exist yet."""
+        try:
+            self.redis.xgroup_create(self.key, self.group, id="0", mkstream=True)
+            logger.info(f"Created consumer group '{self.group}' on '{self.key}'.")
+        except ResponseError as e:
+            # BUSYGROUP: another worker created it first
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def read_own_pending(self, consumer: str, count: int) -> list[tuple[str, dict]]:
+        """
+        Entries already delivered to this consumer name but never acked.
+        Read once on startup so a restarted worker finishes what it was doing.
+        """
+        resp = self.redis.xreadgroup(self.group, consumer, {self.key: "0"}, count=count)
+        return resp[0][1] if resp else []
+
+    def read_batch(self, consumer: str, count: int, block_ms: int = 5000) -> list[tuple[str, dict]]:
+        """
+        Returns the next batch for this consumer.
+        Stale entries abandoned by crashed consumers are reclaimed first.
+        """
+        _, claimed, *_ = self.redis.xautoclaim(
+            self.key, self.group, consumer,
+            min_idle_time=settings.WEBHOOK_STREAM_CLAIM_IDLE_MS,
+            start_id="0-0",
+            count=count,
+        )
+        if claimed:
+            logger.warning(f"Reclaimed {len(claimed)} stale webhook entries.")
+            return self._drop_poison(claimed)
+
+        resp = self.redis.xreadgroup(self.group, consumer, {self.key: ">"}, count=count, block=block_ms)
+        return resp[0][1] if resp else []
+
+    def _drop_poison(self, entries: list[tuple[str, dict]]) -> list[tuple[str, dict]]:
+        """
+        Moves entries that keep failing to the dead-letter stream so they
+        can't block the group forever.
+        """
+        # One exact-ID lookup per entry: a range over the batch would also
+        # return other consumers' entries and could crowd these out
+        pipe = self.redis.pipeline(transaction=False)
+        for entry_id, _ in entries:
+            pipe.xpending_range(self.key, self.group, min=entry_id, max=entry_id, count=1)
+        deliveries = {p["message_id"]: p["times_delivered"] for pending in pipe.execute() for p in pending}
+
+        healthy = []
+        for entry_id, fields in entries:
+            if deliveries.get(entry_id, 0) > settings.WEBHOOK_STREAM_MAX_DELIVERIES:
+                logger.error(f"Webhook entry {entry_id} exceeded max deliveries. Moving to dead-letter.")
+                self.dead_letter(entry_id, fields)
+            else:
+                healthy.append((entry_id, fields))
+        return healthy
+
+    def dead_letter(self, entry_id: str, fields: dict | None):
+        """
+        Parks an entry on the dead-letter stream and acks the original.
+        Entries trimmed while pending come back from XREADGROUP with no
+        fields; only their ID is recorded.
+        """
+        if fields is None:
+            fields = {"reason": "trimmed"}
+        self.redis.xadd(self.dead_letter_key, {**fields, "source_id": entry_id})
+        self.ack([entry_id])
+
+    def ack(self, ids: list[str]):
+        if ids:
+            self.redis.xack(self.key, self.group, *ids)
+
+    def trim_acked(self) -> str | None:
+        """
+        Deletes entries that are acked and older than the retention window.
+        Nothing at or after the oldest pending (or not yet delivered) entry is
+        ever removed, so a consumer outage grows the stream instead of losing
+        webhooks; WEBHOOK_STREAM_ALERT_LENGTH flags that growth in stats().
+
+        Returns:
+            str | None: The MINID trimmed to, or None if the group doesn't exist yet.
+        """
+        group = next((g for g in self.redis.xinfo_groups(self.key) if g["name"] == self.group), None)
+        if group is None:
+            return None
+
+        # Everything after last-delivered-id is still undelivered
+        candidates = [group["last-delivered-id"]]
+        if group["pending"]:
+            candidates.append(self.redis.xpending(self.key, self.group)["min"])
+        retention_ms = settings.WEBHOOK_STREAM_RETENTION_HOURS * 3_600_000
+        candidates.append(f"{int(time.time() * 1000) - retention_ms}-0")
+
+        min_id = min(candidates, key=_id_key)
+        self.redis.xtrim(self.key, minid=min_id, approximate=True)
+        return min_id
+
+    def replay(self, start_id: str = "-", end_id: str = "+", count: int = 1000):
+        """
+        Iterates over retained entries (acked or not) for re-ingestion.
+        Yields batches of (entry_id, fields).
+        """
+        while True:
+            entries = self.redis.xrange(self.key, min=start_id, max=end_id, count=count)
+            if not entries:
+                return
+            yield entries
+            if len(entries) < count:
+                return
+            # Exclusive range start: continue after the last returned entry
+            start_id = f"({entries[-1][0]}"
+
+    def stats(self) -> dict:
+        """
+        Backpressure snapshot for dashboards and the /ops endpoint.
+        Also refreshes the Prometheus gauges.
+        """
+        length = self.redis.xlen(self.key)
+        pending, lag = 0, None
+        for g in self.redis.xinfo_groups(self.key):
+            if g["name"] == self.group:
+                pending = g["pending"]
+                # 'lag' is only reported by Redis >= 7
+                lag = g.get("lag")
+
+        if length > settings.WEBHOOK_STREAM_ALERT_LENGTH:
+            logger.error(
+                f"Webhook stream '{self.key}' holds {length} entries "
+                f"(alert threshold {settings.WEBHOOK_STREAM_ALERT_LENGTH}, {pending} pending, lag {lag})."
+            )
+
+        WEBHOOK_STREAM_LENGTH.set(length)
+        WEBHOOK_STREAM_PENDING.set(pending)
+        if lag is not None:
+            WEBHOOK_STREAM_LAG.set(lag)
+
+        return {
+            "length": length,
+            "pending": pending,
+            "lag": lag,
+            "over_alert_length": length > settings.WEBHOOK_STREAM_ALERT_LENGTH,
+            "dead_letter": self.redis.xlen(self.dead_letter_key),
+        }
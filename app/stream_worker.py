@@ -0,0 +1,173 @@
+"""
+Webhook Stream Worker.
+Drains the WhatsApp webhook Redis Stream (see app/services/webhook_stream.py)
+in batches into ChatService/StatusService via WebhookService.
+
+Usage:
+    python -m app.stream_worker                    # Run 1 consumer
+    python -m app.stream_worker --workers 4        # Run a pool of 4 consumers
+    python -m app.stream_worker --replay 1700000000000-0 [END_ID]
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import socket
+import time
+from prometheus_client import start_http_server
+from app.core.config import settings
+from app.core.logging import configure_logging
+from app.database import SessionLocal
+from app.metrics.prometheus import WEBHOOK_STREAM_ENTRIES
+from app.services.webhook_service import WebhookService
+from app.services.webhook_stream import WebhookStream
+
+# Apply application-wide logging configuration (JSON format)
+configure_logging()
+logger = logging.getLogger("stream_worker")
+
+def _decode(entries: list, stream: WebhookStream | None = None) -> tuple[list[str], list[dict]]:
+    """
+    Parses raw bodies. Invalid JSON can never succeed, so with a stream it
+    goes straight to the dead-letter stream instead of being redelivered;
+    without one (replay) it is skipped. Pending entries that were trimmed
+    from the stream come back with no fields and are dead-lettered by ID.
+    """
+    ids, payloads = [], []
+    for entry_id, fields in entries:
+        if fields is None:
+            if stream is not None:
+                logger.error(f"Webhook entry {entry_id} was trimmed while pending. Moving to dead-letter.")
+                stream.dead_letter(entry_id, None)
+                WEBHOOK_STREAM_ENTRIES.labels(outcome="dead_letter").inc()
+            continue
+        try:
+            payloads.append(json.loads(fields["body"]))
+            ids.append(entry_id)
+        except (KeyError, TypeError, ValueError):
+            if stream is None:
+                logger.warning(f"Skipping invalid webhook entry {entry_id} during replay.")
+                continue
+            logger.error(f"Webhook entry {entry_id} is not valid JSON. Moving to dead-letter.")
+            stream.dead_letter(entry_id, fields)
+            WEBHOOK_STREAM_ENTRIES.labels(outcome="dead_letter").inc()
+    return ids, payloads
+
+def _ingest(payloads: list[dict]) -> dict:
+    db = SessionLocal()
+    try:
+        return WebhookService(db).ingest_many(payloads)
+    finally:
+        db.close()
+
+def process_entries(stream: WebhookStream, entries: list) -> bool:
+    """
+    Ingests one batch in a single transaction and acks it only after commit.
+    If the batch fails, entries are retried one by one so a single bad payload
+    doesn't hold back the rest; whatever still fails stays pending and is
+    reclaimed later (and eventually dead-lettered).
+
+    Returns:
+        bool: True if every entry was acked.
+    """
+    ids, payloads = _decode(entries, stream)
+    if not payloads:
+        return True
+
+    try:
+        result = _ingest(payloads)
+        stream.ack(ids)
+        WEBHOOK_STREAM_ENTRIES.labels(outcome="ingested").inc(len(ids))
+        logger.info(f"Ingested {len(ids)} webhook entries ({result['messages']} messages, {result['statuses']} statuses).")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to ingest batch of {len(ids)} webhook entries, retrying individually: {e}")
+
+    all_acked = True
+    for entry_id, payload in zip(ids, payloads):
+        try:
+            _ingest([payload])
+            stream.ack([entry_id])
+            WEBHOOK_STREAM_ENTRIES.labels(outcome="ingested").inc()
+        except Exception as e:
+            all_acked = False
+            WEBHOOK_STREAM_ENTRIES.labels(outcome="failed").inc()
+            logger.error(f"Failed to ingest webhook entry {entry_id}: {e}")
+    return all_acked
+
+def consumer_loop(consumer_name: str, metrics_port: int | None = None):
+    # Each process has its own Prometheus registry, so each exposes its own port
+    if metrics_port:
+        start_http_server(metrics_port)
+
+    stream = WebhookStream()
+    stream.ensure_group()
+    batch_size = settings.WEBHOOK_STREAM_BATCH_SIZE
+    logger.info(f"Stream consumer '{consumer_name}' started on '{stream.key}'.")
+
+    # 1. Finish anything this consumer held before a crash/restart
+    # (Anything that still fails is left for reclaim instead of looping here.)
+    pending = stream.read_own_pending(consumer_name, batch_size)
+    while pending and process_entries(stream, pending):
+        pending = stream.read_own_pending(consumer_name, batch_size)
+
+    # 2. Normal operation
+    last_stats = last_trim = 0.0
+    while True:
+        try:
+            entries = stream.read_batch(consumer_name, batch_size)
+            if entries:
+                process_entries(stream, entries)
+
+            # Refresh backpressure gauges every few seconds
+            if time.monotonic() - last_stats > 5:
+                stream.stats()
+                last_stats = time.monotonic()
+
+            # Drop acked entries past retention (never pending ones)
+            if time.monotonic() - last_trim > settings.WEBHOOK_STREAM_TRIM_INTERVAL_SECONDS:
+                stream.trim_acked()
+                last_trim = time.monotonic()
+
+        except Exception as e:
+            logger.error(f"Stream consumer '{consumer_name}' encountered an error: {e}")
+            time.sleep(5)
+
+def replay(start_id: str, end_id: str):
+    """Re-ingests retained entries in a range (idempotent on WAMID)."""
+    stream = WebhookStream()
+    for entries in stream.replay(start_id, end_id, count=settings.WEBHOOK_STREAM_BATCH_SIZE):
+        ids, payloads = _decode(entries)
+        if payloads:
+            result = _ingest(payloads)
+            logger.info(f"Replayed {ids[0]}..{ids[-1]}: {result}")
+
+def main():
+    parser = argparse.ArgumentParser(description="WhatsApp webhook stream worker")
+    parser.add_argument("--workers", type=int, default=1, help="Number of consumer processes")
+    parser.add_argument("--replay", nargs="+", metavar="ID", help="Replay START_ID [END_ID] and exit")
+    args = parser.parse_args()
+
+    if args.replay:
+        replay(args.replay[0], args.replay[1] if len(args.replay) > 1 else "+")
+        return
+
+    # Consumer names must be stable across restarts so own pending entries are resumed
+    prefix = socket.gethostname()
+    port = settings.STREAM_WORKER_METRICS_PORT
+
+    if args.workers == 1:
+        consumer_loop(f"{prefix}-0", port)
+        return
+
+    procs = [
+        multiprocessing.Process(target=consumer_loop, args=(f"{prefix}-{i}", port + i), daemon=True)
+        for i in range(args.workers)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+if __name__ == "__main__":
+    main()
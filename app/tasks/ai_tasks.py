@@ -1,48 +1,178 @@
 # app/tasks/ai_tasks.py
 import logging
+import time
+from contextlib import contextmanager
+import requests
+from celery.exceptions import Retry
+from celery.signals import worker_process_init
 from app.core.celery_app import celery_app
+from app.core.cache import sync_redis_client
+from app.core.config import settings
+from app.core.model_registry import model_registry
 from app.database import SessionLocal
+from app.metrics.prometheus import AI_STAGE_MESSAGES, AI_STAGE_QUEUE_SECONDS, AI_STAGE_SECONDS
 # FIX: Ensure this import comes from app.models
 from app.models import ChatMessage
 # Services
 from app.services.sentiment_service import SentimentService
 from app.services.embedding_service import EmbeddingService
+from app.services.embedding_batcher import EmbeddingBatcher
 
 logger = logging.getLogger(__name__)
 
+@worker_process_init.connect
+def warmup_models(**kwargs):
+    """
+    Loads MODEL_WARMUP models in each worker child before it takes tasks,
+    instead of on the first message. Runs after the fork, so every child has
+    its own torch state.
+    """
+    names = [n.strip() for n in settings.MODEL_WARMUP.split(",") if n.strip()]
+    if names:
+        model_registry.warmup(names)
+
+@contextmanager
+def _stage(stage: str, message_count: int, enqueued_at: float | None):
+    """Records queue wait, run time and outcome of one pipeline stage run."""
+    if enqueued_at:
+        AI_STAGE_QUEUE_SECONDS.labels(stage=stage).observe(max(time.time() - enqueued_at, 0.0))
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Retry:
+        outcome = "retry"
+        raise
+    except Exception:
+        outcome = "failed"
+        raise
+    finally:
+        AI_STAGE_SECONDS.labels(stage=stage).observe(time.perf_counter() - started)
+        AI_STAGE_MESSAGES.labels(stage=stage, outcome=outcome).inc(message_count)
+
+def _retry_countdown(retries: int) -> int:
+    return min(5 * 2 ** retries, 300)
+
+def dispatch_ai_stages(message_ids: list[int]):
+    """
+    Fans messages out to the sentiment and embedding stages. They run in
+    parallel on their own queues, so a slow Cohere never delays sentiment
+    tagging (and vice versa).
+    """
+    enqueued_at = time.time()
+    analyze_sentiment.delay(message_ids, enqueued_at)
+    embed_messages.delay(message_ids, enqueued_at)
+
+@celery_app.task(name="analyze_sentiment", bind=True, max_retries=3)
+def analyze_sentiment(self, message_ids: list[int], enqueued_at: float | None = None):
+    """
+    Stage (queue ai_sentiment, CPU-bound): scores messages with one batched
+    inference call and one UPDATE. Messages left unscored because inference
+    was unavailable (e.g. the inference server was busy) are retried with
+    backoff; after that the pending-sentiment sweep picks them up.
+    """
+    with _stage("sentiment", len(message_ids), enqueued_at):
+        db = SessionLocal()
+        try:
+            msgs = db.query(ChatMessage.id, ChatMessage.text).filter(ChatMessage.id.in_(message_ids)).all()
+            if len(msgs) < len(message_ids):
+                logger.warning(f"AI Task: {len(message_ids) - len(msgs)} of {len(message_ids)} messages not found.")
+
+            labels = SentimentService(db).analyze_batch(msgs)
+            logger.info(f"AI Task: Sentiment for {len(labels)} message(s) -> {labels}")
+
+            failed = [message_id for message_id, label in labels.items() if label == "pending"]
+            if failed and self.request.retries < self.max_retries:
+                raise self.retry(args=[failed, None], countdown=_retry_countdown(self.request.retries))
+        finally:
+            db.close()
+
+@celery_app.task(name="embed_messages", bind=True, max_retries=5)
+def embed_messages(self, message_ids: list[int], enqueued_at: float | None = None):
+    """
+    Stage (queue ai_embed, network-bound): embeds messages with text.
+    "queue" mode hands the IDs to the micro-batcher; "inline" mode (or a Redis
+    outage) embeds them here with one Cohere call per 96 texts, retrying
+    Cohere errors with backoff.
+    """
+    with _stage("embed", len(message_ids), enqueued_at):
+        db = SessionLocal()
+        try:
+            msgs = db.query(ChatMessage.id, ChatMessage.text).filter(ChatMessage.id.in_(message_ids)).all()
+            msgs = [m for m in msgs if m.text and m.text.strip()]
+            if not msgs:
+                return
+
+            if settings.EMBED_MODE == "queue":
+                try:
+                    _queue_embeddings([m.id for m in msgs])
+                    return
+                except Exception as e:
+                    logger.error(f"AI Task: Embedding queue unavailable, embedding inline: {e}")
+
+            try:
+                EmbeddingService(db).embed_messages(msgs)
+                logger.info(f"AI Task: {len(msgs)} message(s) embedded successfully.")
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"AI Task: Embedding failed for msgs {[m.id for m in msgs]}, retrying: {e}")
+                raise self.retry(exc=e, args=[[m.id for m in msgs], None],
+                                 countdown=_retry_countdown(self.request.retries))
+        finally:
+            db.close()
+
+def _queue_embeddings(message_ids: list[int]):
+    batcher = EmbeddingBatcher(sync_redis_client)
+    started_batch, batch_full = batcher.enqueue(message_ids)
+    if batch_full:
+        flush_embedding_queue.delay()
+    elif started_batch:
+        flush_embedding_queue.apply_async(countdown=settings.EMBED_BATCH_MAX_WAIT_MS / 1000)
+
 @celery_app.task(name="process_message_ai")
 def process_message_ai(message_id: int):
     """
     Background task to run AI pipelines on a new message.
-    1. Sentiment Analysis (HuggingFace)
-    2. Vector Embedding (Cohere)
+    Only routes: the stages run as separate tasks on their own queues.
+    1. Sentiment Analysis (HuggingFace) -> analyze_sentiment
+    2. Vector Embedding (Cohere)       -> embed_messages
+    """
+    dispatch_ai_stages([message_id])
+
+@celery_app.task(name="process_messages_ai_batch")
+def process_messages_ai_batch(message_ids: list[int]):
+    """
+    Batch variant of process_message_ai used by the webhook batch-ingest path.
+    Each stage gets the whole payload, so it stays one inference call and
+    one embedding request.
+    """
+    dispatch_ai_stages(list(message_ids))
+
+@celery_app.task(name="flush_embedding_queue")
+def flush_embedding_queue():
+    """
+    Embeds queued message IDs in Cohere-sized batches (EMBED_MODE=queue).
+    Triggered by a full queue, the max-wait countdown, or the Beat sweep.
     """
     db = SessionLocal()
     try:
-        msg = db.query(ChatMessage).filter(ChatMessage.id == message_id).first()
-        if not msg:
-            logger.warning(f"AI Task: Message {message_id} not found.")
-            return
-
-        # --- 1. Sentiment Analysis ---
-        try:
-            # Note: SentimentService loads the model. 
-            # In the worker process, this is fine (and expected).
-            sentiment_svc = SentimentService(db)
-            detected_sentiment = sentiment_svc.analyze_and_store(msg.id)
-            logger.info(f"AI Task: Msg {msg.id} sentiment -> {detected_sentiment}")
-        except Exception as e:
-            logger.error(f"AI Task: Sentiment failed for msg {msg.id}: {e}")
-
-        # --- 2. Vector Embedding (RAG) ---
-        try:
-            if msg.text and len(msg.text.strip()) > 0:
-                embed_svc = EmbeddingService(db)
-                vector = embed_svc.embed_text(msg.text)
-                embed_svc.store_embedding(msg.id, vector)
-                logger.info(f"AI Task: Msg {msg.id} embedded successfully.")
-        except Exception as e:
-            logger.error(f"AI Task: Embedding failed for msg {msg.id}: {e}")
+        return EmbeddingBatcher(sync_redis_client).flush(db)
+    finally:
+        db.close()
 
+@celery_app.task(name="score_pending_sentiment")
+def score_pending_sentiment():
+    """
+    Sweeps messages that were never scored (model unavailable, worker crash)
+    in SENTIMENT_SWEEP_LIMIT batches. Re-queues itself while full batches
+    are being scored. Triggered by Celery Beat.
+    """
+    db = SessionLocal()
+    try:
+        scored = SentimentService(db).score_pending()
+        if scored:
+            logger.info(f"AI Task: Sentiment sweep scored {scored} message(s).")
+        if scored >= settings.SENTIMENT_SWEEP_LIMIT:
+            score_pending_sentiment.delay()
+        return scored
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -63,6 +63,9 @@ def retry_failed_bulk_messages():
                 msg.whatsapp_message_id = resp.get("messages", [{}])[0].get("id")
                 msg.last_error = None # Clear error
                 msg.attempts += 1
+                # Keep the job's progress counters in step (evaluated in SQL)
+                job.sent_count = BulkJob.sent_count + 1
+                job.failed_count = BulkJob.failed_count - 1
                 success_count += 1
                 
             except Exception as e:
@@ -1,9 +1,12 @@
 # app/tasks/scheduler.py
 import logging
-from datetime import datetime, timezone
+from sqlalchemy import text
+from datetime import datetime, timedelta, timezone
 from app.core.celery_app import celery_app
+from app.core.config import settings
 from app.database import SessionLocal
 from app.models import BulkJob
+from app.tasks.retry_tasks import MAX_RETRIES
 from app.tasks.whatsapp_tasks import process_bulk_whatsapp_job
 
 logger = logging.getLogger(__name__)
@@ -41,4 +44,71 @@ def check_scheduled_jobs():
     except Exception as e:
         logger.error(f"Scheduler Error: {e}")
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+@celery_app.task(name="fail_stale_imports")
+def fail_stale_imports():
+    """
+    Periodic Task: Runs every 5 minutes.
+    Uploaded jobs are imported inside the API process that received the file;
+    if that process dies, the job would stay 'importing' forever. Jobs still
+    importing after BULK_IMPORT_TIMEOUT_MINUTES are marked failed.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(minutes=settings.BULK_IMPORT_TIMEOUT_MINUTES)
+        failed = db.query(BulkJob).filter(
+            BulkJob.status == "importing",
+            BulkJob.created_at < cutoff
+        ).update({"status": "failed", "completed_at": now}, synchronize_session=False)
+        db.commit()
+
+        if failed:
+            logger.warning(f"Scheduler: Failed {failed} bulk jobs stuck importing since before {cutoff}.")
+
+    except Exception as e:
+        logger.error(f"Scheduler Error (stale imports): {e}")
+    finally:
+        db.close()
+
+@celery_app.task(name="fail_stale_sends")
+def fail_stale_sends():
+    """
+    Periodic Task: Runs every 5 minutes.
+    Bulk messages are committed as 'sending' before they go out, so a worker
+    that dies mid-chunk leaves them there. Whether they reached WhatsApp is
+    unknown, so instead of resending (and risking duplicates) they are marked
+    failed with retries exhausted, which keeps retry_failed_bulk_messages off
+    them too. The job's failed_count moves in the same transaction.
+    """
+    db = SessionLocal()
+    try:
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=settings.BULK_SENDING_TIMEOUT_MINUTES)
+        failed = db.execute(text("""
+            WITH stale AS (
+                UPDATE bulk_messages
+                SET status = 'failed',
+                    last_error = 'Send outcome unknown: worker stopped while sending',
+                    attempts = greatest(coalesce(attempts, 0), :max_retries)
+                WHERE status = 'sending' AND claimed_at < :cutoff
+                RETURNING job_id
+            ), per_job AS (
+                SELECT job_id, count(*) AS n FROM stale GROUP BY job_id
+            )
+            UPDATE bulk_jobs AS j
+            SET failed_count = j.failed_count + per_job.n
+            FROM per_job
+            WHERE j.id = per_job.job_id
+            RETURNING per_job.n
+        """), {"cutoff": cutoff, "max_retries": MAX_RETRIES}).scalars().all()
+        db.commit()
+
+        if failed:
+            logger.warning(f"Scheduler: Failed {sum(failed)} bulk messages stuck sending since before {cutoff}.")
+
+    except Exception as e:
+        logger.error(f"Scheduler Error (stale sends): {e}")
+        db.rollback()
+    finally:
+        db.close()
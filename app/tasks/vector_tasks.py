@@ -0,0 +1,77 @@
+# app/tasks/vector_tasks.py
+import logging
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.database import SessionLocal, engine
+from app.models import EmbeddingModel
+from app.services.embedding_backfill import EmbeddingBackfillService, RateLimited
+from app.services.embedding_models import EmbeddingModelRegistry
+from app.services.vector_index_service import VectorIndexService
+
+logger = logging.getLogger(__name__)
+
+@celery_app.task(name="rebuild_vector_index")
+def rebuild_vector_index(model_version: str | None = None, mode: str = "reindex", index_type: str = "hnsw",
+                         m: int = 16, ef_construction: int = 64, lists: int | None = None,
+                         maintenance_work_mem: str | None = None):
+    """
+    Admin Task: Maintains a model's ANN index (the active model's by default)
+    without blocking writes.
+    mode="reindex" rebuilds the existing index in place;
+    mode="rebuild" builds a new index (type/parameters) and swaps it in.
+    """
+    db = SessionLocal()
+    try:
+        registry = EmbeddingModelRegistry(db)
+        if model_version:
+            row = db.get(EmbeddingModel, model_version)
+            if not row:
+                raise ValueError(f"Model '{model_version}' is not registered.")
+            dimensions = row.dimensions
+        else:
+            model_version, dimensions = registry.active()
+    finally:
+        db.close()
+
+    svc = VectorIndexService(engine)
+    if mode == "reindex" and svc.status(model_version):
+        svc.reindex(model_version)
+    else:
+        svc.build(model_version, dimensions, index_type, m=m, ef_construction=ef_construction,
+                  lists=lists, maintenance_work_mem=maintenance_work_mem)
+    status = svc.status(model_version)
+    logger.info(f"Vector index {mode} for {model_version} finished: {status}")
+    return {"model_version": model_version, "mode": mode, "valid": bool(status and status["valid"])}
+
+@celery_app.task(name="start_embedding_backfill")
+def start_embedding_backfill(model_version: str | None = None, workers: int | None = None):
+    """
+    Admin Task: Plans (or resumes) a backfill for a model and fans the shards
+    out to the Celery workers, one task per shard.
+    """
+    workers = workers or settings.EMBED_BACKFILL_WORKERS
+    db = SessionLocal()
+    try:
+        model_version = model_version or EmbeddingModelRegistry(db).active()[0]
+        shards = EmbeddingBackfillService(db).plan(model_version, workers)
+        for shard in shards:
+            backfill_embeddings_shard.delay(shard.id, len(shards))
+        logger.info(f"Backfill {model_version}: dispatched {len(shards)} shards.")
+        return {"model_version": model_version, "shards": len(shards)}
+    finally:
+        db.close()
+
+@celery_app.task(name="backfill_embeddings_shard", bind=True, max_retries=None)
+def backfill_embeddings_shard(self, shard_id: int, shard_count: int = 1):
+    """
+    Embeds one backfill shard from its checkpoint onwards.
+    On a Cohere 429 the task re-queues itself after the advised delay.
+    """
+    db = SessionLocal()
+    try:
+        EmbeddingBackfillService(db).run_shard(shard_id, shard_count=shard_count)
+    except RateLimited as e:
+        logger.warning(f"Backfill shard {shard_id}: {e}")
+        raise self.retry(countdown=e.retry_after)
+    finally:
+        db.close()
@@ -1,5 +1,6 @@
 # app/tasks/whatsapp_tasks.py
 import logging
+from celery import chord
 from app.core.celery_app import celery_app
 from app.database import SessionLocal
 from app.services.bulk_service import BulkService
@@ -10,24 +11,59 @@ logger = logging.getLogger(__name__)
 def process_bulk_whatsapp_job(job_id: int):
     """
     Celery task to execute a Bulk Job.
-    Delegates the actual sending logic to BulkService.
+    Splits the job into id-range shards and runs them as a chord: the shards
+    send in parallel on however many workers are free, and
+    finalize_bulk_job closes the job once all of them have finished.
     """
     db = SessionLocal()
     try:
         logger.info(f"Task: Starting Bulk Job {job_id}")
-        
-        # Initialize Service with the task's DB session
         svc = BulkService(db)
-        
-        # Execute the job (Iterates through messages and sends them)
-        svc.run_job(job_id)
-        
-        logger.info(f"Task: Bulk Job {job_id} processing complete.")
-        
+        shards = svc.start_job(job_id)
+        if shards is None:
+            return
+        if not shards:
+            svc.finish_job(job_id)
+            return
+
+        chord(
+            send_bulk_shard.s(job_id, range_start, range_end)
+            for range_start, range_end in shards
+        )(finalize_bulk_job.s(job_id))
+        logger.info(f"Task: Bulk Job {job_id} dispatched as {len(shards)} shards.")
+
     except Exception as e:
         logger.error(f"Task: Bulk Job {job_id} encountered critical error: {e}")
-        # Note: BulkService is expected to handle individual message errors
-        # and update the Job status to 'failed' if necessary.
-        
+        # Individual message errors are handled by BulkService; getting here
+        # means the shards were never dispatched, so nothing would finalize the job
+        BulkService(db).fail_job(job_id, f"dispatch failed: {e}")
+
+    finally:
+        db.close()
+
+@celery_app.task(name="send_bulk_shard")
+def send_bulk_shard(job_id: int, range_start: int, range_end: int) -> dict:
+    """
+    Sends one shard of a bulk job. Never raises, so a crashed shard still
+    lets the chord finalize the job (as failed); its unsent messages stay
+    'pending'.
+    """
+    db = SessionLocal()
+    try:
+        return BulkService(db).run_shard(job_id, range_start, range_end)
+    except Exception as e:
+        logger.error(f"Task: Bulk Job {job_id} shard ({range_start}, {range_end}] failed: {e}")
+        return {"sent": 0, "failed": 0, "error": str(e)}
+    finally:
+        db.close()
+
+@celery_app.task(name="finalize_bulk_job")
+def finalize_bulk_job(shard_results: list[dict], job_id: int):
+    """Chord callback: runs once every shard of the job has finished."""
+    db = SessionLocal()
+    try:
+        failed_shards = sum(1 for r in shard_results if r.get("error"))
+        BulkService(db).finish_job(job_id, failed_shards=failed_shards)
+        logger.info(f"Task: Bulk Job {job_id} processing complete.")
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
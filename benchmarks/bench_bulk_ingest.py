@@ -0,0 +1,102 @@
+"""
+Benchmark: Bulk Recipient Ingestion
+Context: Pod B - Bulk Messaging.
+
+Loads one job's recipient list into bulk_messages two ways and reports
+rows/sec and peak RSS, each in a fresh process so the peaks don't mix:
+
+- orm:  the old path, one BulkMessage object per number + add_all.
+- copy: BulkIngestService streaming a CSV file through COPY in chunks
+        (normalization and dedupe included).
+
+The list has ~2% duplicates and ~1% invalid numbers. Jobs are deleted afterwards.
+
+Usage:
+    python -m benchmarks.bench_bulk_ingest [numbers] [chunk_size]
+"""
+
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.database import SessionLocal
+from app.models import BulkJob, BulkMessage
+from app.services.bulk_ingest import BulkIngestService, iter_csv_numbers
+
+def write_csv(path: str, count: int):
+    rng = random.Random(42)
+    with open(path, "w") as f:
+        f.write("phone\n")
+        for i in range(count):
+            roll = rng.random()
+            if roll < 0.01:
+                f.write("n/a\n")
+            elif roll < 0.03 and i:
+                f.write(f"+91 7{rng.randrange(i):09d}\n")  # Repeat of an earlier number
+            else:
+                f.write(f"+91 7{i:09d}\n")
+
+def new_job(db) -> BulkJob:
+    job = BulkJob(tenant_id=0, template_name="bench_template", language_code="en", status="bench")
+    db.add(job)
+    db.flush()
+    return job
+
+def run_orm(db, path: str, chunk_size: int) -> int:
+    # As the old endpoint received them: the whole list in memory, as-is
+    with open(path) as f:
+        numbers = list(iter_csv_numbers(f))
+    job = new_job(db)
+    db.add_all([BulkMessage(job_id=job.id, to_number=n, status="pending") for n in numbers])
+    db.commit()
+    return job.id
+
+def run_copy(db, path: str, chunk_size: int) -> int:
+    job = new_job(db)
+    with open(path) as f:
+        BulkIngestService(db).ingest(job.id, iter_csv_numbers(f), chunk_size=chunk_size)
+    db.commit()
+    return job.id
+
+def cleanup(db, job_id: int):
+    db.query(BulkMessage).filter(BulkMessage.job_id == job_id).delete(synchronize_session=False)
+    db.query(BulkJob).filter(BulkJob.id == job_id).delete(synchronize_session=False)
+    db.commit()
+
+def child(mode: str, path: str, count: int, chunk_size: int):
+    runner = {"orm": run_orm, "copy": run_copy}[mode]
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        job_id = runner(db, path, chunk_size)
+        elapsed = time.perf_counter() - start
+        rows = db.query(BulkMessage).filter(BulkMessage.job_id == job_id).count()
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{mode:<6} {count:>8} numbers -> {rows:>8} rows  {elapsed:8.2f}s  "
+              f"{count / elapsed:10.0f} numbers/s  peak RSS {peak_mb:7.1f} MB")
+        cleanup(db, job_id)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3], int(sys.argv[4]), int(sys.argv[5]))
+        sys.exit(0)
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "recipients.csv")
+        write_csv(path, count)
+        print(f"--- Bulk ingest: {count} numbers, COPY chunks of {chunk_size} ---")
+        for mode in ("orm", "copy"):
+            subprocess.run([sys.executable, "-m", "benchmarks.bench_bulk_ingest", "--child",
+                            mode, path, str(count), str(chunk_size)], check=True)
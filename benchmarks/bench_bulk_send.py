@@ -0,0 +1,106 @@
+"""
+Benchmark: Bulk WhatsApp Send Throughput
+Context: Pod B - Bulk Messaging.
+
+Sends one job's worth of template messages to a local mock Graph API and
+compares the legacy loop (one blocking request at a time, 2s pause every 10
+messages) with the concurrent token-bucket sender. No database involved.
+
+The mock answers after --latency-ms and, with --limit-rps, returns 429 for
+requests over that rate, to show the sender adapting.
+
+Usage:
+    python -m benchmarks.bench_bulk_send [--messages 2000] [--latency-ms 150] [--limit-rps 0]
+"""
+
+import argparse
+import asyncio
+import socket
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+from app.services.bulk_sender import BulkSender, TokenBucket
+
+def mock_graph_api(latency: float, limit_rps: float) -> FastAPI:
+    app = FastAPI()
+    window = {"second": 0, "count": 0}
+
+    @app.post("/{phone_number_id}/messages")
+    async def send(phone_number_id: str, request: Request):
+        body = await request.json()
+        now = int(time.monotonic())
+        if window["second"] != now:
+            window["second"], window["count"] = now, 0
+        window["count"] += 1
+        if limit_rps and window["count"] > limit_rps:
+            return JSONResponse({"error": {"code": 130429, "message": "Rate limit hit"}},
+                                status_code=429, headers={"Retry-After": "1"})
+        await asyncio.sleep(latency)
+        return {"messages": [{"id": f"wamid.{body['to']}"}]}
+
+    return app
+
+def start_server(app: FastAPI) -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+def run_legacy(count: int):
+    from app.integrations.whatsapp_client import send_template
+    for i in range(count):
+        send_template(f"91{i:010d}", "bench_template")
+        if i % 10 == 9:
+            time.sleep(2)  # The old per-batch throttle
+
+def run_concurrent(count: int, rate: float, concurrency: int):
+    bucket = TokenBucket(rate, settings.BULK_SEND_BURST, settings.BULK_SEND_MIN_RATE_PER_SECOND, name="bench")
+    sender = BulkSender("bench_template", "en_US", None, concurrency=concurrency, bucket=bucket)
+
+    async def run():
+        try:
+            return await sender.send_many([(i, f"91{i:010d}") for i in range(count)])
+        finally:
+            await sender.aclose()
+
+    results = asyncio.run(run())
+    failed = sum(r.status != "sent" for r in results)
+    return failed, bucket.rate
+
+def report(name: str, count: int, elapsed: float, extra: str = ""):
+    print(f"{name:<12} {count:>6} msgs  {elapsed:8.2f}s  {count / elapsed:8.1f} msg/s  {extra}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--legacy-messages", type=int, default=40, help="The legacy loop is slow; keep this small")
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--limit-rps", type=float, default=0, help="Mock returns 429 above this rate (0: never)")
+    parser.add_argument("--rate", type=float, default=settings.BULK_SEND_RATE_PER_SECOND)
+    parser.add_argument("--concurrency", type=int, default=settings.BULK_SEND_CONCURRENCY)
+    args = parser.parse_args()
+
+    settings.WHATSAPP_API_BASE_URL = start_server(mock_graph_api(args.latency_ms / 1000, args.limit_rps))
+    print(f"--- Bulk send: mock Graph API at {settings.WHATSAPP_API_BASE_URL}, "
+          f"{args.latency_ms:.0f}ms latency, limit {args.limit_rps or 'none'} rps ---")
+
+    if args.legacy_messages:
+        start = time.perf_counter()
+        run_legacy(args.legacy_messages)
+        report("legacy", args.legacy_messages, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    failed, final_rate = run_concurrent(args.messages, args.rate, args.concurrency)
+    report("concurrent", args.messages, time.perf_counter() - start,
+           f"(failed {failed}, final rate {final_rate:.1f}/s)")
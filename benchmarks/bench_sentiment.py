@@ -0,0 +1,90 @@
+"""
+Benchmark: Sentiment Inference Throughput
+Context: Pod C - Module 5 (AI Sentiment).
+
+Runs the sentiment pipeline over the same set of WhatsApp-length messages
+at batch sizes 1..64 and reports messages/sec, to pick SENTIMENT_BATCH_SIZE
+for the worker's CPU. No database is needed.
+
+With several --backends it also compares PyTorch and ONNX Runtime (fp32 and
+int8) on the seed dataset: single-message latency, throughput per batch size,
+and how often each backend's labels agree with PyTorch's.
+
+Usage:
+    python -m benchmarks.bench_sentiment [messages] [--threads N]
+        [--backends torch,onnx,onnx-int8]
+"""
+
+import argparse
+import random
+import statistics
+import time
+from app.core.config import settings
+from app.seeds.seed_analytics import TEST_DATA
+
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64]
+
+SAMPLES = [text for _, text, _ in TEST_DATA] + [
+    "I am very unhappy with the delay in my order.",
+    "Thanks, the delivery arrived early and everything works!",
+    "What is the price of the premium plan?",
+    "Can you send me the invoice for last month again please",
+    "This is the third time I'm asking, nobody has replied to my complaint about the refund.",
+    "ok",
+    "Great service, will recommend you to my friends and family.",
+    "The app keeps crashing when I try to upload a photo of the damaged product, please help.",
+]
+
+def make_texts(n: int) -> list[str]:
+    rng = random.Random(7)
+    return [rng.choice(SAMPLES) + f" #{i}" for i in range(n)]
+
+def run(pipeline, texts: list[str], batch_size: int) -> float:
+    start = time.perf_counter()
+    pipeline(texts, batch_size=batch_size, truncation=True, max_length=settings.SENTIMENT_MAX_TOKENS)
+    return len(texts) / (time.perf_counter() - start)
+
+def latency_ms(pipeline, texts: list[str]) -> float:
+    """Median single-message latency (the process_message_ai path)."""
+    timings = []
+    for text in texts:
+        start = time.perf_counter()
+        pipeline([text], batch_size=1, truncation=True, max_length=settings.SENTIMENT_MAX_TOKENS)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sentiment batch-size benchmark")
+    parser.add_argument("messages", type=int, nargs="?", default=512)
+    parser.add_argument("--threads", type=int, help="torch intra-op threads (default: torch's choice)")
+    parser.add_argument("--backends", default=settings.SENTIMENT_BACKEND,
+                        help="Comma-separated backends to compare (torch, onnx, onnx-int8)")
+    args = parser.parse_args()
+
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    from app.services.sentiment_backends import load_pipeline
+
+    texts = make_texts(args.messages)
+    seed = [text for _, text, _ in TEST_DATA]
+    reference = None
+
+    for backend in args.backends.split(","):
+        pipeline = load_pipeline(backend)
+        run(pipeline, texts[:16], 16)  # warm-up (weights, allocator)
+
+        labels = [r["label"] for r in pipeline(texts, batch_size=32, truncation=True)]
+        reference = reference or labels
+        agreement = sum(a == b for a, b in zip(labels, reference)) / len(labels)
+
+        print(f"--- {backend}: {len(texts)} messages ---")
+        print(f"single-message latency: {latency_ms(pipeline, seed):.1f} ms, "
+              f"label agreement with {args.backends.split(',')[0]}: {agreement:.1%}")
+        print(f"{'batch':>6} {'msgs/sec':>10} {'speedup':>8}")
+        baseline = None
+        for batch_size in BATCH_SIZES:
+            rate = run(pipeline, texts, batch_size)
+            baseline = baseline or rate
+            print(f"{batch_size:>6} {rate:>10.1f} {rate / baseline:>7.1f}x")
@@ -0,0 +1,54 @@
+"""
+Benchmark: Web Process Startup
+Context: Pod C - Module 5 (AI Sentiment).
+
+Measures what importing the FastAPI app costs: wall time, peak RSS and
+whether torch/transformers got imported. Each case runs in a fresh
+interpreter so nothing is cached between runs.
+
+- web:          import app.main (what uvicorn does)
+- web + model:  import app.main, then load the sentiment model (the cost
+                the web process paid when the model loaded at import time)
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 3]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import app.main
+if {load_model}:
+    from app.core.model_registry import model_registry
+    model_registry.warmup(["sentiment"])
+print(json.dumps({{
+    "seconds": time.perf_counter() - started,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "torch": "torch" in sys.modules,
+    "transformers": "transformers" in sys.modules,
+}}))
+"""
+
+def measure(load_model: bool) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(load_model=load_model)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Web startup benchmark")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'case':<12} {'seconds':>8} {'peak RSS MB':>12} {'torch':>6}")
+    for name, load_model in [("web", False), ("web + model", True)]:
+        runs = [measure(load_model) for _ in range(args.runs)]
+        print(f"{name:<12} {statistics.median(r['seconds'] for r in runs):>8.2f} "
+              f"{statistics.median(r['rss_mb'] for r in runs):>12.0f} {str(runs[0]['torch']):>6}")
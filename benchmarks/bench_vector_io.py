@@ -0,0 +1,102 @@
+"""
+Benchmark: Vector Serialization
+Context: Pod C - Module 4 (AI).
+
+Part 1 (no database): bytes on the wire and encode time per 1024-dim vector for
+- str(list)            the old search/INSERT parameter
+- to_db()              pgvector's default SQLAlchemy bind
+- vector_literal()     the compact float32-exact literal
+- COPY BINARY row      what copy_embeddings() streams
+
+Part 2 (--db): writes N embeddings three ways into a scratch table
+(ORM-style per-row INSERT, multi-row INSERT with literals, binary COPY).
+
+Usage:
+    python -m benchmarks.bench_vector_io [--rows 5000] [--db]
+"""
+
+import argparse
+import json
+import time
+import timeit
+import numpy as np
+from pgvector.utils import to_db
+from app.core.vector_io import encode_copy_rows, vector_literal
+
+DIMS = 1024
+
+def cohere_like_vector(rng) -> list[float]:
+    # Cohere returns JSON doubles, so vectors arrive as Python floats
+    return json.loads(json.dumps((rng.standard_normal(DIMS) * 0.05).tolist()))
+
+def serialization(rng):
+    vec = cohere_like_vector(rng)
+    row = {"message_id": 1, "embedding": vec}
+    cases = [
+        ("str(list)", lambda: str(vec)),
+        ("to_db()", lambda: to_db(vec)),
+        ("vector_literal()", lambda: vector_literal(vec)),
+        ("COPY BINARY row", lambda: encode_copy_rows([row]).getvalue()),
+    ]
+    print(f"--- Serialization: one {DIMS}-dim vector ---")
+    print(f"{'format':<18} {'bytes':>8} {'encode us':>10}")
+    for name, fn in cases:
+        size = len(fn())
+        per_call = timeit.timeit(fn, number=300) / 300 * 1e6
+        print(f"{name:<18} {size:>8} {per_call:>10.1f}")
+
+def writes(rows: int, rng):
+    from dotenv import load_dotenv
+    load_dotenv()
+    from app.database import engine
+
+    vectors = [cohere_like_vector(rng) for _ in range(rows)]
+    raw = engine.raw_connection()
+    try:
+        with raw.cursor() as cur:
+            def reset():
+                cur.execute("DROP TABLE IF EXISTS bench_vector_io")
+                cur.execute(f"CREATE TABLE bench_vector_io (message_id integer PRIMARY KEY, embedding vector({DIMS}), "
+                            "model_version text, tenant_id integer, conversation_id integer, from_number text, message_created_at timestamptz)")
+                raw.commit()
+
+            print(f"\n--- Writes: {rows} embeddings ---")
+
+            reset()
+            start = time.perf_counter()
+            for i, vec in enumerate(vectors):
+                cur.execute("INSERT INTO bench_vector_io (message_id, embedding) VALUES (%s, %s)", (i, to_db(vec)))
+            raw.commit()
+            print(f"{'per-row INSERT':<18} {time.perf_counter() - start:8.2f}s")
+
+            reset()
+            start = time.perf_counter()
+            for offset in range(0, rows, 500):
+                chunk = vectors[offset:offset + 500]
+                values = ",".join(cur.mogrify("(%s, %s)", (offset + i, vector_literal(v))).decode() for i, v in enumerate(chunk))
+                cur.execute(f"INSERT INTO bench_vector_io (message_id, embedding) VALUES {values}")
+            raw.commit()
+            print(f"{'multi-row INSERT':<18} {time.perf_counter() - start:8.2f}s")
+
+            reset()
+            start = time.perf_counter()
+            stream = encode_copy_rows({"message_id": i, "embedding": v} for i, v in enumerate(vectors))
+            cur.copy_expert("COPY bench_vector_io FROM STDIN WITH (FORMAT BINARY)", stream)
+            raw.commit()
+            print(f"{'binary COPY':<18} {time.perf_counter() - start:8.2f}s")
+
+            cur.execute("DROP TABLE IF EXISTS bench_vector_io")
+            raw.commit()
+    finally:
+        raw.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vector serialization benchmark")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--db", action="store_true", help="Also benchmark writes against DATABASE_URL")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    serialization(rng)
+    if args.db:
+        writes(args.rows, rng)
@@ -0,0 +1,122 @@
+"""
+Benchmark: Vector Search Recall and Latency
+Context: Pod C - Module 4 (AI).
+
+Loads synthetic clustered vectors into a scratch table, builds the same ANN
+index as message_embeddings and compares it with the exact scan:
+recall@k (vs exact top-k) and p50/p99 latency for several ef_search/probes values.
+
+The scratch table is dropped at the end; production tables are not touched.
+
+Usage:
+    python -m benchmarks.bench_vector_search [--rows 100000 1000000] [--index hnsw|ivfflat]
+        [--dims 1024] [--queries 200] [--k 10]
+"""
+
+import argparse
+import io
+import math
+import time
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.database import engine
+
+TABLE = "bench_vector_search"
+
+def make_vectors(rows: int, dims: int, rng: np.random.Generator) -> np.ndarray:
+    """Clustered data (like real chat topics) is harder for ANN than uniform noise."""
+    centers = rng.standard_normal((max(rows // 1000, 10), dims)).astype(np.float32)
+    labels = rng.integers(0, len(centers), rows)
+    return centers[labels] + 0.3 * rng.standard_normal((rows, dims)).astype(np.float32)
+
+def to_literal(vec: np.ndarray) -> str:
+    return "[" + ",".join(f"{x:.6f}" for x in vec) + "]"
+
+def load(raw, vectors: np.ndarray, dims: int):
+    with raw.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cur.execute(f"CREATE TABLE {TABLE} (id bigint PRIMARY KEY, embedding vector({dims}))")
+        chunk = 10_000
+        for start in range(0, len(vectors), chunk):
+            buf = io.StringIO()
+            for i, vec in enumerate(vectors[start:start + chunk], start=start):
+                buf.write(f"{i}\t{to_literal(vec)}\n")
+            buf.seek(0)
+            cur.copy_expert(f"COPY {TABLE} (id, embedding) FROM STDIN", buf)
+    raw.commit()
+
+def build_index(raw, index_type: str, rows: int):
+    if index_type == "hnsw":
+        options = "m = 16, ef_construction = 64"
+    else:
+        options = f"lists = {rows // 1000 if rows <= 1_000_000 else int(math.sqrt(rows))}"
+    with raw.cursor() as cur:
+        cur.execute("SET maintenance_work_mem = '2GB'")
+        start = time.perf_counter()
+        cur.execute(f"CREATE INDEX ON {TABLE} USING {index_type} (embedding vector_cosine_ops) WITH ({options})")
+        elapsed = time.perf_counter() - start
+    raw.commit()
+    return elapsed
+
+def search(raw, query: str, k: int, settings: dict) -> tuple[list[int], float]:
+    with raw.cursor() as cur:
+        for name, value in settings.items():
+            cur.execute("SELECT set_config(%s, %s, true)", (name, str(value)))
+        start = time.perf_counter()
+        cur.execute(f"SELECT id FROM {TABLE} ORDER BY embedding <=> %s::vector LIMIT %s", (query, k))
+        ids = [r[0] for r in cur.fetchall()]
+        elapsed = time.perf_counter() - start
+    raw.rollback()
+    return ids, elapsed
+
+def run(rows: int, args, rng: np.random.Generator):
+    print(f"\n--- {rows:,} rows x {args.dims} dims, {args.index}, {args.queries} queries, k={args.k} ---")
+    vectors = make_vectors(rows, args.dims, rng)
+    queries = [to_literal(v) for v in make_vectors(args.queries, args.dims, rng)]
+
+    raw = engine.raw_connection()
+    try:
+        start = time.perf_counter()
+        load(raw, vectors, args.dims)
+        print(f"load        {time.perf_counter() - start:8.1f}s")
+        del vectors
+
+        # Ground truth from the exact scan
+        exact = [search(raw, q, args.k, {"enable_indexscan": "off"}) for q in queries]
+        exact_lat = np.array([t for _, t in exact]) * 1000
+        print(f"index build {build_index(raw, args.index, rows):8.1f}s")
+
+        print(f"{'setting':<18} {'recall@k':>9} {'p50 ms':>9} {'p99 ms':>9}")
+        print(f"{'exact scan':<18} {1.0:>9.3f} {np.percentile(exact_lat, 50):>9.2f} {np.percentile(exact_lat, 99):>9.2f}")
+
+        knob = "hnsw.ef_search" if args.index == "hnsw" else "ivfflat.probes"
+        values = [40, 80, 160, 320] if args.index == "hnsw" else [1, 5, 10, 20, 40]
+        for value in values:
+            results = [search(raw, q, args.k, {knob: value}) for q in queries]
+            recall = np.mean([
+                len(set(ids) & set(truth)) / args.k for (ids, _), (truth, _) in zip(results, exact)
+            ])
+            lat = np.array([t for _, t in results]) * 1000
+            print(f"{knob.split('.')[1] + '=' + str(value):<18} {recall:>9.3f} "
+                  f"{np.percentile(lat, 50):>9.2f} {np.percentile(lat, 99):>9.2f}")
+    finally:
+        with raw.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        raw.commit()
+        raw.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ANN vs exact vector search benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--index", choices=["hnsw", "ivfflat"], default="hnsw")
+    parser.add_argument("--dims", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    for rows in args.rows:
+        run(rows, args, rng)
@@ -0,0 +1,81 @@
+"""
+Benchmark: Webhook Ingestion Throughput
+Context: Pod C - Module 3 (Integrations).
+
+Compares the legacy per-message loop (ChatService.save_incoming) with the
+batch-ingest path (ChatService.save_incoming_batch) against a real database.
+Celery dispatch is mocked so only DB work is measured.
+
+Usage:
+    python -m benchmarks.bench_webhook_ingest [messages_per_payload] [payloads] [senders]
+"""
+
+import sys
+import time
+import uuid
+from unittest.mock import patch
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.database import SessionLocal
+from app.models import ChatMessage, Conversation
+from app.services.chat_service import ChatService
+
+def make_payload(run_id: str, size: int, senders: int) -> list[dict]:
+    """Builds one webhook payload worth of messages spread across a few senders."""
+    return [
+        {
+            "from_number": f"91{run_id}{i % senders:04d}",
+            "text": f"Benchmark message {i}: what is the price of the premium plan?",
+            "message_id": f"wamid.BENCH.{run_id}.{uuid.uuid4().hex}",
+        }
+        for i in range(size)
+    ]
+
+def run_loop(db, payloads):
+    svc = ChatService(db)
+    for payload in payloads:
+        for m in payload:
+            svc.save_incoming(m["from_number"], m["text"], message_id=m["message_id"])
+
+def run_batch(db, payloads):
+    svc = ChatService(db)
+    for payload in payloads:
+        svc.save_incoming_batch(payload)
+
+def cleanup(db, prefix: str):
+    convo_ids = [c.id for c in db.query(Conversation.id).filter(Conversation.customer_number.like(f"{prefix}%"))]
+    db.query(ChatMessage).filter(ChatMessage.conversation_id.in_(convo_ids)).delete(synchronize_session=False)
+    db.query(Conversation).filter(Conversation.id.in_(convo_ids)).delete(synchronize_session=False)
+    db.commit()
+
+def bench(name, runner, size, count, senders):
+    run_id = uuid.uuid4().hex[:6]
+    payloads = [make_payload(run_id, size, senders) for _ in range(count)]
+    total = size * count
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        runner(db, payloads)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<8} {total:>7} msgs  {elapsed:8.3f}s  {total / elapsed:10.1f} msg/s")
+        return elapsed
+    finally:
+        cleanup(db, f"91{run_id}")
+        db.close()
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    senders = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    print(f"--- Webhook ingest: {count} payloads x {size} messages, {senders} senders ---")
+
+    with patch("app.services.chat_service.process_message_ai.delay"), \
+         patch("app.services.chat_service.process_messages_ai_batch.delay"):
+        loop_time = bench("loop", run_loop, size, count, senders)
+        batch_time = bench("batch", run_batch, size, count, senders)
+
+    print(f"Speedup: {loop_time / batch_time:.1f}x")
@@ -7,10 +7,11 @@ def clean():
     try:
         print("Removing duplicate embeddings...")
         
-        # SQL to delete duplicates, keeping only the most recent one
+        # SQL to delete duplicates, keeping only the most recent one per model
         sql = """
         DELETE FROM message_embeddings a USING message_embeddings b
-        WHERE a.id < b.id AND a.message_id = b.message_id;
+        WHERE a.id < b.id AND a.message_id = b.message_id
+          AND a.model_version = b.model_version;
         """
         
         db.execute(text(sql))
@@ -83,6 +83,31 @@ def wire_event_loop(monkeypatch):
     except RuntimeError:
         pass 
 
+@pytest.fixture(scope="function", autouse=True)
+def clear_conversation_cache():
+    """
+    Each test rolls back its transaction, so cached conversation IDs
+    from a previous test would point at rows that no longer exist.
+    """
+    from app.core.conversation_cache import conversation_cache
+    conversation_cache.clear()
+    yield
+    conversation_cache.clear()
+
+@pytest.fixture(scope="function", autouse=True)
+def clear_embedding_cache():
+    """
+    Keeps vectors from one test's mocked Cohere responses (and the cached
+    active model) out of the next test.
+    """
+    from app.core.embedding_cache import embedding_cache
+    from app.services.embedding_models import clear_active_cache
+    embedding_cache.clear()
+    clear_active_cache()
+    yield
+    embedding_cache.clear()
+    clear_active_cache()
+
 # --- Mocking Fixtures ---
 @pytest.fixture(autouse=True)
 def mock_celery_tasks(monkeypatch):
@@ -94,7 +119,10 @@ def mock_celery_tasks(monkeypatch):
     
     mock_ai = MagicMock()
     monkeypatch.setattr("app.tasks.ai_tasks.process_message_ai.delay", mock_ai)
-    return {"email": mock_email, "bulk": mock_bulk, "ai": mock_ai}
+
+    mock_ai_batch = MagicMock()
+    monkeypatch.setattr("app.tasks.ai_tasks.process_messages_ai_batch.delay", mock_ai_batch)
+    return {"email": mock_email, "bulk": mock_bulk, "ai": mock_ai, "ai_batch": mock_ai_batch}
 
 # --- AUTHENTICATION FIXTURES ---
 @pytest.fixture(scope="function")
@@ -5,7 +5,8 @@ Context: Pod C - End-to-End verification of the "Brain".
 
 Verifies that:
 1. Messages are saved correctly by ChatService.
-2. The AI Worker Task (process_message_ai) runs without error.
+2. The AI Worker Task (process_message_ai) routes to both stage tasks,
+   which run without error.
 3. Sentiment and Embeddings are updated in the Database.
 """
 
@@ -14,7 +15,7 @@ from unittest.mock import MagicMock, patch
 from sqlalchemy.orm import Session
 from app.models import ChatMessage, MessageEmbedding
 from app.services.chat_service import ChatService
-from app.tasks.ai_tasks import process_message_ai
+from app.tasks.ai_tasks import analyze_sentiment, embed_messages, process_message_ai
 
 def test_ai_task_flow(db_session: Session):
     """
@@ -47,25 +48,38 @@ def test_ai_task_flow(db_session: Session):
     try:
         # Patch SessionLocal to use our kept-alive session
         with patch("app.tasks.ai_tasks.SessionLocal", return_value=db_session), \
-             patch("app.services.sentiment_service.sentiment_pipeline", side_effect=lambda x: mock_sentiment_result), \
-             patch("app.services.embedding_service.requests.post") as mock_post:
+             patch("app.services.sentiment_service.get_sentiment_pipeline",
+                   return_value=MagicMock(side_effect=lambda texts, **kw: mock_sentiment_result * len(texts))), \
+             patch("app.services.embedding_service.get_session") as mock_session, \
+             patch.object(analyze_sentiment, "delay", side_effect=analyze_sentiment) as sentiment_delay, \
+             patch.object(embed_messages, "delay", side_effect=embed_messages) as embed_delay:
             
+            mock_post = mock_session.return_value.post
             mock_post.return_value.status_code = 200
             mock_post.return_value.json.return_value = mock_embedding_response
 
             # --- 3. EXECUTE: Run the Celery Task Synchronously ---
+            # (stage .delay() calls run inline)
             process_message_ai(msg.id)
 
+        sentiment_delay.assert_called_once()
+        embed_delay.assert_called_once()
+
         # --- 4. VERIFICATION ---
         
         db_session.refresh(msg)
         
         print(f"DEBUG: Message Sentiment is: {msg.sentiment}")
         assert msg.sentiment == "negative", "Sentiment should be updated to 'negative'"
+        assert msg.sentiment_scored_at is not None, "Scored messages leave the pending sweep"
 
         embedding = db_session.query(MessageEmbedding).filter_by(message_id=msg.id).first()
         assert embedding is not None, "Embedding row should be created"
         
+        # Search filter columns are copied from the message
+        assert embedding.conversation_id == msg.conversation_id
+        assert embedding.from_number == msg.from_number
+
         # Verify vector dimensions
         assert len(embedding.embedding) == 1024, "Vector dimension should be 1024"
         
@@ -32,4 +32,99 @@ async def test_create_bulk_job(client: AsyncClient, auth_headers):
     
     # Check if the number of recipients matches
     if "numbers" in data:
-        assert len(data["numbers"]) == 2
\ No newline at end of file
+        assert len(data["numbers"]) == 2
+
+async def test_create_bulk_job_reports_skipped_numbers(client: AsyncClient, auth_headers):
+    """Numbers are normalized and deduplicated on the way in."""
+    payload = {
+        "template_name": "welcome_offer_2024",
+        "numbers": ["+91 99999 99999", "919999999999", "not-a-number", "918888888888"],
+    }
+    res = await client.post("/v1/api/bulk/jobs", json=payload, headers=auth_headers)
+
+    assert res.status_code == 201, res.text
+    data = res.json()
+    assert data["total_count"] == 2
+    assert data["skipped_count"] == 2
+
+async def test_create_bulk_job_rejects_lists_without_valid_numbers(client: AsyncClient, auth_headers):
+    payload = {"template_name": "welcome_offer_2024", "numbers": ["123", "abc"]}
+    res = await client.post("/v1/api/bulk/jobs", json=payload, headers=auth_headers)
+    assert res.status_code == 400
+
+async def test_upload_bulk_job_imports_file(client: AsyncClient, auth_headers, db_session, mocker):
+    """The upload returns the job as 'importing'; the file is loaded right after."""
+    mocker.patch("app.api.bulk.SessionLocal", return_value=db_session)
+    csv_body = b"phone,name\n+91 99999 99999,Asha\n919999999999,Asha\nn/a,\n918888888888,Ravi\n"
+
+    res = await client.post(
+        "/v1/api/bulk/jobs/upload",
+        data={"template_name": "welcome_offer_2024"},
+        files={"file": ("numbers.csv", csv_body, "text/csv")},
+        headers=auth_headers,
+    )
+
+    assert res.status_code == 202, res.text
+    data = res.json()
+    assert data["status"] == "importing"
+    assert data["progress_url"] == f"/v1/api/bulk/jobs/{data['id']}/summary"
+
+    status_res = await client.get(data["progress_url"], headers=auth_headers)
+    job = status_res.json()
+    assert job["status"] == "queued"
+    assert (job["total_count"], job["skipped_count"]) == (2, 2)
+
+async def test_upload_bulk_job_rejects_bad_components(client: AsyncClient, auth_headers):
+    res = await client.post(
+        "/v1/api/bulk/jobs/upload",
+        data={"template_name": "welcome_offer_2024", "components": "{not json"},
+        files={"file": ("numbers.csv", b"919999999999\n", "text/csv")},
+        headers=auth_headers,
+    )
+    assert res.status_code == 422
+
+async def test_job_summary_counts_by_status(client: AsyncClient, auth_headers, db_session):
+    from app.models import BulkMessage
+
+    payload = {"template_name": "welcome_offer_2024", "numbers": ["919000000001", "919000000002", "919000000003"]}
+    job_id = (await client.post("/v1/api/bulk/jobs", json=payload, headers=auth_headers)).json()["id"]
+    db_session.query(BulkMessage).filter(BulkMessage.job_id == job_id, BulkMessage.to_number == "919000000001") \
+        .update({"status": "failed"})
+    db_session.flush()
+
+    counted = (await client.get(f"/v1/api/bulk/jobs/{job_id}/summary", headers=auth_headers)).json()
+    exact = (await client.get(f"/v1/api/bulk/jobs/{job_id}/summary?exact=true", headers=auth_headers)).json()
+
+    # Counters only move with the sender; the GROUP BY sees the row as it is
+    assert counted["counts"] == {"pending": 3, "sent": 0, "failed": 0}
+    assert exact["counts"] == {"pending": 2, "sent": 0, "failed": 1}
+    assert "messages" not in exact
+
+async def test_job_messages_are_keyset_paginated(client: AsyncClient, auth_headers, db_session):
+    from app.models import BulkMessage
+
+    numbers = [f"91900000{i:04d}" for i in range(5)]
+    payload = {"template_name": "welcome_offer_2024", "numbers": numbers}
+    job_id = (await client.post("/v1/api/bulk/jobs", json=payload, headers=auth_headers)).json()["id"]
+    db_session.query(BulkMessage).filter(BulkMessage.job_id == job_id, BulkMessage.to_number == numbers[3]) \
+        .update({"status": "failed"})
+    db_session.flush()
+
+    seen, after = [], None
+    while True:
+        params = {"limit": 2} if after is None else {"limit": 2, "after": after}
+        page = (await client.get(f"/v1/api/bulk/jobs/{job_id}/messages", params=params, headers=auth_headers)).json()
+        seen += [m["to_number"] for m in page["items"]]
+        after = page["next_cursor"]
+        if after is None:
+            break
+    assert seen == numbers
+
+    failed = (await client.get(f"/v1/api/bulk/jobs/{job_id}/messages", params={"status": "failed"},
+                               headers=auth_headers)).json()
+    assert [m["to_number"] for m in failed["items"]] == [numbers[3]]
+    assert failed["next_cursor"] is None
+
+async def test_job_summary_is_tenant_scoped(client: AsyncClient, auth_headers):
+    res = await client.get("/v1/api/bulk/jobs/999999/summary", headers=auth_headers)
+    assert res.status_code == 404
@@ -0,0 +1,146 @@
+# tests/integration/test_bulk_send.py
+from app.models import BulkJob, BulkMessage
+from app.services.bulk_sender import BulkSender, SendResult
+from app.services.bulk_service import BulkService
+
+def test_run_job_writes_chunk_results(db_session, mocker):
+    """Statuses, WhatsApp IDs and failures land in the rows via the per-chunk UPDATE."""
+    mocker.patch("app.services.bulk_service.settings.BULK_SEND_CHUNK_SIZE", 2)
+    job = BulkJob(tenant_id=1, template_name="promo", language_code="en", status="queued", total_count=5)
+    db_session.add(job)
+    db_session.flush()
+    db_session.add_all([BulkMessage(job_id=job.id, to_number=f"9190000000{i}", status="pending", attempts=0)
+                        for i in range(5)])
+    db_session.flush()
+
+    async def send_many(self, recipients):
+        return [SendResult(mid, "failed", error="Undeliverable") if number.endswith("3")
+                else SendResult(mid, "sent", whatsapp_message_id=f"wamid.{number}")
+                for mid, number in recipients]
+    mocker.patch.object(BulkSender, "send_many", send_many)
+
+    BulkService(db_session).run_job(job.id)
+
+    db_session.expire_all()
+    msgs = {m.to_number: m for m in db_session.query(BulkMessage).filter_by(job_id=job.id)}
+    job = db_session.get(BulkJob, job.id)
+    assert job.status == "done" and job.completed_at is not None
+    assert (job.sent_count, job.failed_count) == (4, 1)
+    assert msgs["91900000000"].status == "sent"
+    assert msgs["91900000000"].whatsapp_message_id == "wamid.91900000000"
+    assert msgs["91900000003"].status == "failed"
+    assert msgs["91900000003"].attempts == 1 and msgs["91900000003"].last_error == "Undeliverable"
+    assert not any(m.status == "pending" for m in msgs.values())
+
+def test_shards_cover_the_job_and_finish_it(db_session, mocker):
+    """Each shard sends only its id range; finish_job closes the job with the summed counters."""
+    mocker.patch("app.services.bulk_service.settings.BULK_SHARD_MIN_SIZE", 4)
+    job = BulkJob(tenant_id=1, template_name="promo", language_code="en", status="queued", total_count=10)
+    db_session.add(job)
+    db_session.flush()
+    db_session.add_all([BulkMessage(job_id=job.id, to_number=f"9180000000{i}", status="pending", attempts=0)
+                        for i in range(10)])
+    db_session.flush()
+
+    sent_ids = []
+
+    async def send_many(self, recipients):
+        sent_ids.extend(mid for mid, _ in recipients)
+        return [SendResult(mid, "sent", whatsapp_message_id=f"wamid.{mid}") for mid, _ in recipients]
+    mocker.patch.object(BulkSender, "send_many", send_many)
+
+    svc = BulkService(db_session)
+    shards = svc.start_job(job.id)
+    assert len(shards) == 3
+    results = [svc.run_shard(job.id, start, end) for start, end in shards]
+    svc.finish_job(job.id)
+
+    assert sum(r["sent"] for r in results) == 10
+    assert len(sent_ids) == len(set(sent_ids)) == 10
+    job = db_session.get(BulkJob, job.id)
+    assert job.status == "done" and job.sent_count == 10 and job.shard_count == 3
+
+def test_finished_job_is_not_dispatched_again(db_session, mocker):
+    """Only pending/queued jobs can be moved to 'running'."""
+    job = BulkJob(tenant_id=1, template_name="promo", language_code="en", status="done")
+    db_session.add(job)
+    db_session.flush()
+    db_session.add(BulkMessage(job_id=job.id, to_number="917000000001", status="pending", attempts=0))
+    db_session.flush()
+    send_many = mocker.patch.object(BulkSender, "send_many")
+
+    assert BulkService(db_session).start_job(job.id) is None
+    BulkService(db_session).run_job(job.id)
+
+    send_many.assert_not_called()
+    assert db_session.get(BulkJob, job.id).status == "done"
+
+def test_stale_sending_messages_are_failed_not_resent(db_session, mocker):
+    """A chunk left 'sending' by a dead worker is failed, with retries exhausted."""
+    from datetime import datetime, timedelta, timezone
+    from app.tasks import scheduler
+
+    job = BulkJob(tenant_id=1, template_name="promo", language_code="en", status="running", total_count=2)
+    db_session.add(job)
+    db_session.flush()
+    old = datetime.now(timezone.utc) - timedelta(hours=1)
+    stale = BulkMessage(job_id=job.id, to_number="917000000001", status="sending", claimed_at=old, attempts=0)
+    live = BulkMessage(job_id=job.id, to_number="917000000002", status="sending",
+                       claimed_at=datetime.now(timezone.utc), attempts=0)
+    db_session.add_all([stale, live])
+    db_session.flush()
+    mocker.patch.object(scheduler, "SessionLocal", return_value=db_session)
+    mocker.patch.object(db_session, "close")
+
+    scheduler.fail_stale_sends()
+
+    db_session.expire_all()
+    assert db_session.get(BulkMessage, stale.id).status == "failed"
+    assert db_session.get(BulkMessage, stale.id).attempts >= scheduler.MAX_RETRIES
+    assert db_session.get(BulkMessage, live.id).status == "sending"
+    assert db_session.get(BulkJob, job.id).failed_count == 1
+
+def test_ingest_dedupes_within_and_across_chunks(db_session):
+    """COPY ingestion drops invalid numbers and repeats, keeping list order."""
+    from app.services.bulk_ingest import BulkIngestService
+
+    job = BulkJob(tenant_id=1, template_name="promo", language_code="en", status="queued")
+    db_session.add(job)
+    db_session.flush()
+
+    numbers = ["+91 70000 00001", "917000000002", "917000000001", "oops", "917000000003", "0091-7000000002"]
+    result = BulkIngestService(db_session).ingest(job.id, numbers, chunk_size=2)
+
+    assert (result.created, result.invalid, result.duplicate) == (3, 1, 2)
+    rows = db_session.query(BulkMessage.to_number).filter_by(job_id=job.id).order_by(BulkMessage.id).all()
+    assert [r.to_number for r in rows] == ["917000000001", "917000000002", "917000000003"]
+
+    db_session.refresh(job)
+    assert (job.total_count, job.skipped_count) == (3, 3)
+
+def test_send_bucket_is_shared_across_workers():
+    """Two buckets for one number (two worker processes) draw from one Redis budget."""
+    import asyncio
+    import time
+    import uuid
+    from app.core.cache import sync_redis_client
+    from app.services.bulk_sender import SharedTokenBucket
+
+    name = f"test-{uuid.uuid4().hex[:8]}"
+    workers = [SharedTokenBucket(name, rate=50, burst=5, min_rate=5) for _ in range(2)]
+
+    async def drain():
+        await asyncio.gather(*(w.acquire() for w in workers for _ in range(15)))
+
+    try:
+        start = time.monotonic()
+        asyncio.run(drain())
+        # 30 tokens: 5 from the burst, 25 more at 50/s, whichever worker asks
+        assert time.monotonic() - start >= 0.45
+
+        asyncio.run(workers[0].throttled(0.01))
+        assert float(sync_redis_client.hget(f"bulk:send_bucket:{name}", "rate")) == 25
+        asyncio.run(workers[1].acquire())
+        assert workers[1].rate == 25
+    finally:
+        sync_redis_client.delete(f"bulk:send_bucket:{name}")
@@ -0,0 +1,63 @@
+"""
+Module: Conversation Concurrency Stress Test
+Context: Pod C - Module 3 (Chat Ingestion).
+
+Fires parallel messages for the same customer from separate DB sessions
+(as concurrent webhook workers would) and proves exactly one conversation
+exists, with last_message_at at its newest message.
+"""
+
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from app.models import Conversation, ChatMessage
+from app.services.chat_service import ChatService
+from tests.conftest import TestingSessionLocal
+
+WORKERS = 4
+MESSAGES_PER_WORKER = 5
+
+def test_parallel_messages_create_one_conversation(monkeypatch):
+    # Bypass the in-process cache so every worker races on the database path
+    monkeypatch.setattr("app.services.chat_service.conversation_cache.get", lambda *a, **k: None)
+
+    number = f"91{uuid.uuid4().int}"[:12]
+    barrier = threading.Barrier(WORKERS)
+
+    def worker(worker_id: int):
+        db = TestingSessionLocal()
+        try:
+            svc = ChatService(db)
+            barrier.wait()
+            for i in range(MESSAGES_PER_WORKER):
+                if i % 2:
+                    svc.save_incoming(number, f"hello {worker_id}-{i}")
+                else:
+                    svc.save_incoming_batch([{"from_number": number, "text": f"batch {worker_id}-{i}"}])
+        finally:
+            db.close()
+
+    try:
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            list(pool.map(worker, range(WORKERS)))
+
+        db = TestingSessionLocal()
+        try:
+            convos = db.query(Conversation).filter_by(customer_number=number).all()
+            assert len(convos) == 1, f"Expected exactly one conversation, found {len(convos)}"
+
+            msgs = db.query(ChatMessage).filter_by(conversation_id=convos[0].id).all()
+            assert len(msgs) == WORKERS * MESSAGES_PER_WORKER
+            # Whichever worker committed last, the timestamp never moved backwards
+            assert convos[0].last_message_at == max(m.created_at for m in msgs)
+        finally:
+            db.close()
+
+    finally:
+        # These sessions committed for real; clean up so other tests start empty
+        db = TestingSessionLocal()
+        convo_ids = [c.id for c in db.query(Conversation.id).filter_by(customer_number=number)]
+        db.query(ChatMessage).filter(ChatMessage.conversation_id.in_(convo_ids)).delete(synchronize_session=False)
+        db.query(Conversation).filter(Conversation.id.in_(convo_ids)).delete(synchronize_session=False)
+        db.commit()
+        db.close()
@@ -108,4 +108,21 @@ async def test_webhook_flow_creates_conversation(client: AsyncClient, auth_heade
     
     messages = msg_res.json()
     assert len(messages) > 0
-    assert messages[0]["text"] == "I want to buy a cake"
\ No newline at end of file
+    assert messages[0]["text"] == "I want to buy a cake"
+async def test_conversations_belong_to_the_whatsapp_tenant(db_session, mocker):
+    """New conversations are stamped with the number's tenant; older tenantless ones are adopted."""
+    from app.models import Conversation
+    from app.services.chat_service import ChatService
+
+    mocker.patch("app.services.chat_service.settings.WHATSAPP_TENANT_ID", 1)
+    old_number = f"91{uuid.uuid4().int}"[:12]
+    orphan = Conversation(customer_number=old_number)
+    db_session.add(orphan)
+    db_session.commit()
+
+    new_msg = ChatService(db_session).save_incoming(f"91{uuid.uuid4().int}"[:12], "hello")
+    ChatService(db_session).save_incoming_batch([{"from_number": old_number, "text": "hi again"}])
+
+    assert db_session.get(Conversation, new_msg.conversation_id).tenant_id == 1
+    db_session.refresh(orphan)
+    assert orphan.tenant_id == 1
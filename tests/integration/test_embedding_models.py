@@ -0,0 +1,74 @@
+"""
+Module: Embedding Model Migration Integration Test
+Context: Pod C - Module 4 (AI).
+
+Verifies that during a model migration:
+1. New messages are embedded for both the active and the registered model.
+2. Activation is refused until the new model is backfilled and indexed.
+3. After the switch, searches read only the new model's vectors.
+"""
+
+import pytest
+from sqlalchemy.orm import Session
+from app.models import MessageEmbedding
+from app.services.chat_service import ChatService
+from app.services.embedding_models import EmbeddingModelRegistry
+from app.services.embedding_service import EmbeddingService
+
+NEW_MODEL = "embed-english-light-v3.0"
+
+@pytest.fixture
+def cohere(mocker):
+    mocker.patch("app.services.embedding_service.settings.COHERE_API_KEY", "test-key")
+    post = mocker.patch("app.services.embedding_service.get_session").return_value.post
+
+    def respond():
+        payload = post.call_args.kwargs["json"]
+        dims = 384 if payload["model"] == NEW_MODEL else 1024
+        return {"embeddings": [[0.3] * dims for _ in payload["texts"]]}
+
+    post.return_value.json.side_effect = respond
+    return post
+
+def test_dual_write_then_switch(db_session: Session, cohere):
+    registry = EmbeddingModelRegistry(db_session)
+    old_model = registry.active()[0]
+    registry.register(NEW_MODEL)
+    assert registry.write_models() == [old_model, NEW_MODEL]
+
+    msg = ChatService(db_session, tenant_id=1).save_incoming("+918880009999", "where is my order?")
+    EmbeddingService(db_session).embed_messages([msg])
+
+    rows = db_session.query(MessageEmbedding).filter_by(message_id=msg.id).all()
+    assert {r.model_version: len(r.embedding) for r in rows} == {old_model: 1024, NEW_MODEL: 384}
+
+    with pytest.raises(ValueError, match="not ready"):
+        registry.activate(NEW_MODEL)
+
+    registry.activate(NEW_MODEL, force=True)
+    assert registry.active() == (NEW_MODEL, 384)
+
+    svc = EmbeddingService(db_session)
+    results = svc.search_similar([0.3] * 384, tenant_id=1, limit=5)
+    assert msg.id in [r[0] for r in results]
+
+def test_register_rejects_changed_dimensions(db_session: Session):
+    registry = EmbeddingModelRegistry(db_session)
+    row = registry.register(NEW_MODEL)
+
+    with pytest.raises(ValueError, match="registered with 384 dimensions"):
+        registry.register(NEW_MODEL, dimensions=1024)
+
+    # A retired model is only revived at its registered width
+    row.status = "retired"
+    with pytest.raises(ValueError):
+        registry.register(NEW_MODEL, dimensions=512)
+    assert registry.register(NEW_MODEL).status == "building"
+
+@pytest.mark.asyncio
+async def test_similar_search_rejects_users_without_tenant(client, db_session, test_user, auth_headers):
+    test_user.tenant_id = None
+    db_session.commit()
+
+    res = await client.get("/v1/api/vector/similar", params={"text": "refund"}, headers=auth_headers)
+    assert res.status_code == 403
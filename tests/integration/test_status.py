@@ -0,0 +1,68 @@
+"""
+Module: Delivery Status Integration Tests
+Context: Pod C - Module 6 (Reliability & Delivery Receipts).
+
+Verifies that receipts are applied in bulk and never move a message backwards.
+"""
+
+from sqlalchemy.orm import Session
+from app.models import Conversation, ChatMessage, MessageStatus
+from app.services.status_service import StatusService
+
+def create_messages(db: Session, *wamids: str) -> dict[str, int]:
+    """Helper: Inserts one ChatMessage per WAMID and returns wamid -> id."""
+    convo = Conversation(customer_number="917100000000")
+    db.add(convo)
+    db.flush()
+
+    msgs = [ChatMessage(conversation_id=convo.id, from_number="917100000000", text="hi", message_id=w) for w in wamids]
+    db.add_all(msgs)
+    db.commit()
+    return {m.message_id: m.id for m in msgs}
+
+def test_bulk_status_update_is_monotonic(db_session: Session):
+    """
+    Out-of-order receipts in one batch collapse to the most advanced status,
+    and a later stale batch cannot roll it back.
+    """
+    ids = create_messages(db_session, "wamid.S1", "wamid.S2")
+    svc = StatusService(db_session)
+
+    written = svc.update_statuses_bulk([
+        {"id": "wamid.S1", "status": "read", "error": None},
+        {"id": "wamid.S1", "status": "delivered", "error": None},
+        {"id": "wamid.S2", "status": "sent", "error": None},
+        {"id": "wamid.UNKNOWN", "status": "sent", "error": None},
+    ])
+    assert written == 2
+
+    # Stale 'delivered' for S1 is ignored; S2 advances
+    svc.update_statuses_bulk([
+        {"id": "wamid.S1", "status": "delivered", "error": None},
+        {"id": "wamid.S2", "status": "delivered", "error": None},
+    ])
+
+    rows = {r.message_id: r.wa_status for r in db_session.query(MessageStatus).filter(MessageStatus.message_id.in_(ids.values()))}
+    assert rows == {ids["wamid.S1"]: "read", ids["wamid.S2"]: "delivered"}
+
+def test_single_status_update_follows_lattice(db_session: Session):
+    """
+    The single-receipt path uses the same guarded upsert:
+    failed is terminal and unknown WAMIDs/statuses are ignored.
+    """
+    ids = create_messages(db_session, "wamid.L1")
+    svc = StatusService(db_session)
+
+    assert svc.update_status("wamid.L1", "sent").wa_status == "sent"
+    assert svc.update_status("wamid.L1", "failed", error="131026").wa_status == "failed"
+
+    # Nothing moves a message out of 'failed'
+    row = svc.update_status("wamid.L1", "read")
+    assert row.wa_status == "failed"
+    assert row.last_error == "131026"
+
+    assert svc.update_status("wamid.MISSING", "read") is None
+    assert svc.update_status("wamid.L1", "warning") is None
+
+    # Exactly one tracking row per message
+    assert db_session.query(MessageStatus).filter_by(message_id=ids["wamid.L1"]).count() == 1
@@ -70,4 +70,82 @@ async def test_webhook_lifecycle(client: AsyncClient, monkeypatch):
     
     # 7. Assert
     assert res.status_code == 200, f"Webhook failed: {res.text}"
-    assert res.json() == {"status": "ok"}
\ No newline at end of file
+    assert res.json() == {"status": "ok"}
+
+async def test_webhook_batch_ingest(client: AsyncClient, db_session, mock_celery_tasks, monkeypatch):
+    """
+    A payload with several messages is stored in one batch:
+    one conversation per sender, one AI dispatch, and retries are idempotent.
+    """
+    from app.models import ChatMessage, Conversation
+
+    mock_secret = "test_secret_12345"
+    monkeypatch.setattr(settings, "WHATSAPP_APP_SECRET", mock_secret)
+
+    def text_msg(sender, wamid, body):
+        return {"from": sender, "id": wamid, "type": "text", "text": {"body": body}}
+
+    payload = {
+        "object": "whatsapp_business_account",
+        "entry": [{
+            "changes": [
+                {"value": {"messages": [
+                    text_msg("917000000001", "wamid.BATCH1", "Hi"),
+                    text_msg("917000000001", "wamid.BATCH2", "Any offers today?"),
+                ]}},
+                {"value": {"messages": [
+                    text_msg("917000000002", "wamid.BATCH3", "Where is my order?"),
+                    {"from": "917000000002", "id": "wamid.BATCH4", "type": "image"},
+                ]}},
+            ]
+        }]
+    }
+    payload_bytes = json.dumps(payload).encode("utf-8")
+    headers = {
+        "X-Hub-Signature": sign_bytes(payload_bytes, mock_secret),
+        "Content-Type": "application/json"
+    }
+
+    res = await client.post("/v1/api/webhooks/whatsapp", content=payload_bytes, headers=headers)
+    assert res.status_code == 200, f"Webhook failed: {res.text}"
+
+    saved = db_session.query(ChatMessage).filter(ChatMessage.message_id.like("wamid.BATCH%")).all()
+    assert len(saved) == 3, "Only text messages should be stored"
+
+    convos = db_session.query(Conversation).filter(
+        Conversation.customer_number.in_(["917000000001", "917000000002"])
+    ).all()
+    assert len(convos) == 2, "Each sender should get exactly one conversation"
+
+    # The AI pipeline is dispatched once for the whole payload
+    mock_celery_tasks["ai_batch"].assert_called_once()
+    assert sorted(mock_celery_tasks["ai_batch"].call_args[0][0]) == sorted(m.id for m in saved)
+
+    # Meta retry of the same payload must not duplicate rows
+    res = await client.post("/v1/api/webhooks/whatsapp", content=payload_bytes, headers=headers)
+    assert res.status_code == 200
+    assert db_session.query(ChatMessage).filter(ChatMessage.message_id.like("wamid.BATCH%")).count() == 3
+
+
+async def test_webhook_stream_mode_acks_without_db_writes(client: AsyncClient, db_session, monkeypatch, mocker):
+    """
+    In 'stream' mode the endpoint only verifies the signature and appends the raw body.
+    """
+    from app.models import ChatMessage
+
+    mock_secret = "test_secret_12345"
+    monkeypatch.setattr(settings, "WHATSAPP_APP_SECRET", mock_secret)
+    monkeypatch.setattr(settings, "WEBHOOK_INGEST_MODE", "stream")
+    publish = mocker.patch("app.api.webhooks.publish_webhook", return_value="1-0")
+
+    payload = {"entry": [{"changes": [{"value": {"messages": [
+        {"from": "917000000003", "id": "wamid.STREAM1", "type": "text", "text": {"body": "Hi"}}
+    ]}}]}]}
+    payload_bytes = json.dumps(payload).encode("utf-8")
+    headers = {"X-Hub-Signature": sign_bytes(payload_bytes, mock_secret)}
+
+    res = await client.post("/v1/api/webhooks/whatsapp", content=payload_bytes, headers=headers)
+
+    assert res.status_code == 200
+    publish.assert_called_once_with(payload_bytes)
+    assert db_session.query(ChatMessage).filter_by(message_id="wamid.STREAM1").count() == 0
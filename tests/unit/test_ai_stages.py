@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import requests
+from app.tasks import ai_tasks
+
+def session_with(rows):
+    """Fake session whose `.filter(ChatMessage.id.in_(ids))` returns the matching rows."""
+    db = MagicMock()
+
+    def filter_(clause):
+        ids = clause.right.value
+        return MagicMock(all=MagicMock(return_value=[r for r in rows if r.id in ids]))
+
+    db.query.return_value.filter.side_effect = filter_
+    return db
+
+def test_router_fans_out_to_both_stages(mocker):
+    sentiment = mocker.patch.object(ai_tasks.analyze_sentiment, "delay")
+    embed = mocker.patch.object(ai_tasks.embed_messages, "delay")
+
+    ai_tasks.process_messages_ai_batch([1, 2, 3])
+
+    assert sentiment.call_args.args[0] == [1, 2, 3]
+    assert embed.call_args.args[0] == [1, 2, 3]
+
+def test_sentiment_stage_retries_only_failed_messages(mocker):
+    mocker.patch.object(ai_tasks, "SessionLocal", return_value=session_with(
+        [SimpleNamespace(id=1, text="great"), SimpleNamespace(id=2, text="huge")]
+    ))
+    analyze = mocker.patch.object(ai_tasks.SentimentService, "analyze_batch",
+                                  side_effect=lambda msgs: {1: "positive", 2: "pending"})
+
+    # Eager apply runs retries inline
+    ai_tasks.analyze_sentiment.apply(args=[[1, 2], None])
+
+    batches = [[m.id for m in call.args[0]] for call in analyze.call_args_list]
+    assert batches == [[1, 2]] + [[2]] * ai_tasks.analyze_sentiment.max_retries
+
+def test_embed_stage_retries_cohere_errors(mocker):
+    mocker.patch.object(ai_tasks.settings, "EMBED_MODE", "inline")
+    mocker.patch.object(ai_tasks, "SessionLocal", return_value=session_with([SimpleNamespace(id=1, text="hi")]))
+    embed = mocker.patch.object(ai_tasks.EmbeddingService, "embed_messages",
+                                side_effect=[requests.exceptions.ConnectionError("down"), 1])
+
+    result = ai_tasks.embed_messages.apply(args=[[1], None])
+
+    assert result.successful()
+    assert embed.call_count == 2
@@ -0,0 +1,126 @@
+from unittest.mock import MagicMock
+from app.services.bulk_ingest import BulkIngestService, IngestResult, iter_csv_numbers, normalize_number
+
+def test_numbers_are_normalized_to_e164_digits():
+    assert normalize_number("+91 98765-43210") == "919876543210"
+    assert normalize_number("0044 (20) 7946.0958") == "442079460958"
+    assert normalize_number("919999999999") == "919999999999"
+    for bad in ["", "  ", "12345", "+0123456789", "91999999999999999", "91-ABC-123456", "٩١٩٨٧٦٥٤٣٢١٠"]:
+        assert normalize_number(bad) is None, bad
+
+def test_csv_takes_first_column_and_skips_header():
+    lines = ["phone,name\n", "+919876543210,Asha\n", "\n", "918888888888\n"]
+    assert list(iter_csv_numbers(lines)) == ["+919876543210", "918888888888"]
+
+def test_numbers_are_copied_in_chunks(mocker):
+    db = MagicMock()
+    cursor = db.connection.return_value.connection.cursor.return_value
+    cursor.rowcount = 2
+    copied = []
+    cursor.copy_expert.side_effect = lambda sql, stream: copied.append(stream.read().split())
+
+    result = BulkIngestService(db).ingest(7, ["919000000001", "bad", "919000000002", "919000000001", "919000000003"],
+                                          chunk_size=2)
+
+    # Invalid numbers never reach the database; the rest stream in chunk-sized COPYs
+    assert copied == [["919000000001", "919000000002"], ["919000000001", "919000000003"]]
+    assert (result.created, result.invalid, result.duplicate) == (4, 1, 0)
+    # Job counters move with each chunk
+    assert [c.args[1] for c in db.execute.call_args_list] == [
+        {"created": 2, "skipped": 1, "job_id": 7},
+        {"created": 2, "skipped": 0, "job_id": 7},
+    ]
+    db.commit.assert_not_called()
+
+def test_commit_chunks_commits_each_chunk():
+    db = MagicMock()
+    db.connection.return_value.connection.cursor.return_value.rowcount = 2
+
+    BulkIngestService(db).ingest(7, ["919000000001", "919000000002", "919000000003"],
+                                 chunk_size=2, commit_chunks=True)
+
+    assert db.commit.call_count == 2
+
+def import_session(mocker, moved=1):
+    """Patched SessionLocal; returns the mock of the import's final status UPDATE."""
+    from app.api import bulk
+    db = mocker.patch.object(bulk, "SessionLocal").return_value
+    update = db.query.return_value.filter.return_value.update
+    update.return_value = moved
+    return update
+
+def test_uploaded_file_is_imported_then_queued(mocker, tmp_path):
+    from app.api import bulk
+
+    path = tmp_path / "numbers.csv"
+    path.write_text("phone\n+91 90000 00001\n")
+    update = import_session(mocker)
+    read = []
+    ingest = mocker.patch.object(bulk.BulkIngestService, "ingest",
+                                 side_effect=lambda job_id, numbers, **kw: read.extend(numbers) or IngestResult(created=1))
+    delay = mocker.patch.object(bulk.process_bulk_whatsapp_job, "delay")
+
+    bulk.import_uploaded_recipients(7, str(path), "queued")
+
+    # Streamed from the file (header skipped) in committed chunks, then released
+    assert read == ["+91 90000 00001"]
+    assert ingest.call_args.kwargs["commit_chunks"] is True
+    assert update.call_args.args[0] == {"status": "queued"}
+    delay.assert_called_once_with(7)
+    assert not path.exists()
+
+def test_upload_without_valid_numbers_fails_the_job(mocker, tmp_path):
+    from app.api import bulk
+
+    path = tmp_path / "numbers.csv"
+    path.write_text("nope\n")
+    update = import_session(mocker)
+    mocker.patch.object(bulk.BulkIngestService, "ingest", return_value=IngestResult(invalid=1))
+    delay = mocker.patch.object(bulk.process_bulk_whatsapp_job, "delay")
+
+    bulk.import_uploaded_recipients(7, str(path), "queued")
+
+    assert update.call_args.args[0]["status"] == "failed"
+    delay.assert_not_called()
+    assert not path.exists()
+
+def test_import_finishing_after_timeout_does_not_revive_the_job(mocker, tmp_path):
+    from app.api import bulk
+
+    path = tmp_path / "numbers.csv"
+    path.write_text("919000000001\n")
+    import_session(mocker, moved=0)  # fail_stale_imports got there first
+    mocker.patch.object(bulk.BulkIngestService, "ingest", return_value=IngestResult(created=1))
+    delay = mocker.patch.object(bulk.process_bulk_whatsapp_job, "delay")
+
+    bulk.import_uploaded_recipients(7, str(path), "queued")
+
+    delay.assert_not_called()
+
+def test_stale_imports_are_failed(mocker):
+    from app.tasks import scheduler
+
+    db = mocker.patch.object(scheduler, "SessionLocal").return_value
+    update = db.query.return_value.filter.return_value.update
+    update.return_value = 2
+
+    scheduler.fail_stale_imports()
+
+    assert update.call_args.args[0]["status"] == "failed"
+    db.commit.assert_called_once()
+
+def test_oversized_uploads_are_refused_before_parsing(mocker):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    mocker.patch("app.api.bulk.settings.BULK_UPLOAD_MAX_BYTES", 1000)
+    client = TestClient(app)
+    files = {"file": ("numbers.csv", b"919000000001\n" * 200, "text/csv")}
+
+    # 413, not 401: refused before the form (and auth) are even looked at.
+    # Declared length first, then a chunked body with no Content-Length
+    assert client.post("/v1/api/bulk/jobs/upload", data={"template_name": "t"}, files=files).status_code == 413
+    body = (b"x" * 100 for _ in range(20))
+    res = client.post("/v1/api/bulk/jobs/upload", content=body,
+                      headers={"Content-Type": "multipart/form-data; boundary=b"})
+    assert res.status_code == 413
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import time
+import httpx
+from redis.exceptions import ConnectionError as RedisConnectionError
+from app.services.bulk_sender import BulkSender, SharedTokenBucket, TokenBucket
+
+def graph_api(handler):
+    """AsyncClient whose requests go to handler(number, attempt) -> httpx.Response."""
+    attempts: dict[str, int] = {}
+
+    def respond(request: httpx.Request):
+        number = json.loads(request.content)["to"]
+        attempts[number] = attempts.get(number, 0) + 1
+        return handler(number, attempts[number])
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(respond)), attempts
+
+def sent(number):
+    return httpx.Response(200, json={"messages": [{"id": f"wamid.{number}"}]})
+
+def sender(client, bucket=None, **kwargs):
+    return BulkSender("promo", "en_US", None, phone_number_id="123", client=client,
+                      bucket=bucket or TokenBucket(1000, 1000, 1), **kwargs)
+
+def test_sends_concurrently_and_keeps_order():
+    in_flight, peak = 0, 0
+
+    async def slow(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return sent(json.loads(request.content)["to"])
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(slow))
+    results = asyncio.run(sender(client, concurrency=8).send_many([(i, f"91{i}") for i in range(40)]))
+
+    assert [r.message_id for r in results] == list(range(40))
+    assert results[5].status == "sent" and results[5].whatsapp_message_id == "wamid.915"
+    assert peak == 8
+
+def test_token_bucket_caps_the_rate():
+    client, _ = graph_api(lambda number, attempt: sent(number))
+    bucket = TokenBucket(rate=100, burst=5, min_rate=1)
+
+    start = time.monotonic()
+    asyncio.run(sender(client, bucket=bucket).send_many([(i, f"91{i}") for i in range(25)]))
+
+    # 5 from the burst, then 20 at 100/s
+    assert time.monotonic() - start >= 0.18
+
+def test_throttling_slows_down_and_retries():
+    def handler(number, attempt):
+        if number == "911" and attempt == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.05"},
+                                  json={"error": {"code": 130429, "message": "Rate limit hit"}})
+        return sent(number)
+
+    client, attempts = graph_api(handler)
+    bucket = TokenBucket(rate=200, burst=10, min_rate=10)
+    results = asyncio.run(sender(client, bucket=bucket).send_many([(i, f"91{i}") for i in range(3)]))
+
+    assert all(r.status == "sent" for r in results)
+    assert attempts["911"] == 2
+    assert bucket.rate < 200
+
+def test_client_errors_are_not_retried():
+    def handler(number, attempt):
+        if number == "910":
+            return httpx.Response(400, json={"error": {"code": 131026, "message": "Undeliverable"}})
+        return httpx.Response(503) if attempt == 1 else sent(number)
+
+    client, attempts = graph_api(handler)
+    results = asyncio.run(sender(client).send_many([(0, "910"), (1, "911")]))
+
+    assert results[0].status == "failed" and "400" in results[0].error
+    assert attempts["910"] == 1
+    # Server errors are transient
+    assert results[1].status == "sent" and attempts["911"] == 2
+
+def shared_bucket(mocker, acquire=None, throttle=None):
+    redis = mocker.MagicMock()
+    scripts = {"acquire": acquire or mocker.MagicMock(return_value=[0, "80"]),
+               "throttle": throttle or mocker.MagicMock(return_value="40")}
+    redis.register_script.side_effect = [scripts["acquire"], scripts["throttle"]]
+    return SharedTokenBucket("123", rate=80, burst=20, min_rate=5, client=redis), scripts
+
+def test_shared_bucket_waits_as_told_and_reports_recovery(mocker):
+    acquire = mocker.MagicMock(side_effect=[[20, "80"], [0, "80"]])
+    bucket, _ = shared_bucket(mocker, acquire=acquire)
+    bucket.succeeded()
+
+    start = time.monotonic()
+    asyncio.run(bucket.acquire())
+
+    # Retried after the 20ms the script asked for; the success rode along once
+    assert time.monotonic() - start >= 0.02
+    assert [c.kwargs["args"][3] for c in acquire.call_args_list] == [0.1, 0.0]
+    assert acquire.call_args.kwargs["keys"] == ["bulk:send_bucket:123"]
+
+def test_shared_bucket_throttle_lowers_the_rate_for_everyone(mocker):
+    bucket, scripts = shared_bucket(mocker)
+    asyncio.run(bucket.throttled(2.0))
+
+    assert scripts["throttle"].call_args.kwargs["args"][:3] == [80, 5, 2.0]
+    assert bucket.rate == 40.0
+
+def test_shared_bucket_paces_locally_without_redis(mocker):
+    bucket, _ = shared_bucket(mocker, acquire=mocker.MagicMock(side_effect=RedisConnectionError("down")))
+    local = mocker.spy(bucket._local, "acquire")
+
+    asyncio.run(bucket.acquire())
+
+    local.assert_called_once()
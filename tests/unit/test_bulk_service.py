@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from sqlalchemy.dialects import postgresql
+from app.services.bulk_sender import BulkSender, SendResult
+from app.services.bulk_service import BulkService
+
+def test_claim_is_keyset_and_skip_locked(mocker):
+    db = MagicMock()
+    db.execute.return_value.all.return_value = [SimpleNamespace(id=3, to_number="913"),
+                                                SimpleNamespace(id=1, to_number="911")]
+
+    chunk = BulkService(db)._claim_chunk(job_id=7, after_id=500, limit=100)
+
+    sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "bulk_messages.id > " in sql and "ORDER BY bulk_messages.id" in sql
+    # The claim marks rows 'sending' and is committed before anything is sent
+    assert sql.startswith("UPDATE bulk_messages SET status=") and "claimed_at=now()" in sql
+    db.commit.assert_called_once()
+    assert [m.id for m in chunk] == [1, 3]
+
+def test_second_dispatch_does_not_restart_a_job(mocker):
+    db = MagicMock()
+    db.get.return_value = SimpleNamespace(id=7, status="running")
+    db.query.return_value.filter.return_value.update.return_value = 0
+    claim = mocker.patch.object(BulkService, "_claim_chunk")
+
+    assert BulkService(db).start_job(7) is None
+    assert BulkService(db).run_job(7).status == "running"
+    claim.assert_not_called()
+
+def test_one_update_per_chunk(mocker):
+    mocker.patch("app.services.bulk_service.settings.BULK_SEND_CHUNK_SIZE", 2)
+    db = MagicMock()
+    db.get.return_value = SimpleNamespace(id=7, status="queued", template_name="promo", language_code="en",
+                                          components=None, sent_count=0, failed_count=0)
+    chunks = [[SimpleNamespace(id=1, to_number="911"), SimpleNamespace(id=2, to_number="912")],
+              [SimpleNamespace(id=3, to_number="913")], [], []]
+    claim = mocker.patch.object(BulkService, "_claim_chunk", side_effect=chunks)
+
+    async def send_many(self, recipients):
+        return [SendResult(mid, "failed" if mid == 2 else "sent", error="bad" if mid == 2 else None)
+                for mid, _ in recipients]
+    mocker.patch.object(BulkSender, "send_many", send_many)
+    # RETURNING m.status of the rows still 'sending'
+    db.execute.return_value.scalars.return_value.all.side_effect = [["sent", "failed"], ["sent"]]
+
+    job = BulkService(db).run_job(7)
+
+    assert job.status == "done"
+    # Keyset: each claim starts after the previous chunk; one final pass from the start
+    assert [c.args[1] for c in claim.call_args_list] == [0, 2, 3, 0]
+    # Per chunk: one UPDATE for the messages and one for the job counters
+    assert db.execute.call_count == 4
+    sql, params = str(db.execute.call_args_list[0].args[0]), db.execute.call_args_list[0].args[1]
+    assert "FROM (VALUES" in sql
+    assert params["status1"] == "failed" and params["error1"] == "bad"
+    assert db.execute.call_args_list[1].args[1] == {"sent": 1, "failed": 1, "job_id": 7}
+    assert job.completed_at is not None
+
+def test_jobs_split_into_id_range_shards(mocker):
+    mocker.patch("app.services.bulk_service.settings.BULK_SHARDS", 8)
+    mocker.patch("app.services.bulk_service.settings.BULK_SHARD_MIN_SIZE", 2000)
+    db = MagicMock()
+    job = SimpleNamespace(id=7, status="queued", shard_count=None)
+    db.get.return_value = job
+    db.query.return_value.filter.return_value.one.return_value = (101, 10100, 10000)
+
+    shards = BulkService(db).start_job(7)
+
+    # 10k messages at >= 2000 per shard: 5 contiguous ranges covering every id
+    assert shards == [(100, 2100), (2100, 4100), (4100, 6100), (6100, 8100), (8100, 10100)]
+    assert job.shard_count == 5
+    db.query.return_value.filter.return_value.update.assert_called_once_with(
+        {"status": "running"}, synchronize_session=False
+    )
+
+def test_small_jobs_are_one_shard(mocker):
+    db = MagicMock()
+    db.get.return_value = SimpleNamespace(id=7, status="queued", shard_count=None)
+    db.query.return_value.filter.return_value.one.return_value = (5, 9, 5)
+
+    assert BulkService(db).start_job(7) == [(4, 9)]
+
+def test_job_task_dispatches_shards_as_a_chord(mocker):
+    from app.tasks import whatsapp_tasks
+    mocker.patch.object(whatsapp_tasks, "SessionLocal")
+    mocker.patch.object(BulkService, "start_job", return_value=[(0, 100), (100, 200)])
+    chord = mocker.patch.object(whatsapp_tasks, "chord")
+
+    whatsapp_tasks.process_bulk_whatsapp_job(7)
+
+    header = list(chord.call_args.args[0])
+    assert [s.args for s in header] == [(7, 0, 100), (7, 100, 200)]
+    callback = chord.return_value.call_args.args[0]
+    assert callback.task == "finalize_bulk_job" and callback.args == (7,)
+
+def test_failed_dispatch_fails_the_job(mocker):
+    from app.tasks import whatsapp_tasks
+    db = mocker.patch.object(whatsapp_tasks, "SessionLocal").return_value
+    job = SimpleNamespace(id=7, status="running", completed_at=None)
+    db.get.return_value = job
+    mocker.patch.object(BulkService, "start_job", return_value=[(0, 100)])
+    mocker.patch.object(whatsapp_tasks, "chord", side_effect=ConnectionError("broker down"))
+
+    whatsapp_tasks.process_bulk_whatsapp_job(7)
+
+    # No chord means no finalize_bulk_job: the job must not stay 'running'
+    assert job.status == "failed" and job.completed_at is not None
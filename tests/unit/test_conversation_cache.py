@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+from app.core.conversation_cache import ConversationWindowCache
+
+def test_hit_inside_window_and_miss_after_expiry():
+    """
+    Entries are served only while the last message is inside the window.
+    """
+    cache = ConversationWindowCache(maxsize=10, ttl_seconds=1800)
+    now = datetime.now(timezone.utc)
+    cache.put_many({"911": 42}, now)
+
+    assert cache.get("911", now - timedelta(minutes=30)) == 42
+
+    # Window lapsed: the DB must decide (new conversation)
+    assert cache.get("911", now + timedelta(seconds=1)) is None
+    assert cache.get("911", now - timedelta(minutes=30)) is None, "Expired entry should be evicted"
+
+def test_lru_bound_and_newer_entry_wins():
+    cache = ConversationWindowCache(maxsize=2, ttl_seconds=1800)
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(minutes=30)
+
+    cache.put_many({"a": 1, "b": 2}, now)
+    cache.put_many({"c": 3}, now)
+    assert cache.get("a", cutoff) is None
+    assert cache.get("c", cutoff) == 3
+
+    # A late writer with an older timestamp must not clobber the newer entry
+    cache.put_many({"c": 99}, now - timedelta(minutes=1))
+    assert cache.get("c", cutoff) == 3
+
+def test_redis_tier_is_shared_and_fault_tolerant():
+    redis = MagicMock()
+    now = datetime.now(timezone.utc)
+    redis.get.return_value = f"7:{now.timestamp()}"
+
+    cache = ConversationWindowCache(maxsize=10, ttl_seconds=1800, redis_client=redis)
+    assert cache.get("912", now - timedelta(minutes=30)) == 7
+
+    # Redis outage degrades to a miss instead of failing ingestion
+    redis.get.side_effect = ConnectionError("down")
+    assert cache.get("913", now - timedelta(minutes=30)) is None
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+from app.services.embedding_batcher import EmbeddingBatcher
+
+class FakeListRedis:
+    """Just the list commands the batcher uses."""
+    def __init__(self):
+        self.items = []
+
+    def rpush(self, key, *values):
+        self.items.extend(str(v) for v in values)
+        return len(self.items)
+
+    def lpop(self, key, count):
+        popped, self.items = self.items[:count], self.items[count:]
+        return popped or None
+
+    def llen(self, key):
+        return len(self.items)
+
+def make_db(mocker, ids):
+    db = mocker.MagicMock()
+    rows = [SimpleNamespace(id=i, text=f"message {i}") for i in ids]
+    # Return only the rows whose IDs were requested, like the IN query would
+    db.query.return_value.filter.side_effect = lambda clause: mocker.MagicMock(
+        all=lambda: [r for r in rows if r.id in clause.right.value]
+    )
+    return db
+
+def test_enqueue_signals_flush_triggers():
+    batcher = EmbeddingBatcher(FakeListRedis(), key="q", batch_size=3)
+
+    assert batcher.enqueue([1]) == (True, False)    # first item: schedule the countdown flush
+    assert batcher.enqueue([2]) == (False, False)
+    assert batcher.enqueue([3, 4]) == (False, True)  # reached batch size: flush now
+
+def test_flush_embeds_one_request_per_batch(mocker):
+    redis = FakeListRedis()
+    batcher = EmbeddingBatcher(redis, key="q", batch_size=3)
+    batcher.enqueue([1, 2, 3, 4, 5])
+
+    svc = mocker.patch("app.services.embedding_batcher.EmbeddingService").return_value
+    svc.embed_messages.side_effect = lambda msgs: len(msgs)
+
+    assert batcher.flush(make_db(mocker, [1, 2, 3, 4, 5])) == 5
+    assert [len(c.args[0]) for c in svc.embed_messages.call_args_list] == [3, 2]
+    assert batcher.pending() == 0
+
+def test_failed_flush_requeues_batch(mocker):
+    redis = FakeListRedis()
+    batcher = EmbeddingBatcher(redis, key="q", batch_size=3)
+    batcher.enqueue([1, 2])
+
+    svc = mocker.patch("app.services.embedding_batcher.EmbeddingService").return_value
+    svc.embed_messages.side_effect = RuntimeError("cohere down")
+
+    assert batcher.flush(make_db(mocker, [1, 2])) == 0
+    assert sorted(redis.items) == ["1", "2"]
@@ -0,0 +1,40 @@
+from unittest.mock import MagicMock
+from app.core.embedding_cache import EmbeddingCache, embedding_key, pack_vector, unpack_vector
+from app.services.embedding_service import EmbeddingService
+
+def test_key_normalizes_text_and_separates_models():
+    assert embedding_key("m1", "search_document", "  Hi\n there ") == embedding_key("m1", "search_document", "hi there")
+    assert embedding_key("m1", "search_document", "hi") != embedding_key("m2", "search_document", "hi")
+    assert embedding_key("m1", "search_document", "hi") != embedding_key("m1", "search_query", "hi")
+
+def test_packed_vector_round_trip():
+    raw = pack_vector([0.5, -1.25, 3.0])
+    assert len(raw) == 12, "float32 should take 4 bytes per dimension"
+    assert unpack_vector(raw) == [0.5, -1.25, 3.0]
+
+def test_redis_tier_fills_local_and_survives_outage():
+    redis = MagicMock()
+    redis.mget.return_value = [pack_vector([0.25]), None]
+    cache = EmbeddingCache(maxsize=10, ttl_seconds=60, redis_client=redis)
+
+    assert cache.get_many(["a", "b"]) == {"a": [0.25]}
+
+    # Promoted to the local tier: no Redis round trip on the next lookup
+    redis.mget.side_effect = ConnectionError("down")
+    assert cache.get_many(["a", "b"]) == {"a": [0.25]}
+
+def test_duplicate_texts_are_embedded_once(mocker):
+    mocker.patch("app.services.embedding_service.embedding_cache", EmbeddingCache(maxsize=10, ttl_seconds=60))
+    mocker.patch("app.services.embedding_service.settings.COHERE_API_KEY", "test-key")
+    mocker.patch.object(EmbeddingService, "active_model", return_value=("m1", 1))
+    post = mocker.patch("app.services.embedding_service.get_session").return_value.post
+    post.return_value.json.side_effect = lambda: {"embeddings": [[float(i)] for i, _ in enumerate(post.call_args.kwargs["json"]["texts"])]}
+
+    svc = EmbeddingService(db=MagicMock())
+    vectors = svc.embed_texts(["hi", "price?", "Hi "])
+    assert post.call_args.kwargs["json"]["texts"] == ["hi", "price?"]
+    assert vectors == [[0.0], [1.0], [0.0]]
+
+    # Second call is served entirely from the cache
+    assert svc.embed_text("HI") == [0.0]
+    assert post.call_count == 1
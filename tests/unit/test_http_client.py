@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from app.core import http_client
+from app.metrics.prometheus import HTTP_CLIENT_CONNECTIONS_OPENED, HTTP_CLIENT_REQUESTS
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/v1/embed"
+    server.shutdown()
+    server.server_close()
+
+def counter(metric, **labels):
+    return metric.labels(**labels)._value.get()
+
+def test_sync_session_reuses_connections(server_url):
+    http_client.close_session()
+    opened = counter(HTTP_CLIENT_CONNECTIONS_OPENED, client="sync", host="127.0.0.1")
+    ok = counter(HTTP_CLIENT_REQUESTS, client="sync", host="127.0.0.1", outcome="2xx")
+
+    for _ in range(5):
+        assert http_client.get_session().post(server_url, json={"texts": ["hi"]}).json() == {"ok": True}
+
+    assert counter(HTTP_CLIENT_REQUESTS, client="sync", host="127.0.0.1", outcome="2xx") - ok == 5
+    # One handshake, four keep-alive reuses
+    assert counter(HTTP_CLIENT_CONNECTIONS_OPENED, client="sync", host="127.0.0.1") - opened == 1
+    http_client.close_session()
+
+def test_session_is_rebuilt_after_fork(mocker):
+    http_client.close_session()
+    parent = http_client.get_session()
+    assert http_client.get_session() is parent
+
+    mocker.patch("app.core.http_client.os.getpid", return_value=-1)
+    assert http_client.get_session() is not parent
+    http_client.close_session()
+
+def test_async_client_reuses_connections(server_url):
+    async def run():
+        client = await http_client.start_async_client()
+        try:
+            for _ in range(3):
+                resp = await client.post(server_url, json={"texts": ["hi"]})
+                assert resp.status_code == 200
+        finally:
+            await http_client.close_async_client()
+
+    opened = counter(HTTP_CLIENT_CONNECTIONS_OPENED, client="async", host="127.0.0.1")
+    asyncio.run(run())
+    assert counter(HTTP_CLIENT_CONNECTIONS_OPENED, client="async", host="127.0.0.1") - opened == 1
+
+def test_exhausted_pool_times_out(mocker):
+    """With every pooled connection busy, a request fails after HTTP_POOL_TIMEOUT_SECONDS instead of hanging."""
+    import requests
+    from urllib3.exceptions import EmptyPoolError
+
+    mocker.patch("app.core.http_client.settings.HTTP_POOL_TIMEOUT_SECONDS", 0.05)
+    pool = http_client._MeteredHTTPConnectionPool("127.0.0.1", maxsize=1, block=True)
+    pool._get_conn()
+    with pytest.raises(EmptyPoolError):
+        pool._get_conn()
+
+    mocker.patch("requests.adapters.HTTPAdapter.send", side_effect=EmptyPoolError(pool, "Pool is empty"))
+    with pytest.raises(requests.exceptions.ConnectTimeout):
+        http_client._build_session().post("http://127.0.0.1:9/v1/embed", json={})
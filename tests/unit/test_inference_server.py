@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import wait
+import pytest
+from app.inference_server import InferenceServer
+from app.services.inference_client import InferenceBusy, InferenceClient, InferenceUnavailable
+
+class SlowPipeline:
+    """Fake model: records batch sizes, labels by text length."""
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.batches = []
+
+    def __call__(self, texts, **kwargs):
+        self.batches.append(len(texts))
+        time.sleep(self.delay)
+        return [{"label": "POSITIVE" if len(t) % 2 else "NEGATIVE", "score": 0.9} for t in texts]
+
+@pytest.fixture
+def serve(tmp_path):
+    running = []
+
+    def start(pipeline, **kwargs):
+        path = str(tmp_path / "sentiment.sock")
+        server = InferenceServer(pipeline, path, **kwargs)
+        loop = asyncio.new_event_loop()
+        task = loop.create_task(server.serve())
+        thread = threading.Thread(target=loop.run_until_complete, args=(asyncio.wait([task]),), daemon=True)
+        thread.start()
+        running.append((loop, task, thread))
+
+        deadline = time.monotonic() + 5
+        while not (tmp_path / "sentiment.sock").exists():
+            assert time.monotonic() < deadline, "server did not start"
+            time.sleep(0.01)
+        return path
+
+    yield start
+    for loop, task, thread in running:
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join(timeout=5)
+
+def test_concurrent_requests_share_one_batch(serve):
+    pipeline = SlowPipeline()
+    client = InferenceClient(serve(pipeline, batch_size=32, max_wait_ms=50), max_inflight=8, timeout=5)
+
+    futures = [client.submit([f"text {i}", "ab"]) for i in range(4)]
+    wait(futures, timeout=5)
+
+    assert [len(f.result()) for f in futures] == [2, 2, 2, 2]
+    assert futures[0].result()[1]["label"] == "NEGATIVE"
+    # All four requests fit in the batch window: one forward pass for 8 texts
+    assert pipeline.batches == [8]
+    client.close()
+
+def test_server_rejects_when_queue_is_full(serve):
+    client = InferenceClient(serve(SlowPipeline(delay=0.3), batch_size=2, max_wait_ms=0, max_pending=2), timeout=5)
+
+    first = client.submit(["a", "b"])
+    with pytest.raises(InferenceBusy):
+        client.classify(["c"])
+    assert len(first.result(timeout=5)) == 2
+    client.close()
+
+def test_unreachable_server(tmp_path):
+    client = InferenceClient(str(tmp_path / "missing.sock"), timeout=1)
+    with pytest.raises(InferenceUnavailable):
+        client.classify(["hello"])
+
+def test_idle_server_accepts_an_oversized_request(serve):
+    pipeline = SlowPipeline(delay=0)
+    client = InferenceClient(serve(pipeline, batch_size=2, max_wait_ms=0, max_pending=2), timeout=5)
+
+    assert len(client.classify(["a", "b", "c", "d", "e"])) == 5
+    client.close()
+
+def test_remote_pipeline_splits_by_batch_size(serve):
+    from app.services.inference_client import RemotePipeline
+
+    pipeline = SlowPipeline(delay=0)
+    client = InferenceClient(serve(pipeline, batch_size=32, max_wait_ms=0, max_pending=4), timeout=5)
+
+    results = RemotePipeline(client)([f"t{'x' * i}" for i in range(10)], batch_size=3)
+
+    # Results come back in input order across the chunked requests
+    assert [r["label"] for r in results] == ["POSITIVE" if i % 2 == 0 else "NEGATIVE" for i in range(10)]
+    assert pipeline.batches == [3, 3, 3, 1]
+    client.close()
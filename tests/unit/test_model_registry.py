@@ -0,0 +1,27 @@
+from unittest.mock import MagicMock
+from app.core.model_registry import LazyModelRegistry
+
+def test_models_load_once_on_first_use():
+    loader = MagicMock(return_value="model")
+    registry = LazyModelRegistry()
+    registry.register("sentiment", loader)
+
+    assert loader.call_count == 0, "registering must not load the model"
+    assert registry.get("sentiment") == "model"
+    assert registry.get("sentiment") == "model"
+    assert loader.call_count == 1
+    assert registry.loaded() == ["sentiment"]
+
+def test_failed_load_degrades_to_none():
+    registry = LazyModelRegistry()
+    registry.register("sentiment", MagicMock(side_effect=OSError("no weights")))
+
+    assert registry.get("sentiment") is None
+    assert registry.loaded() == []
+
+def test_sentiment_service_registers_without_loading():
+    from app.core.model_registry import model_registry
+    import app.services.sentiment_service  # noqa: F401
+
+    assert "sentiment" in model_registry._loaders
+    assert "sentiment" not in model_registry.loaded()
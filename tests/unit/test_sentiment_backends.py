@@ -0,0 +1,46 @@
+import pytest
+from app.core.config import settings
+from app.services.sentiment_backends import load_pipeline
+
+# Seed conversations plus harder cases (negation, mixed, long)
+TEXTS = [
+    "I absolutely love this product! It's amazing.",
+    "This is the worst service I have ever used. Terrible.",
+    "Can you tell me your opening hours?",
+    "I am very happy with the quick delivery.",
+    "My order is broken and nobody is replying.",
+    "What is the price of the premium plan?",
+    "Excellent support team, thank you!",
+    "Not bad at all, I expected worse.",
+    "The product is fine but shipping took forever.",
+    "I was charged twice. Please refund me immediately. " * 40,
+]
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        load_pipeline("tensorrt")
+
+@pytest.fixture(scope="module")
+def pipelines(tmp_path_factory):
+    pytest.importorskip("torch")
+    pytest.importorskip("optimum.onnxruntime")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(settings, "SENTIMENT_ONNX_DIR", str(tmp_path_factory.mktemp("onnx")))
+        try:
+            return {backend: load_pipeline(backend) for backend in ("torch", "onnx", "onnx-int8")}
+        except OSError as e:
+            pytest.skip(f"Model weights unavailable: {e}")
+
+def run(pipeline):
+    return pipeline(TEXTS, batch_size=8, truncation=True, max_length=512)
+
+def test_onnx_matches_torch(pipelines):
+    reference, onnx = run(pipelines["torch"]), run(pipelines["onnx"])
+    assert [r["label"] for r in onnx] == [r["label"] for r in reference]
+    assert [r["score"] for r in onnx] == pytest.approx([r["score"] for r in reference], abs=1e-3)
+
+def test_int8_keeps_labels(pipelines):
+    reference, quantized = run(pipelines["torch"]), run(pipelines["onnx-int8"])
+    agree = sum(q["label"] == r["label"] for q, r in zip(quantized, reference))
+    # Quantization may flip at most one borderline case
+    assert agree >= len(TEXTS) - 1
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from app.services.inference_client import InferenceBusy
+from app.services.sentiment_service import SentimentService
+
+def msg(id, text):
+    return SimpleNamespace(id=id, text=text)
+
+def test_batch_runs_one_inference_and_one_update(mocker):
+    mocker.patch("app.services.sentiment_service.settings.SENTIMENT_BATCH_SIZE", 16)
+    pipeline = MagicMock(side_effect=lambda texts, **kw: [{"label": "POSITIVE", "score": 0.9} for _ in texts])
+    mocker.patch("app.services.sentiment_service.get_sentiment_pipeline", return_value=pipeline)
+    db = MagicMock()
+
+    labels = SentimentService(db).analyze_batch([msg(1, "great"), msg(2, "  "), msg(3, "love it")])
+
+    assert labels == {1: "positive", 2: "neutral", 3: "positive"}
+    # Empty texts never reach the model; the rest go in one padded, truncated call
+    assert pipeline.call_count == 1
+    assert pipeline.call_args.args[0] == ["great", "love it"]
+    assert pipeline.call_args.kwargs["batch_size"] == 16 and pipeline.call_args.kwargs["truncation"] is True
+
+    assert db.execute.call_count == 1
+    sql, params = str(db.execute.call_args.args[0]), db.execute.call_args.args[1]
+    assert "FROM (VALUES" in sql
+    assert sorted(v for k, v in params.items() if k.startswith("id")) == [1, 2, 3]
+
+def stored(db) -> dict:
+    params = db.execute.call_args.args[1]
+    return {params[k]: params[f"label{k[2:]}"] for k in params if k.startswith("id")}
+
+def test_unavailable_inference_leaves_messages_pending(mocker):
+    mocker.patch("app.services.sentiment_service.get_sentiment_pipeline",
+                 return_value=MagicMock(side_effect=InferenceBusy("inference server busy")))
+    db = MagicMock()
+
+    labels = SentimentService(db).analyze_batch([msg(1, "great"), msg(2, "")])
+
+    assert labels == {1: "pending", 2: "neutral"}
+    # Only the empty message is marked as scored
+    assert [v for k, v in db.execute.call_args.args[1].items() if k.startswith("id")] == [2]
+
+def test_one_bad_text_does_not_fail_the_batch(mocker):
+    """
+    A failed batch is retried per message; only the text that still fails is
+    stored as 'error', so the sweep doesn't select it again.
+    """
+    def pipeline(texts, **kw):
+        if "poison" in texts:
+            raise RuntimeError("index out of range")
+        return [{"label": "NEGATIVE", "score": 0.8} for _ in texts]
+    mocker.patch("app.services.sentiment_service.get_sentiment_pipeline", return_value=MagicMock(side_effect=pipeline))
+    db = MagicMock()
+
+    labels = SentimentService(db).analyze_batch([msg(1, "bad"), msg(2, "poison"), msg(3, "awful")])
+
+    assert labels == {1: "negative", 2: "error", 3: "negative"}
+    assert stored(db) == labels
+
+def test_sweep_counts_error_labels_as_scored(mocker):
+    mocker.patch("app.services.sentiment_service.get_sentiment_pipeline",
+                 return_value=MagicMock(side_effect=RuntimeError("bad input")))
+    db = MagicMock()
+    db.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = [
+        msg(1, "poison"), msg(2, "also poison"),
+    ]
+
+    assert SentimentService(db).score_pending() == 2
+    assert stored(db) == {1: "error", 2: "error"}
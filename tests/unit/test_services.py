@@ -115,7 +115,7 @@ def test_whatsapp_send_success(mocker):
     mock_resp.status_code = 200
     mock_resp.raise_for_status.return_value = None
     
-    mocker.patch("app.integrations.whatsapp_client.requests.post", return_value=mock_resp)
+    mocker.patch("app.integrations.whatsapp_client.get_session").return_value.post.return_value = mock_resp
     
     result = send_template("9199999999", "hello_world_template")
     assert result["messages"][0]["id"] == "wamid.123"
\ No newline at end of file
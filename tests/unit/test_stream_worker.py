@@ -0,0 +1,148 @@
+import asyncio
+import json
+import pytest
+from app import stream_worker
+
+def make_entries(*bodies):
+    return [(f"{i}-0", {"body": b}) for i, b in enumerate(bodies, start=1)]
+
+def test_batch_is_acked_after_ingest(mocker):
+    """
+    A healthy batch is ingested in one call and acked as a whole.
+    """
+    stream = mocker.MagicMock()
+    ingest = mocker.patch("app.stream_worker._ingest", return_value={"messages": 2, "statuses": 0})
+
+    entries = make_entries(json.dumps({"entry": []}), json.dumps({"entry": []}))
+    assert stream_worker.process_entries(stream, entries) is True
+
+    ingest.assert_called_once()
+    stream.ack.assert_called_once_with(["1-0", "2-0"])
+
+def test_invalid_json_goes_to_dead_letter(mocker):
+    """
+    Bodies that can never be parsed must not be redelivered forever.
+    """
+    stream = mocker.MagicMock()
+    mocker.patch("app.stream_worker._ingest", return_value={"messages": 1, "statuses": 0})
+
+    entries = make_entries("not-json", json.dumps({"entry": []}))
+    stream_worker.process_entries(stream, entries)
+
+    stream.dead_letter.assert_called_once_with("1-0", {"body": "not-json"})
+    stream.ack.assert_called_once_with(["2-0"])
+
+def test_failed_batch_is_retried_per_entry(mocker):
+    """
+    One failing payload must not block the rest of the batch.
+    The failing entry stays un-acked so it can be reclaimed.
+    """
+    stream = mocker.MagicMock()
+    bad = {"entry": [{"bad": True}]}
+
+    def fake_ingest(payloads):
+        if bad in payloads:
+            raise RuntimeError("DB error")
+        return {"messages": len(payloads), "statuses": 0}
+
+    mocker.patch("app.stream_worker._ingest", side_effect=fake_ingest)
+
+    entries = make_entries(json.dumps({"entry": []}), json.dumps(bad))
+    assert stream_worker.process_entries(stream, entries) is False
+
+    acked = [c.args[0] for c in stream.ack.call_args_list]
+    assert acked == [["1-0"]]
+
+def test_poison_check_looks_up_each_claimed_entry(mocker):
+    """
+    Delivery counts are read per claimed ID, so other consumers' pending
+    entries in the same ID range can't hide a poison entry.
+    """
+    from app.services.webhook_stream import WebhookStream
+
+    redis = mocker.MagicMock()
+    pipe = redis.pipeline.return_value
+    pipe.execute.return_value = [
+        [{"message_id": "1-0", "times_delivered": 1}],
+        [{"message_id": "5-0", "times_delivered": 99}],
+    ]
+    stream = WebhookStream(client=redis)
+    mocker.patch.object(stream, "dead_letter")
+
+    healthy = stream._drop_poison([("1-0", {"body": "a"}), ("5-0", {"body": "b"})])
+
+    assert [c.kwargs for c in pipe.xpending_range.call_args_list] == [
+        {"min": "1-0", "max": "1-0", "count": 1},
+        {"min": "5-0", "max": "5-0", "count": 1},
+    ]
+    assert healthy == [("1-0", {"body": "a"})]
+    stream.dead_letter.assert_called_once_with("5-0", {"body": "b"})
+
+def test_replay_skips_invalid_json():
+    ids, payloads = stream_worker._decode(make_entries("not-json", json.dumps({"entry": []})))
+    assert ids == ["2-0"]
+    assert payloads == [{"entry": []}]
+
+def test_webhook_batch_commits_messages_and_statuses_together(mocker):
+    from app.services import webhook_service
+
+    db = mocker.MagicMock()
+    chat = mocker.patch.object(webhook_service, "ChatService").return_value
+    chat.add_incoming_batch.return_value = ({"911": 1}, [10])
+    statuses = mocker.patch.object(webhook_service, "StatusService").return_value
+    statuses.apply_statuses_bulk.side_effect = RuntimeError("DB error")
+
+    payload = {"entry": [{"changes": [{"value": {
+        "messages": [{"type": "text", "from": "911", "text": {"body": "hi"}, "id": "wamid.1"}],
+        "statuses": [{"id": "wamid.0", "status": "read"}],
+    }}]}]}
+    with pytest.raises(RuntimeError):
+        webhook_service.WebhookService(db).ingest_many([payload])
+
+    # A failed status write rolls back the messages too; nothing is published
+    db.commit.assert_not_called()
+    db.rollback.assert_called_once()
+    chat.publish_incoming.assert_not_called()
+
+def test_trimmed_pending_entries_are_dead_lettered(mocker):
+    """
+    Entries trimmed while pending come back as (id, None); they are acked and
+    dead-lettered by ID instead of crashing the startup/reclaim path.
+    """
+    from app.services.webhook_stream import WebhookStream
+
+    redis = mocker.MagicMock()
+    stream = WebhookStream(client=redis)
+
+    entries = [("1-0", None), ("2-0", {"body": json.dumps({"entry": []})})]
+    ids, payloads = stream_worker._decode(entries, stream)
+
+    assert ids == ["2-0"]
+    assert payloads == [{"entry": []}]
+    redis.xadd.assert_called_once_with(stream.dead_letter_key, {"reason": "trimmed", "source_id": "1-0"})
+    redis.xack.assert_called_once_with(stream.key, stream.group, "1-0")
+
+def test_trim_never_passes_oldest_pending_entry(mocker):
+    """
+    Trimming stops at the oldest pending entry even when it is past retention.
+    """
+    from app.services.webhook_stream import WebhookStream
+
+    redis = mocker.MagicMock()
+    redis.xinfo_groups.return_value = [
+        {"name": "webhook-ingest", "pending": 3, "last-delivered-id": "9000-0"},
+    ]
+    redis.xpending.return_value = {"pending": 3, "min": "100-5", "max": "9000-0"}
+    stream = WebhookStream(client=redis)
+    stream.group = "webhook-ingest"
+
+    assert stream.trim_acked() == "100-5"
+    redis.xtrim.assert_called_once_with(stream.key, minid="100-5", approximate=True)
+
+def test_publish_does_not_cap_stream(mocker):
+    from app.services import webhook_stream
+
+    xadd = mocker.patch.object(webhook_stream.redis_client, "xadd", new=mocker.AsyncMock(return_value="1-0"))
+    asyncio.run(webhook_stream.publish_webhook(b"{}"))
+
+    assert "maxlen" not in xadd.call_args.kwargs
@@ -0,0 +1,36 @@
+import struct
+from datetime import datetime, timezone
+import numpy as np
+from pgvector.utils import from_db, from_db_binary
+from app.core.vector_io import COPY_SIGNATURE, encode_copy_rows, vector_literal
+
+def test_literal_is_float32_exact_and_compact():
+    vec = [float(x) for x in np.random.default_rng(1).standard_normal(1024)]
+    literal = vector_literal(vec)
+
+    assert np.array_equal(from_db(literal), np.asarray(vec, dtype=np.float32))
+    assert " " not in literal and len(literal) < len(str(vec))
+
+def test_copy_stream_layout():
+    created = datetime(2000, 1, 1, 0, 0, 1, tzinfo=timezone.utc)
+    buf = encode_copy_rows([
+        {"message_id": 7, "embedding": [0.5, -1.0], "model_version": "m1", "tenant_id": None,
+         "conversation_id": 3, "from_number": "911", "message_created_at": created},
+    ]).getvalue()
+
+    assert buf.startswith(COPY_SIGNATURE)
+    assert buf.endswith(struct.pack(">h", -1))
+
+    body = buf[len(COPY_SIGNATURE):]
+    assert struct.unpack(">h", body[:2])[0] == 7
+    assert struct.unpack(">ii", body[2:10]) == (4, 7)
+
+    # pgvector binary: dims, unused, then big-endian float32s
+    (vec_len,) = struct.unpack(">i", body[10:14])
+    assert from_db_binary(body[14:14 + vec_len]).tolist() == [0.5, -1.0]
+
+    rest = body[14 + vec_len:]
+    assert rest[:6] == struct.pack(">i", 2) + b"m1"
+    assert struct.unpack(">i", rest[6:10])[0] == -1, "NULL tenant_id"
+    # One second after the Postgres epoch, in microseconds
+    assert rest.endswith(struct.pack(">iq", 8, 1_000_000) + struct.pack(">h", -1))
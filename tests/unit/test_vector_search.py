@@ -0,0 +1,75 @@
+from unittest.mock import MagicMock
+import pytest
+from app.services.embedding_service import EmbeddingService
+from app.services.vector_index_service import VectorIndexService, index_name, validate_model_version
+
+@pytest.fixture(autouse=True)
+def active_model(mocker):
+    mocker.patch("app.services.embedding_service.settings.VECTOR_ITERATIVE_SCAN", True)
+    return mocker.patch.object(EmbeddingService, "active_model", return_value=("embed-english-v3.0", 2))
+
+def executed_settings(db):
+    return [c.args[1] for c in db.execute.call_args_list if "set_config" in str(c.args[0])]
+
+def test_search_tuning_is_transaction_local():
+    db = MagicMock()
+    EmbeddingService(db).search_similar([0.1, 0.2], tenant_id=1, limit=50, ef_search=20, probes=8)
+
+    # ef_search below the limit would silently return fewer rows, so it is raised to the limit
+    # Every search filters by tenant, so iterative scan is always on
+    assert executed_settings(db) == [
+        {"name": "hnsw.iterative_scan", "value": "strict_order"},
+        {"name": "hnsw.ef_search", "value": "50"},
+        {"name": "ivfflat.probes", "value": "8"},
+    ]
+
+def test_search_requires_a_tenant():
+    with pytest.raises(ValueError):
+        EmbeddingService(MagicMock()).search_similar([0.1, 0.2], tenant_id=None)
+
+def test_default_ef_search_still_covers_the_limit():
+    db = MagicMock()
+    EmbeddingService(db).search_similar([0.1, 0.2], tenant_id=1, limit=100)
+    # pgvector's default of 40 would cap a LIMIT 100 search at 40 rows
+    assert {"name": "hnsw.ef_search", "value": "100"} in executed_settings(db)
+
+def test_small_default_search_uses_configured_ef_search():
+    db = MagicMock()
+    EmbeddingService(db).search_similar([0.1, 0.2], tenant_id=1)
+    assert {"name": "hnsw.ef_search", "value": "40"} in executed_settings(db)
+
+def test_build_rejects_unknown_index_type():
+    with pytest.raises(ValueError):
+        VectorIndexService(MagicMock()).build("embed-english-v3.0", 1024, "flat")
+
+def test_search_is_scoped_to_one_model():
+    db = MagicMock()
+    EmbeddingService(db).search_similar([0.1, 0.2, 0.3], tenant_id=1, model_version="embed-english-light-v3.0", dimensions=3)
+
+    search = db.execute.call_args_list[-1]
+    sql, params = str(search.args[0]), search.args[1]
+    assert params["model_version"] == "embed-english-light-v3.0"
+    # Same expression as the model's partial index, or the planner can't use it
+    assert "embedding::vector(3) <=>" in sql and "model_version = :model_version" in sql
+
+def test_index_names_are_per_model_and_fit_postgres():
+    assert index_name("embed-english-v3.0") == "ix_message_embeddings_ann_embed_english_v3_0"
+    long_name = index_name("x" * 100)
+    assert len(long_name) <= 63 and long_name != index_name("x" * 99)
+
+def test_model_versions_are_validated_before_reaching_ddl():
+    with pytest.raises(ValueError):
+        validate_model_version("v1'; DROP TABLE message_embeddings; --")
+
+def test_filters_are_pushed_into_the_query():
+    db = MagicMock()
+    EmbeddingService(db).search_similar([0.1], tenant_id=7, exclude_conversation_ids=[3], from_number="911")
+
+    search = db.execute.call_args_list[-1]
+    sql, params = str(search.args[0]), search.args[1]
+    assert "tenant_id = :tenant_id" in sql
+    assert "<> ALL" in sql and "from_number = :from_number" in sql
+    assert params["tenant_id"] == 7 and params["exclude_ids"] == [3]
+
+    # Selective filters must not starve the HNSW candidate list
+    assert {"name": "hnsw.iterative_scan", "value": "strict_order"} in executed_settings(db)